@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teable 异步 API 客户端
+TeableClient 的 asyncio 版本，基于 httpx，可用 asyncio.gather 并发执行相互独立的请求，
+也可以嵌入其他 asyncio 服务中使用。
+
+需要安装 httpx：pip install "teable-cli[async]"
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from retry_policy import RetryPolicy
+from concurrency_limiter import AsyncAIMDLimiter
+from teable_api_client import TeableClient
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - 可选依赖
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTeableClient:
+    """Teable 异步 API 客户端
+
+    方法名和参数与 TeableClient 一致，所有请求方法都是协程::
+
+        async with AsyncTeableClient(base_url, token, base_id) as client:
+            tables = await client.get_tables()
+            fields = await asyncio.gather(*(client.get_table_fields(t['id']) for t in tables))
+            async for record in client.iter_records(table_id, page_size=1000):
+                ...
+
+    同一个客户端的所有请求共享 httpx 连接池、重试策略和自适应并发上限。
+    """
+
+    def __init__(self, base_url: str, token: str, base_id: str,
+                 pool_size: int = 10, http2: bool = False, schema_cache=None, retry_policy=None,
+                 limiter=None, timeout: float = 10):
+        """
+        初始化异步客户端
+
+        Args:
+            base_url: API 基础URL
+            token: 认证令牌
+            base_id: 数据库ID
+            pool_size: 连接池大小
+            http2: 是否启用 HTTP/2（需要安装 httpx[http2]）
+            schema_cache: 表结构缓存（SchemaCache），为None时不缓存
+            retry_policy: 请求重试策略（RetryPolicy），为None时使用默认策略
+            limiter: 自适应并发限制器（AsyncAIMDLimiter），为None时按连接池大小创建
+            timeout: 单个请求超时时间（秒）
+        """
+        if httpx is None:
+            raise ImportError("AsyncTeableClient 需要安装 httpx: pip install httpx")
+        self.base_url = base_url
+        self.token = token
+        self.base_id = base_id
+        self.headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
+        self.http_client = httpx.AsyncClient(
+            base_url=f"{base_url}/api", headers=self.headers, timeout=timeout, http2=http2,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self.schema_cache = schema_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = limiter or AsyncAIMDLimiter(max_limit=pool_size)
+
+    @classmethod
+    def from_client(cls, client: TeableClient, **kwargs) -> 'AsyncTeableClient':
+        """使用同步客户端的连接信息、表结构缓存和重试策略创建异步客户端"""
+        kwargs.setdefault('schema_cache', client.schema_cache)
+        kwargs.setdefault('retry_policy', client.retry_policy)
+        kwargs.setdefault('pool_size', client.limiter.max_limit)
+        return cls(client.base_url, client.token, client.base_id, **kwargs)
+
+    async def aclose(self):
+        """关闭连接池"""
+        await self.http_client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def _send(self, method: str, endpoint: str, idempotent: Optional[bool] = None, **kwargs):
+        """按重试策略和并发上限发送请求，返回 httpx 响应"""
+        return await self.retry_policy.acall(
+            method,
+            lambda: self.limiter.call(lambda: self.http_client.request(method, endpoint, **kwargs),
+                                      kind=method),
+            idempotent=idempotent, errors=(httpx.TransportError,)
+        )
+
+    async def _request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                       params: Optional[Dict] = None, idempotent: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        发送 HTTP 请求
+
+        Args:
+            method: HTTP 方法
+            endpoint: API 端点
+            data: 请求数据
+            params: 查询参数
+            idempotent: 请求是否可以安全地重复执行，None 表示按 HTTP 方法判断
+
+        Returns:
+            API 响应数据
+        """
+        response = await self._send(method, endpoint, idempotent=idempotent,
+                                    content=json.dumps(data) if data else None, params=params)
+        if response.status_code not in [200, 201, 204]:
+            logger.error(f"请求失败: {response.status_code} - {response.text}")
+            raise httpx.HTTPStatusError(f"{response.status_code} Error: {response.url}\n响应内容: {response.text}",
+                                        request=response.request, response=response)
+        if response.status_code == 204 or not response.text.strip():
+            if method != "DELETE" and response.status_code != 204:
+                raise Exception("响应为空")
+            return {}
+        try:
+            return response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"响应内容: {response.text[:500]}")
+            raise Exception(f"JSON解析失败: {e}")
+
+    async def _cached_get(self, key: str, endpoint: str, version: Optional[str] = None) -> Any:
+        """经表结构缓存的 GET 请求，缓存规则与 TeableClient._cached_get 相同"""
+        cache = self.schema_cache
+        if cache is None:
+            return await self._request("GET", endpoint)
+
+        entry = cache.get(key)
+        if entry is not None and version is not None and entry.get('version') != version:
+            entry = None
+        if entry is not None and cache.is_fresh(entry):
+            return entry['data']
+
+        headers = {'If-None-Match': entry['etag']} if entry and entry.get('etag') else None
+        response = await self._send("GET", endpoint, headers=headers)
+        if response.status_code == 304 and headers:
+            data = entry['data']
+        elif response.status_code == 200:
+            data = response.json()
+        else:
+            raise httpx.HTTPStatusError(f"{response.status_code} Error: {response.url}\n响应内容: {response.text}",
+                                        request=response.request, response=response)
+        cache.set(key, data, etag=response.headers.get('ETag'), version=version)
+        return data
+
+    def _table_version(self, table_id: str) -> Optional[str]:
+        return TeableClient._table_version(self, table_id)
+
+    def _invalidate_schema(self, table_id: Optional[str] = None):
+        TeableClient._invalidate_schema(self, table_id)
+
+    async def get_tables(self) -> List[Dict[str, Any]]:
+        """获取所有表格列表"""
+        return await self._cached_get("tables", f"/base/{self.base_id}/table")
+
+    async def get_table_details(self, table_id: str) -> Dict[str, Any]:
+        """获取表格详情"""
+        return await self._request("GET", f"/base/{self.base_id}/table/{table_id}")
+
+    async def get_table_fields(self, table_id: str) -> List[Dict[str, Any]]:
+        """获取表格字段信息"""
+        return await self._cached_get(f"fields_{table_id}", f"/table/{table_id}/field/",
+                                      version=self._table_version(table_id))
+
+    async def create_table(self, table_config: Dict[str, Any]) -> Dict[str, Any]:
+        """创建表格"""
+        try:
+            return await self._request("POST", f"/base/{self.base_id}/table/", data=table_config)
+        finally:
+            self._invalidate_schema()
+
+    async def get_records(self, table_id: str, page: int = 1, page_size: int = 100,
+                          projection: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        查询记录
+
+        Args:
+            table_id: 表格ID
+            page: 页码，从1开始
+            page_size: 每页记录数
+            projection: 只返回这些字段（字段名列表），None 表示返回全部字段
+            **kwargs: 其他查询参数，如filter, orderBy, take, skip等
+
+        Returns:
+            记录列表
+        """
+        params = {'skip': (page - 1) * page_size, 'take': page_size}
+        params.update(kwargs)
+        if projection:
+            params['projection[]'] = list(projection)
+        return await self._request("GET", f"/table/{table_id}/record/", params=params)
+
+    async def get_record(self, table_id: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """获取单条记录详情，未找到返回None"""
+        try:
+            return await self._request("GET", f"/table/{table_id}/record/{record_id}")
+        except Exception as e:
+            logger.error(f"获取记录失败: {e}")
+            return None
+
+    async def iter_record_pages(self, table_id: str, page_size: int = 100, limit: Optional[int] = None,
+                                **kwargs) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按页异步迭代记录
+
+        表格有 autoNumber 字段且没有自定义排序时使用游标分页（同 TeableClient.scan_record_pages），
+        否则使用 skip/take 分页。
+
+        Args:
+            table_id: 表格ID
+            page_size: 每页记录数
+            limit: 最多返回的记录数（None 表示不限制）
+            **kwargs: 其他查询参数，如filter, orderBy等
+
+        Yields:
+            每页的记录列表
+        """
+        cursor_field = None
+        if 'orderBy' not in kwargs:
+            cursor_field = TeableClient.find_cursor_field(await self.get_table_fields(table_id))
+
+        base_filter = kwargs.pop('filter', None) if cursor_field else None
+        if isinstance(base_filter, str):
+            base_filter = json.loads(base_filter)
+        projection = kwargs.pop('projection', None)
+        if projection:
+            if cursor_field and cursor_field not in projection:
+                projection = list(projection) + [cursor_field]
+            kwargs['projection[]'] = list(projection)
+
+        last_seen = None
+        fetched = 0
+        while True:
+            take = page_size if limit is None else min(page_size, limit - fetched)
+            if take <= 0:
+                return
+
+            params = dict(kwargs)
+            if cursor_field:
+                filter_set = [base_filter] if base_filter else []
+                if last_seen is not None:
+                    filter_set.append({"fieldId": cursor_field, "operator": "isGreater", "value": last_seen})
+                if filter_set:
+                    params['filter'] = json.dumps({"conjunction": "and", "filterSet": filter_set})
+                params['orderBy'] = json.dumps([{"fieldId": cursor_field, "order": "asc"}])
+                params.update(skip=0, take=take)
+            else:
+                params.update(skip=fetched, take=take)
+
+            records = (await self._request("GET", f"/table/{table_id}/record/", params=params)).get('records', [])
+            if records:
+                yield records
+            if len(records) < take:
+                return
+
+            fetched += len(records)
+            if cursor_field:
+                last_seen = records[-1].get('fields', {}).get(cursor_field)
+                if last_seen is None:
+                    raise Exception(f"记录中缺少游标字段 '{cursor_field}'，无法继续游标分页")
+
+    async def iter_records(self, table_id: str, page_size: int = 100, limit: Optional[int] = None,
+                           **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """逐条异步迭代记录，参数同 iter_record_pages"""
+        async for page in self.iter_record_pages(table_id, page_size=page_size, limit=limit, **kwargs):
+            for record in page:
+                yield record
+
+    async def insert_records(self, table_id: str, records_data: List[Dict[str, Any]],
+                             use_field_ids: bool = False) -> Dict[str, Any]:
+        """插入记录，records_data 格式同 TeableClient.insert_records"""
+        data = {
+            "fieldKeyType": "id" if use_field_ids else "name",
+            "records": records_data
+        }
+        return await self._request("POST", f"/table/{table_id}/record/", data=data)
+
+    async def update_record(self, table_id: str, record_id: str, fields_data: Dict[str, Any],
+                            use_field_ids: bool = False) -> Dict[str, Any]:
+        """更新单条记录"""
+        data = {
+            "fieldKeyType": "id" if use_field_ids else "name",
+            "record": {"fields": fields_data}
+        }
+        return await self._request("PATCH", f"/table/{table_id}/record/{record_id}", data=data)
+
+    async def batch_update_records(self, table_id: str, updates: List[Dict[str, Any]],
+                                   use_field_ids: bool = False) -> Dict[str, Any]:
+        """批量更新记录，updates 每个元素包含record_id和fields_data"""
+        data = {"records": [{"id": update['record_id'], "fields": update['fields_data']} for update in updates]}
+        if use_field_ids:
+            data["fieldKeyType"] = "id"
+        return await self._request("PATCH", f"/table/{table_id}/record", data=data)
+
+    async def delete_record(self, table_id: str, record_id: str) -> bool:
+        """删除记录，返回是否成功"""
+        try:
+            await self._request("DELETE", f"/table/{table_id}/record/{record_id}")
+            return True
+        except Exception as e:
+            logger.error(f"删除记录失败: {e}")
+            return False
+
+    async def batch_delete_records(self, table_id: str, record_ids: List[str]) -> Dict[str, Any]:
+        """批量删除记录，请求失败时抛出异常（整批未删除）"""
+        return await self._request("DELETE", f"/table/{table_id}/record",
+                                   params={"recordIds[]": list(record_ids)})
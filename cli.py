@@ -6,8 +6,8 @@ Teable CLI 主程序
 
 import sys
 import os
+import logging
 import click
-from pathlib import Path
 from typing import Optional
 
 # 将当前目录添加到Python路径
@@ -15,12 +15,6 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
 from session import Session
-from commands import (
-    list_tables, show_current_table, use_table, 
-    show_help, config_command, show_session_status,
-    insert_record, update_record, delete_record,
-    alter_command, show_table_schema, create_table_command
-)
 
 # 版本号
 __version__ = "0.1.0"
@@ -29,38 +23,78 @@ __version__ = "0.1.0"
 class TeableCLI:
     """Teable CLI 主类"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.config = Config()
         self.session = Session(self.config)
-        self.client = None
+        self._client = None
+        self.use_cache = use_cache
+    
+    @property
+    def client(self):
+        """API 客户端，第一次使用时才创建（t version、t help 等命令不需要导入 requests）"""
         self._ensure_client()
+        return self._client
     
     def _ensure_client(self):
         """确保客户端已初始化"""
-        if self.client is None and self.config.is_configured():
+        if self._client is None and self.config.is_configured():
             try:
                 # 延迟导入，避免循环依赖
                 from teable_api_client import TeableClient
+                from retry_policy import RetryPolicy
                 conn_info = self.config.get_connection_info()
-                self.client = TeableClient(
+                self._client = TeableClient(
                     conn_info['base_url'],
                     conn_info['token'],
-                    conn_info['base_id']
+                    conn_info['base_id'],
+                    pool_size=self.config.get('pool_size', 10),
+                    http2=self.config.get('http2', False),
+                    schema_cache=self._create_schema_cache(conn_info['base_id']),
+                    retry_policy=RetryPolicy(max_retries=self.config.get('max_retries', 3))
                 )
             except Exception as e:
                 print(f"错误: 无法连接到Teable服务: {e}")
-                self.client = None
+                self._client = None
+    
+    def _create_schema_cache(self, base_id: str):
+        """创建表结构缓存，--no-cache 或 schema_cache_ttl 为0时不使用缓存"""
+        ttl = self.config.get('schema_cache_ttl', 300)
+        if not self.use_cache or not ttl:
+            return None
+        from schema_cache import SchemaCache
+        self.config.ensure_config_dir()
+        return SchemaCache(self.config.cache_dir, base_id, ttl=ttl)
     
     def run_command(self, command: str, args: list):
         """执行命令"""
-        if not self.config.is_configured() and command not in ['config', 'help']:
+        if not self.config.is_configured() and command not in ['config', 'help', 'cache', 'daemon', 'version']:
             print("错误: 请先配置连接信息")
             print("使用: t config --token YOUR_TOKEN --base YOUR_BASE_ID")
             return 1
         
-        self._ensure_client()
+        if self._get_handler(command) is None:
+            print(f"错误: 未知命令 '{command}'")
+            print("使用 't help' 查看可用命令")
+            return 1
         
-        # 命令分发
+        if self._client is not None:
+            self._client.retry_policy.stats.reset()
+        try:
+            return self.dispatch(command, args)
+        finally:
+            self._print_retry_summary()
+    
+    def dispatch(self, command: str, args: list):
+        """执行单个命令（不检查配置、不输出重试汇总），供 t exec 脚本逐行调用"""
+        handler = self._get_handler(command)
+        if handler is None:
+            print(f"错误: 未知命令 '{command}'")
+            print("使用 't help' 查看可用命令")
+            return 1
+        return handler(args)
+    
+    def _get_handler(self, command: str):
+        """命令分发"""
         commands = {
             'ls': self._handle_list,
             'use': self._handle_use,
@@ -78,19 +112,29 @@ class TeableCLI:
             'desc': self._handle_desc,
             'schema': self._handle_desc,
             'fields': self._handle_desc,
+            'cache': self._handle_cache,
+            'daemon': self._handle_daemon,
+            'exec': self._handle_exec,
+            'sync': self._handle_sync,
+            'watch': self._handle_watch,
+            'export': self._handle_export,
+            'import': self._handle_import,
         }
-        
-        handler = commands.get(command)
-        if handler:
-            return handler(args)
-        else:
-            print(f"错误: 未知命令 '{command}'")
-            print("使用 't help' 查看可用命令")
-            return 1
+        return commands.get(command)
+    
+    def _print_retry_summary(self):
+        """命令结束时在标准错误输出请求重试汇总（没有发生重试时不输出）"""
+        # 命令没有用到客户端时不需要输出（也不为此创建客户端）
+        if self._client is None:
+            return
+        summary = self._client.retry_policy.stats.summary()
+        if summary:
+            print(summary, file=sys.stderr)
     
     def _handle_list(self, args: list):
         """处理列表命令"""
         verbose = '-v' in args or '--verbose' in args
+        from commands import list_tables
         return list_tables(self.client, verbose)
     
     def _handle_use(self, args: list):
@@ -101,6 +145,7 @@ class TeableCLI:
             return 1
         
         table_name = args[0]
+        from commands import use_table
         return use_table(self.client, self.session, table_name)
     
     def _handle_show(self, args: list):
@@ -110,18 +155,59 @@ class TeableCLI:
             print("使用: t use 表格名称")
             return 1
         
-        return show_current_table(self.client, self.session, args)
+        from commands import show_current_table
+        # 本地副本查询（--local）不需要创建客户端
+        client = None if '--local' in args else self.client
+        return show_current_table(client, self.session, args)
     
     def _handle_help(self, args: list):
         """处理帮助命令"""
+        from commands import show_help
         return show_help()
     
     def _handle_config(self, args: list):
         """处理配置命令"""
+        from commands import config_command
         return config_command(self.config, args)
     
+    def _handle_cache(self, args: list):
+        """处理缓存命令"""
+        from commands import cache_command
+        return cache_command(self.config, args)
+    
+    def _handle_daemon(self, args: list):
+        """处理常驻进程命令"""
+        from teable_daemon import daemon_command
+        return daemon_command(args)
+    
+    def _handle_exec(self, args: list):
+        """处理批量脚本命令"""
+        from commands.script import exec_command
+        return exec_command(self, args)
+    
+    def _handle_sync(self, args: list):
+        """处理本地副本同步命令"""
+        from commands import sync_command
+        return sync_command(self.client, self.session, args)
+    
+    def _handle_watch(self, args: list):
+        """处理变更订阅命令"""
+        from commands import watch_command
+        return watch_command(self.client, self.session, args)
+    
+    def _handle_export(self, args: list):
+        """处理数据导出命令"""
+        from commands import export_command
+        return export_command(self.client, self.session, args)
+    
+    def _handle_import(self, args: list):
+        """处理数据导入命令"""
+        from commands import import_command
+        return import_command(self.client, self.session, args)
+    
     def _handle_status(self, args: list):
         """处理状态命令"""
+        from commands import show_session_status
         return show_session_status(self.config, self.session)
     
     def _handle_insert(self, args: list):
@@ -135,6 +221,7 @@ class TeableCLI:
                 print("使用: t use 表格名称")
                 return 1
         
+        from commands import insert_record
         result = insert_record(self.client, self.session, args)
         # insert_record 返回 (状态码, 记录ID) 元组（非管道模式）或整数（管道模式）
         # 记录ID已经由 insert_record 输出到stdout（标准管道格式）
@@ -152,6 +239,7 @@ class TeableCLI:
             print("使用: t use 表格名称")
             return 1
         
+        from commands import update_record
         return update_record(self.client, self.session, args)
     
     def _handle_delete(self, args: list):
@@ -161,6 +249,7 @@ class TeableCLI:
             print("使用: t use 表格名称")
             return 1
         
+        from commands import delete_record
         return delete_record(self.client, self.session, args)
     
     def _handle_version(self, args: list):
@@ -176,6 +265,7 @@ class TeableCLI:
             return 1
         
         self._ensure_client()
+        from commands import alter_command
         return alter_command(self.client, self.session, args)
     
     def _handle_create(self, args: list):
@@ -186,6 +276,7 @@ class TeableCLI:
             return 1
         
         self._ensure_client()
+        from commands import create_table_command
         return create_table_command(self.client, self.session, args)
     
     def _handle_desc(self, args: list):
@@ -196,6 +287,7 @@ class TeableCLI:
             return 1
         
         self._ensure_client()
+        from commands import show_table_schema
         return show_table_schema(self.client, self.session, args)
     
     def _handle_drop(self, args: list):
@@ -211,26 +303,31 @@ class TeableCLI:
 
 
 # Click命令行接口
-@click.command()
+# 未知选项（如 --prefetch、--batch-size）原样传给各个命令自行解析
+@click.command(context_settings={'ignore_unknown_options': True})
 @click.argument('command', required=False)
 @click.argument('args', nargs=-1)
 @click.option('--interactive', '-i', is_flag=True, help='交互式模式')
-def main(command: Optional[str], args: tuple, interactive: bool):
+@click.option('--no-cache', is_flag=True, help='不使用表结构缓存')
+def main(command: Optional[str], args: tuple, interactive: bool, no_cache: bool):
     """Teable CLI - 命令行界面工具"""
     
-    cli = TeableCLI()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cli = TeableCLI(use_cache=not no_cache)
     
     if interactive:
         # 交互式模式
         from commands.interactive import run_interactive
-        return run_interactive(cli)
-    
-    if not command:
+        result = run_interactive(cli)
+    elif not command:
         # 没有命令，显示帮助
-        return cli.run_command('help', [])
+        result = cli.run_command('help', [])
+    else:
+        # 执行命令
+        result = cli.run_command(command, list(args))
     
-    # 执行命令
-    return cli.run_command(command, list(args))
+    # 命令的返回码作为进程退出码（click 默认忽略返回值），与常驻进程执行时一致
+    click.get_current_context().exit(result if isinstance(result, int) else 0)
 
 
 if __name__ == '__main__':
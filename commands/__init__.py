@@ -2,34 +2,45 @@
 # -*- coding: utf-8 -*-
 """
 命令模块
+
+命令函数在第一次使用时才导入所在的子模块（PEP 562 模块级 __getattr__），
+t version、t help 等简单命令不需要加载 requests/rich/tabulate。
 """
 
-from .base import (
-    show_help, config_command, show_session_status
-)
-
-from .table_common import (
-    list_tables, use_table, delete_record, show_table_schema
-)
-from .table_show import (
-    show_current_table
-)
-from .table_insert import (
-    insert_record
-)
-from .table_update import (
-    update_record
-)
-from .alter import (
-    alter_command
-)
-from .create import (
-    create_table_command
-)
-
-__all__ = [
-    'show_help', 'config_command', 'show_session_status',
-    'list_tables', 'use_table', 'show_current_table',
-    'insert_record', 'update_record', 'delete_record',
-    'alter_command', 'show_table_schema', 'create_table_command'
-]
+import importlib
+
+# 命令函数 -> 所在子模块
+_COMMANDS = {
+    'show_help': 'base',
+    'config_command': 'base',
+    'show_session_status': 'base',
+    'cache_command': 'base',
+    'list_tables': 'table_common',
+    'use_table': 'table_common',
+    'delete_record': 'table_common',
+    'show_table_schema': 'table_common',
+    'show_current_table': 'table_show',
+    'insert_record': 'table_insert',
+    'update_record': 'table_update',
+    'alter_command': 'alter',
+    'create_table_command': 'create',
+    'sync_command': 'sync',
+    'watch_command': 'watch',
+    'export_command': 'export',
+    'import_command': 'importer',
+}
+
+__all__ = list(_COMMANDS)
+
+
+def __getattr__(name):
+    module_name = _COMMANDS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -32,12 +32,54 @@ Teable CLI - 命令行界面工具
   fields    显示表格结构（同 desc）
   help      显示帮助信息
   status    显示会话状态
+  cache     管理表结构缓存（t cache clear 清除缓存）
+  exec      在同一进程中批量执行脚本中的命令
+  sync      同步表格到本地副本（t show --local 查询）
+  watch     持续输出新增或修改的记录（变更订阅）
+  export    导出表格到 CSV/JSONL/Parquet 文件
+  import    从 CSV/JSONL 文件批量导入记录
+  daemon    管理常驻进程（加速脚本中的频繁调用）
   version   显示版本信息
 
 配置命令:
   t config --token YOUR_TOKEN --base YOUR_BASE_ID
   t config --url https://app.teable.cn
 
+缓存命令:
+  t cache                 # 显示表结构缓存状态
+  t cache clear           # 清除表结构缓存
+  t --no-cache show       # 本次不使用表结构缓存
+
+批量脚本:
+  t exec 脚本.t [参数...]  # 逐行执行脚本，共享连接和表结构缓存
+  t exec -                # 从标准输入读取脚本
+  # 脚本中: id = insert 名称=x 捕获记录ID，${id} 引用，行尾 & 并发执行
+
+变更订阅:
+  t watch 状态=待指派 | t update 处理人=@创建人 状态=已指派  # 近实时处理新变化
+  t watch 状态=待处理 --since now --once   # 只输出启动后的变化，轮询一次后退出
+
+数据导出:
+  t export 订单 -o 订单.csv              # 按扩展名选择格式（.csv/.jsonl/.parquet，可加 .gz/.zst）
+  t export 订单 --format jsonl --gzip -o 订单.jsonl.gz  # 压缩输出
+  t export 订单 状态=已完成 -f 客户,金额 --format parquet -o 订单.parquet
+
+数据导入:
+  t import 订单.csv --to 订单            # 按列名映射字段，并发批量插入
+  t import 订单.jsonl.gz --to 订单 状态=待处理 客户=@客户名称  # 常量值和列映射
+  # 不合法的行写入 订单.csv.rejected.csv（--reject 文件 指定），修正后重新导入
+
+本地副本:
+  t sync [表名...]        # 同步到本地 SQLite 副本（首次全量，之后增量）
+  t sync --full           # 重新全量同步
+  t sync --prune          # 增量同步并比对删除
+  t show --local 状态=待处理 order=金额:desc  # 在本地副本上查询，不访问服务器
+
+常驻进程:
+  t daemon start          # 后台启动常驻进程，之后的 t 命令自动转发执行
+  t daemon status         # 查看常驻进程状态
+  t daemon stop           # 停止常驻进程
+
 表格操作:
   t ls                    # 列出所有表格
   t ls -v                 # 显示详细信息
@@ -55,6 +97,7 @@ Teable CLI - 命令行界面工具
   t show -w 优先级=高 | head -10 | t update 处理人=张三  # 查询前10条并更新
   t show -w 状态=已取消 | t delete                    # 查询并删除
   t show -w 状态=已完成 | t insert --to-table 备份表    # 数据复制
+  t show --pipe-format ndjson > 订单.ndjson          # 管道格式: text|ndjson|msgpack（默认自动）
 
 示例:
   # 配置连接
@@ -87,6 +130,7 @@ Teable CLI - 命令行界面工具
   # 删除数据
   t delete rec123
   t show -w 状态=已取消 | t delete                    # 批量删除查询结果
+  t show -w 状态=已取消 | t delete --yes --concurrency 4  # 跳过确认，并发批量删除
 
 更多信息:
   使用 't help' 显示此帮助信息
@@ -144,6 +188,28 @@ def config_command(config, args: List[str]):
     return 0
 
 
+def cache_command(config, args: List[str]):
+    """处理缓存命令"""
+    from schema_cache import clear_all
+    
+    if args and args[0] == 'clear':
+        count = clear_all(config.cache_dir)
+        print(f"已清除表结构缓存（{count} 个缓存文件）")
+        return 0
+    
+    if args:
+        print(f"错误: 未知选项 '{args[0]}'")
+        print("使用: t cache [clear]")
+        return 1
+    
+    # 显示缓存状态
+    cache_files = list(config.cache_dir.rglob('*.json')) if config.cache_dir.exists() else []
+    print(f"缓存目录: {config.cache_dir}")
+    print(f"缓存有效期: {config.get('schema_cache_ttl', 300)} 秒")
+    print(f"缓存文件数: {len(cache_files)}")
+    return 0
+
+
 def show_session_status(config, session):
     """显示会话状态"""
     print("=== Teable CLI 状态 ===")
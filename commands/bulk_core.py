@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teable CLI 批量操作核心组件
+提供批次大小控制、按时限刷新的批次读取、后台预读、并发批次写入、进度统计和断点续传等批量写入功能
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Teable 单次请求最多处理的记录数
+MAX_BATCH_SIZE = 1000
+# 默认批次大小（小批次，快速响应）
+DEFAULT_BATCH_SIZE = 10
+# 自适应模式的初始批次大小
+ADAPTIVE_INITIAL_BATCH_SIZE = 50
+# 自适应模式的单批延迟目标（秒）
+DEFAULT_LATENCY_TARGET = 2.0
+# 批次未满时最长等待时间（秒），超时即刷新，保证交互式管道及时响应
+DEFAULT_FLUSH_INTERVAL = 2.0
+# 并发写入的最大并发批次数
+MAX_CONCURRENCY = 32
+
+
+class BatchSizer:
+    """批次大小控制器
+
+    固定模式下始终使用指定的批次大小；自适应模式下，批次请求耗时低于延迟目标的一半时
+    批次大小翻倍（不超过服务器单次记录上限），超过延迟目标或遇到 413/超时错误时减半。
+    """
+
+    def __init__(self, size: int = DEFAULT_BATCH_SIZE, adaptive: bool = False,
+                 max_size: int = MAX_BATCH_SIZE, min_size: int = 1,
+                 latency_target: float = DEFAULT_LATENCY_TARGET):
+        self.adaptive = adaptive
+        self.max_size = max_size
+        self.min_size = min_size
+        self.latency_target = latency_target
+        self._size = max(min_size, min(size, max_size))
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """当前批次大小"""
+        return self._size
+
+    def record_success(self, count: int, elapsed: float):
+        """记录一次成功的批次请求，自适应模式下据此调整批次大小"""
+        if not self.adaptive:
+            return
+        with self._lock:
+            if elapsed > self.latency_target:
+                self._shrink()
+            elif elapsed < self.latency_target / 2 and count >= self._size:
+                new_size = min(self.max_size, self._size * 2)
+                if new_size != self._size:
+                    logger.info(f"批次耗时 {elapsed:.2f}s，批次大小调整为 {new_size}")
+                    self._size = new_size
+
+    def record_failure(self, error: Exception):
+        """记录一次失败的批次请求，413 或超时会缩小批次（固定模式下也生效）"""
+        if is_payload_too_large(error) or is_timeout(error):
+            with self._lock:
+                self._shrink()
+
+    def _shrink(self):
+        new_size = max(self.min_size, self._size // 2)
+        if new_size != self._size:
+            logger.info(f"批次大小调整为 {new_size}")
+            self._size = new_size
+
+
+def parse_bulk_options(args: list):
+    """从参数列表中提取批量操作选项，返回(选项字典, 剩余参数)
+
+    支持的选项:
+        --batch-size N|auto   批次大小，auto 表示自适应
+        --flush-interval 秒   批次未满时的最长等待时间
+        --concurrency N|auto  同时处理的批次数，auto 表示由客户端的自适应并发上限决定
+        --ordered             并发时按输入顺序输出结果
+    """
+    from .table_common import _extract_option
+
+    batch_size, args = _extract_option(args, '--batch-size')
+    flush_interval, args = _extract_option(args, '--flush-interval')
+    concurrency, args = _extract_option(args, '--concurrency')
+    ordered, args = _extract_option(args, '--ordered', flag=True)
+
+    options = {
+        'batch_size': None,
+        'adaptive': False,
+        'flush_interval': DEFAULT_FLUSH_INTERVAL,
+        'concurrency': 1,
+        'adaptive_concurrency': False,
+        'ordered': bool(ordered),
+    }
+
+    if batch_size is not None:
+        if str(batch_size).lower() == 'auto':
+            options['adaptive'] = True
+            options['batch_size'] = ADAPTIVE_INITIAL_BATCH_SIZE
+        else:
+            try:
+                options['batch_size'] = max(1, min(int(batch_size), MAX_BATCH_SIZE))
+            except ValueError:
+                print(f"警告: 无效的batch-size值 '{batch_size}'，使用默认批次大小", file=sys.stderr)
+
+    if flush_interval is not None:
+        try:
+            options['flush_interval'] = max(0.0, float(flush_interval))
+        except ValueError:
+            print(f"警告: 无效的flush-interval值 '{flush_interval}'，使用默认值 {DEFAULT_FLUSH_INTERVAL}",
+                  file=sys.stderr)
+
+    if concurrency is not None and str(concurrency).lower() == 'auto':
+        # 工作线程数取上限，实际在途请求数由 TeableClient 的 AIMD 限制器控制
+        options['concurrency'] = MAX_CONCURRENCY
+        options['adaptive_concurrency'] = True
+    elif concurrency is not None:
+        try:
+            options['concurrency'] = max(1, min(int(concurrency), MAX_CONCURRENCY))
+        except ValueError:
+            print(f"警告: 无效的concurrency值 '{concurrency}'，使用默认值 1", file=sys.stderr)
+
+    return options, args
+
+
+def make_batch_sizer(options: Dict[str, Any], default_size: int = DEFAULT_BATCH_SIZE) -> BatchSizer:
+    """根据批量操作选项创建批次大小控制器，未指定 --batch-size 时使用 default_size"""
+    return BatchSizer(size=options['batch_size'] or default_size, adaptive=options['adaptive'])
+
+
+def describe_batch_size(sizer: BatchSizer) -> str:
+    """批次大小的可读描述，用于进度信息"""
+    if sizer.adaptive:
+        return f"自适应批次（初始{sizer.size}条，上限{sizer.max_size}条）"
+    return f"每批{sizer.size}条记录"
+
+
+def describe_concurrency(options: Dict[str, Any]) -> str:
+    """并发设置的可读描述，用于进度信息"""
+    if options.get('concurrency', 1) <= 1:
+        return ""
+    order = "，按输入顺序输出" if options.get('ordered') else ""
+    if options.get('adaptive_concurrency'):
+        return f"，自适应并发{order}"
+    return f"，{options['concurrency']} 个批次并发{order}"
+
+
+def is_payload_too_large(error: Exception) -> bool:
+    """是否为请求体过大错误（HTTP 413）"""
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code == 413
+
+
+def is_timeout(error: Exception) -> bool:
+    """是否为请求超时错误"""
+    return isinstance(error, requests.exceptions.Timeout)
+
+
+def send_batch(send: Callable[[List[Any]], List[Any]], items: List[Any],
+               sizer: Optional[BatchSizer] = None) -> List[Any]:
+    """发送一个批次，遇到 413 时拆成两半重试
+
+    Args:
+        send: 发送函数，接收一个批次，返回结果列表
+        items: 批次内容
+        sizer: 批次大小控制器（用于记录耗时和失败）
+
+    Returns:
+        所有子批次结果的合并列表
+    """
+    start = time.monotonic()
+    try:
+        results = send(items)
+    except Exception as e:
+        if sizer:
+            sizer.record_failure(e)
+        # 413 表示服务器拒绝了整个请求，拆分重试是安全的
+        if is_payload_too_large(e) and len(items) > 1:
+            middle = len(items) // 2
+            logger.warning(f"批次过大(413)，拆分为 {middle} + {len(items) - middle} 条重试")
+            return send_batch(send, items[:middle], sizer) + send_batch(send, items[middle:], sizer)
+        raise
+    if sizer:
+        sizer.record_success(len(items), time.monotonic() - start)
+    return results
+
+
+_END = object()
+
+
+def read_batches(records: Iterable[Any], sizer: BatchSizer,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> Iterator[List[Any]]:
+    """将记录流切分为批次
+
+    后台线程读取记录，主线程按批次大小收集；批次未满但距第一条记录已超过
+    flush_interval 秒时也立即产出，避免上游输出缓慢时记录长时间滞留。
+    用户中断（Ctrl+C）时先产出已读取的记录，调用方处理完这最后一个批次后
+    再重新抛出 KeyboardInterrupt，调用方据此区分中断和正常读完。
+
+    Args:
+        records: 记录迭代器（通常为解析后的管道记录）
+        sizer: 批次大小控制器，每个批次开始时读取当前批次大小
+        flush_interval: 批次未满时的最长等待时间（秒）
+
+    Yields:
+        记录列表
+    """
+    buffer = queue.Queue(maxsize=MAX_BATCH_SIZE * 2)
+
+    def reader():
+        try:
+            for record in records:
+                if record is not None:
+                    buffer.put(record)
+        except Exception as e:
+            buffer.put(e)
+        buffer.put(_END)
+
+    batch = []
+    deadline = None
+    try:
+        threading.Thread(target=reader, daemon=True).start()
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = buffer.get(timeout=timeout)
+            except queue.Empty:
+                # 到达刷新时限，产出未满的批次
+                yield batch
+                batch, deadline = [], None
+                continue
+
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + flush_interval
+            if len(batch) >= sizer.size:
+                yield batch
+                batch, deadline = [], None
+    except KeyboardInterrupt:
+        print(f"\n用户中断，正在处理剩余记录...", file=sys.stderr)
+        # 已经读入队列的记录也要处理，不再等待上游
+        while True:
+            try:
+                item = buffer.get_nowait()
+            except queue.Empty:
+                break
+            if item is _END or isinstance(item, Exception):
+                break
+            batch.append(item)
+        for index in range(0, len(batch), sizer.size):
+            yield batch[index:index + sizer.size]
+        raise
+
+    if batch:
+        yield batch
+
+
+def iter_in_background(items: Iterable[Any], maxsize: int) -> Iterator[Any]:
+    """在后台线程中预先读取迭代器，最多缓存 maxsize 个元素
+
+    用于把流水线的相邻阶段（如分页读取和数据转换）放到不同线程并行执行；
+    队列已满时后台线程阻塞，上游读取不会无限领先于下游。
+
+    Args:
+        items: 上游迭代器（通常为分页读取）
+        maxsize: 队列容量
+
+    Yields:
+        上游迭代器的元素，顺序不变
+    """
+    buffer = queue.Queue(maxsize=max(1, maxsize))
+
+    def reader():
+        try:
+            for item in items:
+                buffer.put((item, None))
+        except Exception as e:
+            buffer.put((_END, e))
+            return
+        buffer.put((_END, None))
+
+    threading.Thread(target=reader, daemon=True).start()
+
+    while True:
+        item, error = buffer.get()
+        if error is not None:
+            raise error
+        if item is _END:
+            return
+        yield item
+
+
+def run_batches(batches: Iterable[List[Any]], process: Callable[[List[Any]], Any],
+                concurrency: int = 1, ordered: bool = False) -> Iterator[Tuple[List[Any], Any]]:
+    """并发处理批次
+
+    最多 concurrency 个批次同时在途；在途批次已满时不再从 batches 取新批次，
+    上游读取随之阻塞（背压），内存占用保持有界。
+
+    Args:
+        batches: 批次迭代器（通常来自 read_batches）
+        process: 批次处理函数，在工作线程中执行
+        concurrency: 同时在途的批次数，1 表示顺序处理
+        ordered: 是否按输入顺序产出结果；否则按完成顺序产出
+
+    Yields:
+        (批次, 处理结果) 元组
+
+    batches 抛出 KeyboardInterrupt 时，先产出所有在途批次的结果再重新抛出，
+    已提交的批次不会丢失结果。
+    """
+    if concurrency <= 1:
+        for batch in batches:
+            yield batch, process(batch)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    try:
+        try:
+            for batch in batches:
+                pending.append((batch, executor.submit(process, batch)))
+                # 在途批次已满，先等待至少一个批次完成
+                if len(pending) >= concurrency:
+                    yield from _collect_finished(pending, ordered)
+        except KeyboardInterrupt:
+            # 用户中断读取：在途批次已经发出，等待它们完成并产出结果后再抛出
+            while pending:
+                yield from _collect_finished(pending, ordered)
+            raise
+
+        # 输入结束，处理剩余的在途批次
+        while pending:
+            yield from _collect_finished(pending, ordered)
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _collect_finished(pending: deque, ordered: bool):
+    """等待并取出已完成的批次：有序模式取最早提交的批次，否则取所有已完成的批次"""
+    if ordered:
+        # 等待完成后才出队：等待时用户中断，该批次仍在 pending 中，随后按顺序产出
+        batch, future = pending[0]
+        result = future.result()
+        pending.popleft()
+        yield batch, result
+        return
+    wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+    for item in [item for item in pending if item[1].done()]:
+        pending.remove(item)
+        yield item[0], item[1].result()
+
+
+class ProgressMeter:
+    """进度和吞吐量统计，每处理 every 条记录输出一次进度"""
+
+    def __init__(self, label: str, every: int = 1000, stream: Optional[TextIO] = None):
+        self.label = label
+        self.every = every
+        self.stream = stream
+        self.count = 0
+        self.start = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """每秒处理的记录数"""
+        elapsed = time.monotonic() - self.start
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def add(self, count: int):
+        """累加处理数量，跨过 every 的整数倍时输出进度"""
+        previous = self.count
+        self.count += count
+        if self.every and self.count // self.every > previous // self.every:
+            print(f"{self.label}: 已处理 {self.count} 条记录，{self.rate:.0f} 条/秒",
+                  file=self.stream or sys.stdout, flush=True)
+
+    def describe(self) -> str:
+        """耗时和平均吞吐量的可读描述"""
+        elapsed = time.monotonic() - self.start
+        return f"耗时 {elapsed:.1f} 秒，平均 {self.rate:.0f} 条/秒"
+
+
+class Checkpoint:
+    """断点文件，用于长时间批量操作中断后续传
+
+    文件保存在 ~/.teable/checkpoints/ 下，文件名由操作的关键参数（命令、表格、条件等）
+    计算得到，相同的命令再次执行时找到同一个断点。
+    """
+
+    def __init__(self, directory: Path, *key_parts: Any):
+        digest = hashlib.sha1(json.dumps(key_parts, ensure_ascii=False, sort_keys=True,
+                                         default=str).encode('utf-8')).hexdigest()[:16]
+        self.path = Path(directory) / f"{digest}.json"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取断点状态，不存在或损坏时返回None"""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"断点文件读取失败，忽略: {e}")
+            return None
+
+    def save(self, state: Dict[str, Any]):
+        """保存断点状态（先写临时文件再替换，中断时不会留下半个文件）"""
+        state = dict(state, saved_at=time.time())
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except IOError as e:
+            logger.warning(f"断点文件保存失败: {e}")
+
+    def clear(self):
+        """操作完成后删除断点"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+写入计划（TableCodec）
+
+管道 insert/update 的字段映射（目标字段=@源字段 / 目标字段=常量）在命令开始时按表结构编译一次：
+确定实际写入的目标字段、每个字段的值转换函数、关联字段的处理方式和写入键（字段名或字段ID），
+常量值预先转换。之后每条记录只按编译结果取值和转换，不再查找字段信息、检查可编辑性或按类型分派。
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+from .table_common import LinkResolver, is_field_editable, field_value_converter
+
+logger = logging.getLogger(__name__)
+
+# 不能写入的系统字段名
+SYSTEM_FIELD_NAMES = {'id', 'createdTime', 'updatedTime', 'createdBy', 'updatedBy'}
+# 一对多、多对多关联字段的值是记录列表
+MULTIPLE_LINK_RELATIONSHIPS = {'manyMany', 'oneMany'}
+# 源字段为管道记录的记录ID（@id）
+RECORD_ID = object()
+# 关联字段映射的是常量值
+CONSTANT = object()
+# 管道记录中不存在的字段
+_MISSING = object()
+
+
+class TableCodec:
+    """一个表格的写入计划，把管道记录转换为 insert/update 的字段数据
+
+    Args:
+        fields: 目标表字段列表（get_table_fields）
+        link_fields: 关联字段信息（detect_link_fields）
+        mappings: 字段映射，{目标字段: {'type': 'field_mapping', 'source_field': 源字段}
+            或 {'type': 'constant', 'value': 常量}}
+        field_key: 写入数据的键，'name' 使用字段名，'id' 使用字段ID
+    """
+
+    def __init__(self, fields: List[Dict[str, Any]], link_fields: Dict[str, Dict[str, Any]],
+                 mappings: Dict[str, Dict[str, Any]], field_key: str = 'name'):
+        self.mappings = mappings
+        self.link_fields = link_fields
+        self.use_field_ids = field_key == 'id'
+        self.target_fields: List[str] = []
+        # 普通字段映射: (写入键, 目标字段, 源字段, 转换函数)
+        self.mapped: List[Tuple[str, str, Any, Callable[[Any], Any]]] = []
+        # 关联字段: (写入键, 目标字段, 源字段, 常量值, 是否多值)
+        self.links: List[Tuple[str, str, Any, Any, bool]] = []
+        # 预先转换好的常量字段
+        self.constants: Dict[str, Any] = {}
+
+        field_map = {field.get('name'): field for field in fields}
+        for target, mapping in mappings.items():
+            field = field_map.get(target)
+            if field is None:
+                logger.warning(f"目标字段 '{target}' 不存在，跳过")
+                continue
+            if target in SYSTEM_FIELD_NAMES or not is_field_editable(field):
+                logger.debug(f"跳过不可编辑字段 '{target}'")
+                continue
+            self.target_fields.append(target)
+
+            key = field.get('id', target) if self.use_field_ids else target
+            if mapping['type'] == 'constant':
+                source = CONSTANT
+            elif mapping['source_field'] in ('id', '@id'):
+                source = RECORD_ID
+            else:
+                source = mapping['source_field']
+
+            if target in link_fields:
+                multiple = link_fields[target].get('relationship', 'manyOne') in MULTIPLE_LINK_RELATIONSHIPS
+                self.links.append((key, target, source, mapping.get('value'), multiple))
+                continue
+
+            convert = field_value_converter(field.get('type', 'singleLineText'))
+            if source is CONSTANT:
+                self.constants[key] = convert(mapping['value'])
+            else:
+                self.mapped.append((key, target, source, convert))
+
+    def prefetch(self, records: List[Dict[str, Any]], link_resolver: LinkResolver):
+        """批次内的关联值去重后一次查询解析"""
+        if self.links:
+            link_resolver.prefetch_for_mappings(records, self.mappings)
+
+    def encode(self, record: Dict[str, Any], link_resolver: Optional[LinkResolver] = None) -> Dict[str, Any]:
+        """管道记录 -> 写入的字段数据，没有可写入的字段时返回空字典"""
+        pipe_fields = record.get('fields', {})
+        data = dict(self.constants)
+        for key, target, source, convert in self.mapped:
+            if source is RECORD_ID:
+                value = record.get('id') or _MISSING
+            else:
+                value = pipe_fields.get(source, _MISSING)
+            if value is _MISSING:
+                logger.warning(f"管道记录中不存在字段 '{source if source is not RECORD_ID else 'id'}'，"
+                               f"跳过字段 '{target}'")
+                continue
+            data[key] = convert(value)
+
+        for key, target, source, constant, multiple in self.links:
+            if source is CONSTANT:
+                value = constant
+            elif source is RECORD_ID:
+                value = record.get('id', '')
+            else:
+                value = pipe_fields.get(source, _MISSING)
+                if value is _MISSING:
+                    logger.warning(f"管道记录中不存在字段 '{source}'，跳过字段 '{target}'")
+                    continue
+            linked_record_id = link_resolver.resolve(target, value) if link_resolver else None
+            if not linked_record_id:
+                logger.warning(f"关联字段 '{target}' 处理失败，跳过")
+                continue
+            data[key] = [{'id': linked_record_id}] if multiple else {'id': linked_record_id}
+        return data
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据导出命令（t export）
+
+分页并行预取（skip/take），读取和编码写出在不同线程重叠进行，按页写出，
+内存占用只与预取页数和 Parquet 行组大小有关，与表格大小无关。
+支持 CSV、JSONL 和 Parquet（需要安装 pyarrow），可以用 gzip/zstd 压缩（zstd 需要安装 zstandard）。
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import gzip
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from .bulk_core import iter_in_background, ProgressMeter
+from .pipe_core import pipe_value_text
+from .replica_core import NUMERIC_FIELD_TYPES, BOOLEAN_FIELD_TYPES, DATE_FIELD_TYPES
+from .table_common import (
+    _extract_option,
+    _parse_where_conditions_with_mapping,
+    _build_filter_set_from_conditions
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+# 导出的分页大小（Teable 单次查询上限）
+EXPORT_PAGE_SIZE = 1000
+# 读取线程最多领先写出线程的页数
+EXPORT_QUEUE_PAGES = 8
+# 输出文件缓冲区大小
+EXPORT_BUFFER_SIZE = 1024 * 1024
+# Parquet 每个行组的记录数（写出前在内存中累积的最大记录数）
+PARQUET_ROW_GROUP_SIZE = 50000
+# 每导出多少条记录输出一次进度
+EXPORT_PROGRESS_EVERY = 10000
+# 按整数导出的字段类型（其余数值类型按浮点数导出）
+INTEGER_FIELD_TYPES = {'autoNumber', 'rating'}
+# 文件扩展名 -> 格式/压缩方式
+FORMAT_EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet'}
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _load_zstandard():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def guess_format(path: Optional[str]):
+    """根据输出文件扩展名推断 (格式, 压缩方式)，无法推断时返回 (None, None)"""
+    if not path:
+        return None, None
+    root, ext = os.path.splitext(path.lower())
+    compression = COMPRESSION_EXTENSIONS.get(ext)
+    if compression:
+        root, ext = os.path.splitext(root)
+    return FORMAT_EXTENSIONS.get(ext), compression
+
+
+def _text_value(value: Any) -> str:
+    """CSV 单元格：数组/对象转为文本，布尔值转为 true/false"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return ''
+    return pipe_value_text(value)
+
+
+def _open_output(path: Optional[str], compression: Optional[str]):
+    """打开带缓冲的二进制输出流，返回 (流, 关闭函数)"""
+    if path:
+        raw = open(path, 'wb', buffering=EXPORT_BUFFER_SIZE)
+    else:
+        raw = sys.stdout.buffer
+
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+    elif compression == 'zstd':
+        zstandard = _load_zstandard()
+        stream = zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(raw, closefd=False)
+    else:
+        stream = raw
+
+    def close():
+        if stream is not raw:
+            stream.close()
+        raw.flush()
+        if path:
+            raw.close()
+
+    return stream, close
+
+
+class CsvExporter:
+    """CSV：第一行为表头（id + 字段名），数组/关联字段值转为逗号分隔的文本"""
+
+    def __init__(self, stream, fields: List[Dict[str, Any]]):
+        # utf-8-sig 让 Excel 正确识别中文
+        self.text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='', write_through=False)
+        self.names = [field['name'] for field in fields]
+        self.writer = csv.writer(self.text)
+        self.writer.writerow(['id'] + self.names)
+
+    def write_page(self, records: List[Dict[str, Any]]):
+        names = self.names
+        self.writer.writerows(
+            [record.get('id', '')] + [_text_value(record.get('fields', {}).get(name)) for name in names]
+            for record in records
+        )
+
+    def close(self):
+        self.text.flush()
+        self.text.detach()
+
+
+class JsonlExporter:
+    """JSONL：每行一条 {"id", "fields"} 记录（与 ndjson 管道格式相同，字段值保持原始类型）"""
+
+    def __init__(self, stream, fields: List[Dict[str, Any]]):
+        self.stream = stream
+        self.names = set(field['name'] for field in fields)
+
+    def write_page(self, records: List[Dict[str, Any]]):
+        names = self.names
+        lines = [json.dumps({'id': record.get('id', ''),
+                             'fields': {name: value for name, value in record.get('fields', {}).items()
+                                        if name in names}},
+                            ensure_ascii=False, separators=(',', ':'))
+                 for record in records]
+        self.stream.write(('\n'.join(lines) + '\n').encode('utf-8'))
+
+    def close(self):
+        pass
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('true', '1', 'yes', '是')
+
+
+def _to_text_list(value: Any) -> Optional[List[str]]:
+    if value is None:
+        return None
+    items = value if isinstance(value, list) else [value]
+    return [pipe_value_text(item) for item in items]
+
+
+def _to_text(value: Any) -> Optional[str]:
+    return None if value is None else pipe_value_text(value)
+
+
+class ParquetExporter:
+    """Parquet：按字段类型生成带类型的列，每 PARQUET_ROW_GROUP_SIZE 条记录写出一个行组"""
+
+    def __init__(self, stream, fields: List[Dict[str, Any]], compression: Optional[str] = None,
+                 row_group_size: int = PARQUET_ROW_GROUP_SIZE):
+        pa = self.pa = _load_pyarrow()
+        self.row_group_size = row_group_size
+        self.columns = [('id', pa.string(), _to_text)]
+        for field in fields:
+            field_type = field.get('type', '')
+            if field_type in INTEGER_FIELD_TYPES:
+                column = (pa.int64(), _to_int)
+            elif field_type in NUMERIC_FIELD_TYPES:
+                column = (pa.float64(), _to_float)
+            elif field_type in BOOLEAN_FIELD_TYPES:
+                column = (pa.bool_(), _to_bool)
+            elif field_type in DATE_FIELD_TYPES:
+                column = (pa.timestamp('ms', tz='UTC'), _parse_timestamp)
+            elif field_type == 'multipleSelect':
+                column = (pa.list_(pa.string()), _to_text_list)
+            else:
+                # 文本、单选、关联、用户、附件等按文本导出（结构化值转为逗号分隔的文本）
+                column = (pa.string(), _to_text)
+            self.columns.append((field['name'],) + column)
+        self.schema = pa.schema([(name, pa_type) for name, pa_type, _ in self.columns])
+        # Parquet 在文件内部按列压缩，--gzip/--zstd 选择列压缩算法
+        self.writer = pa.parquet.ParquetWriter(stream, self.schema, compression=compression or 'snappy')
+        self.pending = []
+
+    def write_page(self, records: List[Dict[str, Any]]):
+        self.pending.extend(records)
+        if len(self.pending) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        records, self.pending = self.pending, []
+        pa = self.pa
+        arrays = [pa.array([record.get('id') for record in records], type=pa.string())]
+        for name, pa_type, convert in self.columns[1:]:
+            arrays.append(pa.array([convert(record.get('fields', {}).get(name)) for record in records],
+                                   type=pa_type))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema),
+                                row_group_size=len(records))
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def export_command(client, session, args: list):
+    """t export [表名] [条件...] [--format csv|jsonl|parquet] [--gzip|--zstd] [-o 文件]
+    [-f 字段1,字段2] [--prefetch K]"""
+    if not client:
+        print("错误: 无法连接到Teable服务", file=sys.stderr)
+        return 1
+
+    output, args = _extract_option(args, '-o', '--output')
+    export_format, args = _extract_option(args, '--format')
+    use_gzip, args = _extract_option(args, '--gzip', flag=True)
+    use_zstd, args = _extract_option(args, '--zstd', flag=True)
+    selected, args = _extract_option(args, '-f', '--fields')
+    prefetch, args = _extract_option(args, '--prefetch', default='auto')
+
+    guessed_format, guessed_compression = guess_format(output)
+    export_format = (export_format or guessed_format or 'csv').lower()
+    compression = 'gzip' if use_gzip else 'zstd' if use_zstd else guessed_compression
+    if export_format not in EXPORT_FORMATS:
+        print(f"错误: 不支持的导出格式 '{export_format}'（可选: {', '.join(EXPORT_FORMATS)}）", file=sys.stderr)
+        return 1
+    if use_gzip and use_zstd:
+        print("错误: --gzip 和 --zstd 只能指定一个", file=sys.stderr)
+        return 1
+    if export_format == 'parquet':
+        if not output:
+            print("错误: Parquet 格式需要用 -o 指定输出文件", file=sys.stderr)
+            return 1
+        if _load_pyarrow() is None:
+            print("错误: 导出 Parquet 需要安装 pyarrow: pip install \"teable-cli[parquet]\"", file=sys.stderr)
+            return 1
+    elif compression == 'zstd' and _load_zstandard() is None:
+        print("错误: zstd 压缩需要安装 zstandard: pip install \"teable-cli[zstd]\"", file=sys.stderr)
+        return 1
+    try:
+        prefetch = client.limiter.max_limit if str(prefetch).lower() == 'auto' else max(1, int(prefetch))
+    except (TypeError, ValueError):
+        print(f"错误: 无效的prefetch值 '{prefetch}'", file=sys.stderr)
+        return 1
+
+    try:
+        # 第一个参数不是条件时作为表名
+        table_id = session.get_current_table_id()
+        table_name = session.get_current_table()
+        if args and args[0].lower() != 'where' and not any(op in args[0] for op in ('=', '>', '<', 'like')):
+            table_name = args[0]
+            args = args[1:]
+            table_id = next((table.get('id') for table in client.get_tables()
+                             if table.get('name') == table_name), None)
+            if not table_id:
+                print(f"错误: 表格 '{table_name}' 不存在", file=sys.stderr)
+                return 1
+        if not table_id:
+            print("错误: 请指定表格名称或先选择表格", file=sys.stderr)
+            print("使用: t export 表格名称 --format csv -o 文件", file=sys.stderr)
+            return 1
+
+        fields = client.get_table_fields(table_id)
+        query_params = {}
+        if selected:
+            names = [name.strip() for name in selected.split(',') if name.strip()]
+            missing = [name for name in names if name not in {f.get('name') for f in fields}]
+            if missing:
+                print(f"错误: 字段不存在: {', '.join(missing)}", file=sys.stderr)
+                return 1
+            fields = sorted((f for f in fields if f.get('name') in names), key=lambda f: names.index(f['name']))
+            # 只下载导出的字段
+            query_params['projection'] = names
+
+        conditions = _parse_where_conditions_with_mapping([arg for arg in args if arg.lower() != 'where'])
+        if any(condition['type'] != 'constant' for condition in conditions):
+            print("错误: t export 的条件不支持 @字段名", file=sys.stderr)
+            return 1
+        filter_set = _build_filter_set_from_conditions(conditions)
+        if filter_set:
+            query_params['filter'] = json.dumps({"conjunction": "and", "filterSet": filter_set})
+
+        # 先写临时文件，完成后再替换，定时任务不会读到写了一半的文件
+        tmp_path = f"{output}.{os.getpid()}.tmp" if output else None
+        stream, close_output = _open_output(tmp_path, None if export_format == 'parquet' else compression)
+        try:
+            if export_format == 'csv':
+                exporter = CsvExporter(stream, fields)
+            elif export_format == 'jsonl':
+                exporter = JsonlExporter(stream, fields)
+            else:
+                exporter = ParquetExporter(stream, fields, compression=compression)
+
+            target = output or '标准输出'
+            print(f"导出 '{table_name}' → {target}（{export_format}"
+                  f"{', ' + compression if compression else ''}，同时预取 {prefetch} 页）...", file=sys.stderr)
+            meter = ProgressMeter("导出进度", every=EXPORT_PROGRESS_EVERY, stream=sys.stderr)
+            pages = client.iter_record_pages(table_id, page_size=EXPORT_PAGE_SIZE, prefetch=prefetch,
+                                             **query_params)
+            # 分页读取在后台线程中进行，与编码、压缩和写文件重叠
+            for records in iter_in_background(pages, EXPORT_QUEUE_PAGES):
+                exporter.write_page(records)
+                meter.add(len(records))
+            exporter.close()
+        finally:
+            close_output()
+    except (Exception, KeyboardInterrupt) as e:
+        if output and os.path.exists(f"{output}.{os.getpid()}.tmp"):
+            os.unlink(f"{output}.{os.getpid()}.tmp")
+        if isinstance(e, KeyboardInterrupt):
+            print("\n导出已中断", file=sys.stderr)
+            return 1
+        logger.error(f"导出失败: {e}", exc_info=True)
+        print(f"错误: 导出失败: {e}", file=sys.stderr)
+        return 1
+
+    if output:
+        os.replace(tmp_path, output)
+    print(f"✅ 导出完成: {meter.count} 条记录 → {target}（{meter.describe()}）", file=sys.stderr)
+    return 0
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据导入命令（t import）
+
+流水线执行：读取线程按 1MB 缓冲读取并解析文件，按表结构预先生成的字段转换器转换和校验每一行；
+校验通过的行按批次并发调用 insert_records 写入，在途批次数由客户端的自适应并发上限控制。
+相邻阶段之间是有界队列，内存占用不随文件大小增长。
+无法转换、校验失败或被服务器拒绝的行写入拒绝文件（原始内容 + 行号 + 错误原因），修正后可以重新导入。
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import gzip
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple
+
+from .bulk_core import (
+    parse_bulk_options, make_batch_sizer, describe_batch_size, describe_concurrency,
+    send_batch, is_payload_too_large, read_batches, run_batches, ProgressMeter, MAX_CONCURRENCY
+)
+from .export import guess_format, _load_zstandard
+from .pipe_core import pipe_value_text
+from .table_common import (
+    _extract_option, detect_link_fields, is_field_editable, is_field_required, LinkResolver
+)
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+# 未指定 --batch-size 时的插入批次大小
+IMPORT_DEFAULT_BATCH_SIZE = 500
+# 输入文件缓冲区大小
+IMPORT_BUFFER_SIZE = 1024 * 1024
+# 每导入多少条记录输出一次进度
+IMPORT_PROGRESS_EVERY = 10000
+# 服务器自动生成值的字段类型，导入时忽略对应的列
+COMPUTED_FIELD_TYPES = {'autoNumber', 'createdTime', 'lastModifiedTime', 'createdBy',
+                        'lastModifiedBy', 'rollup', 'formula'}
+# 无法从文本导入的字段类型
+UNSUPPORTED_FIELD_TYPES = {'attachment'}
+# 拒绝文件中附加的列
+REJECT_LINE_COLUMN = '_行号'
+REJECT_ERROR_COLUMN = '_错误'
+# 这些状态码表示批次中有记录不合法，拆分批次找出具体的行
+ROW_ERROR_STATUS_CODES = {400, 422}
+# 布尔值文本
+TRUE_TEXTS = {'true', '1', 'yes', 'y', '是', '√'}
+FALSE_TEXTS = {'false', '0', 'no', 'n', '否', ''}
+
+
+class RowError(ValueError):
+    """一行数据无法转换或校验失败
+
+    raw 为无法解析的原始行（JSON 解析失败等，字节串），写入拒绝文件时原样保留。
+    """
+
+    def __init__(self, message: str, raw: Optional[bytes] = None):
+        super().__init__(message)
+        self.raw = raw
+
+
+# ---------- 字段转换器 ----------
+
+def _text(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else pipe_value_text(value)
+
+
+def _convert_number(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(_text(value).replace(',', ''))
+    except ValueError:
+        raise RowError(f"不是有效的数字: {value}")
+
+
+def _convert_integer(value: Any) -> int:
+    number = _convert_number(value)
+    if number != int(number):
+        raise RowError(f"不是有效的整数: {value}")
+    return int(number)
+
+
+def _convert_checkbox(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = _text(value).lower()
+    if text in TRUE_TEXTS:
+        return True
+    if text in FALSE_TEXTS:
+        return False
+    raise RowError(f"不是有效的布尔值: {value}")
+
+
+def _convert_date(value: Any) -> str:
+    text = _text(value).replace('/', '-')
+    try:
+        datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        raise RowError(f"不是有效的日期: {value}")
+    return text
+
+
+def _choice_names(field: Dict[str, Any]) -> set:
+    return {choice.get('name') for choice in (field.get('options') or {}).get('choices', [])}
+
+
+def build_field_converter(field: Dict[str, Any]) -> Callable[[Any], Any]:
+    """按字段类型生成转换器：输入文件中的值（文本或 JSON 值）-> 写入的值，不合法时抛出 RowError"""
+    field_type = field.get('type', '')
+    if field_type == 'rating':
+        return _convert_integer
+    if field_type in ('number', 'currency', 'percent', 'duration'):
+        return _convert_number
+    if field_type == 'checkbox':
+        return _convert_checkbox
+    if field_type == 'date':
+        return _convert_date
+
+    choices = _choice_names(field)
+    if field_type == 'singleSelect':
+        def convert_select(value):
+            text = _text(value)
+            if choices and text not in choices:
+                raise RowError(f"'{text}' 不是字段 '{field['name']}' 的选项")
+            return text
+        return convert_select
+    if field_type == 'multipleSelect':
+        def convert_multiple_select(value):
+            items = value if isinstance(value, list) else _text(value).split(',')
+            items = [_text(item) for item in items if _text(item)]
+            invalid = [item for item in items if choices and item not in choices]
+            if invalid:
+                raise RowError(f"'{','.join(invalid)}' 不是字段 '{field['name']}' 的选项")
+            return items
+        return convert_multiple_select
+    return _text
+
+
+def _is_writable(field: Dict[str, Any]) -> bool:
+    """字段是否可以由导入写入（排除公式、引用、自动生成和附件字段）"""
+    field_type = field.get('type', '')
+    return not (field_type in COMPUTED_FIELD_TYPES or field_type in UNSUPPORTED_FIELD_TYPES or
+                field.get('isComputed') or not is_field_editable(field))
+
+
+class ImportPlan:
+    """输入列到表格字段的映射，每个目标字段绑定一个转换器，只在导入开始时生成一次
+
+    columns 中每项为 (列键, 字段名, 转换器)，CSV 的列键是列序号，JSONL 的列键是键名；
+    关联字段只取出文本值，由写入线程按批次解析为记录ID。
+    JSONL 每行的键可以不同（空值通常省略），header 传入表格的全部字段名，按同名键映射。
+    """
+
+    def __init__(self, fields: List[Dict[str, Any]], link_fields: Dict[str, Dict[str, Any]],
+                 header: List[str], mappings: Dict[str, Dict[str, Any]], by_index: bool):
+        self.by_index = by_index
+        self.columns: List[Tuple[Any, str, Callable[[Any], Any]]] = []
+        self.constants: Dict[str, Any] = {}
+        self.ignored: List[str] = []
+        self.unknown: List[str] = []
+
+        field_map = {field.get('name'): field for field in fields}
+        positions = {name: index for index, name in enumerate(header)}
+        # 默认按同名列映射，命令行中的 字段=@列 / 字段=常量 覆盖
+        targets = {name: {'type': 'field_mapping', 'source_field': name} for name in header}
+        targets.update(mappings)
+
+        for target, mapping in targets.items():
+            field = field_map.get(target)
+            if target == 'id' or target.startswith('_'):
+                # 导出文件中的记录ID列和拒绝文件附加的列
+                continue
+            if field is None:
+                if target in mappings:
+                    raise RowError(f"字段 '{target}' 不存在")
+                self.unknown.append(target)
+                continue
+            if not _is_writable(field):
+                if by_index or target in mappings:
+                    self.ignored.append(target)
+                continue
+            convert = _text if target in link_fields else build_field_converter(field)
+            if mapping['type'] == 'constant':
+                self.constants[target] = convert(mapping['value'])
+                continue
+            source = mapping['source_field']
+            if by_index and source not in positions:
+                raise RowError(f"输入文件中没有列 '{source}'")
+            self.columns.append((positions[source] if by_index else source, target, convert))
+
+        self.link_fields = {name: info for name, info in link_fields.items() if name in self.target_fields}
+        self.required = [name for name, field in field_map.items()
+                         if _is_writable(field) and is_field_required(field)]
+        self.width = len(header)
+
+    @property
+    def target_fields(self) -> List[str]:
+        return [name for _, name, _ in self.columns] + list(self.constants)
+
+    def convert(self, row: Any) -> Dict[str, Any]:
+        """一行输入 -> 记录字段（空值不写入），不合法时抛出 RowError"""
+        if self.by_index and len(row) != self.width:
+            raise RowError(f"列数为 {len(row)}，与表头的 {self.width} 列不一致")
+        record_fields = dict(self.constants)
+        for key, name, convert in self.columns:
+            value = row[key] if self.by_index else row.get(key)
+            if value is None or value == '' or value == []:
+                continue
+            try:
+                record_fields[name] = convert(value)
+            except RowError as e:
+                raise RowError(f"字段 '{name}': {e}")
+        for name in self.required:
+            if name not in record_fields:
+                raise RowError(f"必填字段 '{name}' 为空")
+        return record_fields
+
+
+# ---------- 输入输出 ----------
+
+def _open_input(path: str, compression: Optional[str]):
+    """以 1MB 缓冲打开输入文件（二进制流），支持 gzip/zstd 压缩和标准输入"""
+    raw = sys.stdin.buffer if path == '-' else open(path, 'rb', buffering=IMPORT_BUFFER_SIZE)
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if compression == 'zstd':
+        return io.BufferedReader(_load_zstandard().ZstdDecompressor().stream_reader(raw),
+                                 buffer_size=IMPORT_BUFFER_SIZE)
+    return raw
+
+
+def read_csv_rows(stream, delimiter: str = ',') -> Tuple[List[str], Iterator[Tuple[int, Any]]]:
+    """返回(表头, (行号, 行) 迭代器)，自动去掉 UTF-8 BOM"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text, delimiter=delimiter)
+    header = [name.strip() for name in next(reader, [])]
+
+    def rows():
+        for row in reader:
+            if row:
+                yield reader.line_num, row
+    return header, rows()
+
+
+def read_jsonl_rows(stream) -> Iterator[Tuple[int, Any]]:
+    """产出 (行号, 字段字典)
+
+    每行是 {"id", "fields"} 记录（t export/管道格式）或字段名到值的扁平对象。
+    无法解析的行以 RowError 的形式产出，由调用方写入拒绝文件。
+    """
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield lineno, RowError(f"JSON 解析失败: {e}", raw=line)
+            continue
+        if not isinstance(item, dict):
+            yield lineno, RowError("不是 JSON 对象", raw=line)
+            continue
+        yield lineno, item['fields'] if isinstance(item.get('fields'), dict) else item
+
+
+class RejectWriter:
+    """拒绝文件：与输入格式相同，附加行号和错误原因，第一次写入时才创建文件（线程安全）
+
+    无法解析为 JSON 对象的行没有地方附加行号和错误原因，原样写入拒绝文件，
+    行号和错误原因输出到 stderr。
+    """
+
+    def __init__(self, path: str, input_format: str, header: List[str]):
+        self.path = path
+        self.input_format = input_format
+        self.header = header
+        self.count = 0
+        self._file = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def write(self, lineno: int, row: Any, error: str, raw: Optional[bytes] = None):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+                if self.input_format == 'csv':
+                    self._writer = csv.writer(self._file)
+                    self._writer.writerow(self.header + [REJECT_LINE_COLUMN, REJECT_ERROR_COLUMN])
+            if self.input_format == 'csv':
+                self._writer.writerow(list(row or []) + [lineno, error])
+            elif raw is not None:
+                # 原始行是读取到的字节，直接写入底层文件，不经过解码（可能不是有效的 UTF-8）
+                self._file.flush()
+                self._file.buffer.write(raw.rstrip(b'\r\n') + b'\n')
+                print(f"第 {lineno} 行: {error}（原样写入拒绝文件）", file=sys.stderr)
+            else:
+                item = dict(row) if isinstance(row, dict) else {}
+                item.update({REJECT_LINE_COLUMN: lineno, REJECT_ERROR_COLUMN: error})
+                self._file.write(json.dumps(item, ensure_ascii=False) + '\n')
+            self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _error_message(error: Exception) -> str:
+    """服务器错误响应中的 message，没有时使用异常文本的第一行"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            message = response.json().get('message')
+            if message:
+                return f"{response.status_code}: {message}"
+        except ValueError:
+            pass
+    return str(error).splitlines()[0] if str(error) else type(error).__name__
+
+
+def _is_row_error(error: Exception) -> bool:
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in ROW_ERROR_STATUS_CODES
+
+
+# ---------- 命令 ----------
+
+def import_command(client, session, args: list):
+    """t import 文件 [--to 表名] [--format csv|jsonl] [字段=@列 字段=常量...] [--reject 文件]
+    [--delimiter 分隔符] [--batch-size N|auto] [--concurrency N|auto]"""
+    if not client:
+        print("错误: 无法连接到Teable服务", file=sys.stderr)
+        return 1
+
+    explicit_concurrency = '--concurrency' in args
+    bulk_options, args = parse_bulk_options(args)
+    if not explicit_concurrency:
+        # 默认由客户端的自适应并发上限决定在途批次数，尽量用满服务器的写入能力
+        bulk_options.update(concurrency=MAX_CONCURRENCY, adaptive_concurrency=True)
+    sizer = make_batch_sizer(bulk_options, default_size=IMPORT_DEFAULT_BATCH_SIZE)
+    table_name, args = _extract_option(args, '--to')
+    input_format, args = _extract_option(args, '--format')
+    reject_path, args = _extract_option(args, '--reject')
+    delimiter, args = _extract_option(args, '--delimiter', default=',')
+
+    paths = [arg for arg in args if '=' not in arg]
+    mapping_args = [arg for arg in args if '=' in arg]
+    if len(paths) != 1:
+        print("错误: 请指定一个输入文件", file=sys.stderr)
+        print("使用: t import 文件.csv --to 表名 [字段=@列 ...] [--reject 文件]", file=sys.stderr)
+        return 1
+    path = paths[0]
+
+    guessed_format, compression = guess_format(None if path == '-' else path)
+    input_format = (input_format or guessed_format or 'csv').lower()
+    if input_format not in IMPORT_FORMATS:
+        print(f"错误: 不支持的导入格式 '{input_format}'（可选: {', '.join(IMPORT_FORMATS)}）", file=sys.stderr)
+        return 1
+    if compression == 'zstd' and _load_zstandard() is None:
+        print("错误: 读取 zstd 压缩文件需要安装 zstandard: pip install \"teable-cli[zstd]\"", file=sys.stderr)
+        return 1
+    if path != '-' and not os.path.isfile(path):
+        print(f"错误: 文件不存在: {path}", file=sys.stderr)
+        return 1
+    if delimiter == '\\t':
+        delimiter = '\t'
+
+    # 字段映射语法与 t insert 管道模式相同：字段=@列 或 字段=常量
+    mappings = {}
+    for arg in mapping_args:
+        target, source = arg.split('=', 1)
+        if source.startswith('@') or source.startswith('$'):
+            mappings[target.strip()] = {'type': 'field_mapping', 'source_field': source[1:].strip()}
+        else:
+            mappings[target.strip()] = {'type': 'constant', 'value': source}
+
+    if table_name:
+        table_id = next((table.get('id') for table in client.get_tables()
+                         if table.get('name') == table_name), None)
+        if not table_id:
+            print(f"错误: 表格 '{table_name}' 不存在", file=sys.stderr)
+            return 1
+    else:
+        table_id, table_name = session.get_current_table_id(), session.get_current_table()
+        if not table_id:
+            print("错误: 请用 --to 指定目标表格或先选择表格", file=sys.stderr)
+            return 1
+
+    stream = None
+    rejects = None
+    success_count = 0
+    try:
+        fields = client.get_table_fields(table_id)
+        link_fields = detect_link_fields(client, table_id)
+
+        stream = _open_input(path, compression)
+        if input_format == 'csv':
+            header, rows = read_csv_rows(stream, delimiter)
+        else:
+            header, rows = [field.get('name') for field in fields], read_jsonl_rows(stream)
+        plan = ImportPlan(fields, link_fields, header, mappings, by_index=input_format == 'csv')
+        if not plan.target_fields:
+            print("错误: 输入文件中没有可以导入的列（列名需要与字段名相同，或用 字段=@列 指定）", file=sys.stderr)
+            return 1
+
+        if not reject_path:
+            base = path if path != '-' else 'stdin'
+            reject_path = f"{base}.rejected.{'csv' if input_format == 'csv' else 'jsonl'}"
+        rejects = RejectWriter(reject_path, input_format, header)
+
+        print(f"导入到 '{table_name}': {', '.join(plan.target_fields)}", file=sys.stderr)
+        if plan.ignored:
+            print(f"  忽略只读字段: {', '.join(plan.ignored)}", file=sys.stderr)
+        if plan.unknown:
+            print(f"  忽略表格中不存在的列: {', '.join(plan.unknown)}", file=sys.stderr)
+
+        def converted():
+            """读取线程中执行：解析和转换每一行，不合法的行直接写入拒绝文件"""
+            for lineno, row in rows:
+                try:
+                    if isinstance(row, RowError):
+                        raise row
+                    yield lineno, row, plan.convert(row)
+                except RowError as e:
+                    rejects.write(lineno, row, str(e), raw=e.raw)
+
+        link_resolver = LinkResolver(client, link_fields)
+
+        def insert(items):
+            """插入一批行，返回(成功数, [(行号, 行, 错误)])
+
+            每个子批次独立处理：413 交给 send_batch 拆分重试；被服务器以 400/422 拒绝时
+            拆成两半重试，找出具体的不合法行；其他错误只拒绝该子批次的行。
+            已经写入的子批次不会重新发送。
+            """
+            failed = []
+
+            def send(chunk):
+                try:
+                    return client.insert_records(
+                        table_id, [{'fields': record_fields} for _, _, record_fields in chunk]
+                    ).get('records', [])
+                except Exception as e:
+                    if is_payload_too_large(e) and len(chunk) > 1:
+                        raise
+                    if _is_row_error(e) and len(chunk) > 1:
+                        middle = len(chunk) // 2
+                        return send_batch(send, chunk[:middle], sizer) + send_batch(send, chunk[middle:], sizer)
+                    failed.extend((lineno, row, _error_message(e)) for lineno, row, _ in chunk)
+                    return []
+
+            return len(send_batch(send, items, sizer)), failed
+
+        def process(batch):
+            failed = []
+            ready = []
+            for name in plan.link_fields:
+                link_resolver.prefetch(name, [item[2][name] for item in batch if name in item[2]])
+            for lineno, row, record_fields in batch:
+                for name, info in plan.link_fields.items():
+                    if name not in record_fields:
+                        continue
+                    record_id = link_resolver.resolve(name, record_fields[name])
+                    if not record_id:
+                        failed.append((lineno, row, f"字段 '{name}': 未找到关联记录 '{record_fields[name]}'"))
+                        break
+                    link = {'id': record_id}
+                    record_fields[name] = [link] if info.get('relationship') in ('manyMany', 'oneMany') else link
+                else:
+                    ready.append((lineno, row, record_fields))
+            inserted = 0
+            if ready:
+                inserted, insert_failed = insert(ready)
+                failed.extend(insert_failed)
+            return inserted, failed
+
+        print(f"开始导入，{describe_batch_size(sizer)}{describe_concurrency(bulk_options)}...", file=sys.stderr)
+        meter = ProgressMeter("导入进度", every=IMPORT_PROGRESS_EVERY, stream=sys.stderr)
+        batches = read_batches(converted(), sizer, bulk_options['flush_interval'])
+        for batch, (inserted, failed) in run_batches(batches, process, bulk_options['concurrency']):
+            success_count += inserted
+            for lineno, row, error in failed:
+                rejects.write(lineno, row, error)
+            meter.add(len(batch))
+    except RowError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print(f"\n导入已中断，已导入 {success_count} 条记录", file=sys.stderr)
+        return 1
+    except Exception as e:
+        logger.error(f"导入失败: {e}", exc_info=True)
+        print(f"错误: 导入失败: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if rejects is not None:
+            rejects.close()
+        if stream is not None and stream is not sys.stdin.buffer:
+            stream.close()
+
+    print(f"✅ 导入完成: 成功 {success_count} 条，拒绝 {rejects.count} 条（{meter.describe()}）", file=sys.stderr)
+    if rejects.count:
+        print(f"   被拒绝的行已写入: {reject_path}（修正后可以重新导入）", file=sys.stderr)
+        return 1
+    return 0
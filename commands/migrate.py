@@ -8,21 +8,49 @@
 import sys
 import json
 import logging
+import threading
 from typing import Dict, List, Any, Optional
 
+from .bulk_core import (
+    parse_bulk_options, make_batch_sizer, describe_batch_size, describe_concurrency,
+    send_batch, read_batches, run_batches, iter_in_background, ProgressMeter, Checkpoint
+)
+from .table_common import _extract_option
+
 logger = logging.getLogger(__name__)
 
+# 源表分页大小
+MIGRATE_PAGE_SIZE = 1000
+# 未指定 --batch-size 时的插入批次大小
+MIGRATE_DEFAULT_BATCH_SIZE = 100
+# 读取线程最多领先转换阶段的页数
+MIGRATE_QUEUE_PAGES = 4
+# 每迁移多少条记录输出一次进度
+MIGRATE_PROGRESS_EVERY = 5000
+
 
 def migrate_data(client, session, args: list):
-    """迁移数据命令"""
+    """迁移数据命令
+    
+    流式流水线执行：分页读取线程 → 字段映射转换线程 → 并发批量插入，相邻阶段之间通过
+    有界队列连接，读取和写入重叠进行，内存占用不随源表大小增长。
+    每个批次确认写入后保存断点，中断后使用相同的命令加 --resume 继续。
+    并发时前面的批次失败或用户中断，后面已经写入的批次记录在断点的 completed 中，
+    继续时跳过这些源记录，不会重复插入。
+    """
     try:
         if not client:
             print("错误: 无法连接到Teable服务")
             return 1
         
+        # 提取批量选项（--batch-size、--concurrency）和 --resume，避免被当作字段映射解析
+        bulk_options, args = parse_bulk_options(args)
+        resume, args = _extract_option(args, '--resume', flag=True)
+        sizer = make_batch_sizer(bulk_options, default_size=MIGRATE_DEFAULT_BATCH_SIZE)
+        
         if len(args) < 2:
             print("错误: 参数不足")
-            print("使用: t migrate 源表名 目标表名 [字段映射...]")
+            print("使用: t migrate 源表名 目标表名 [字段映射...] [--batch-size N|auto] [--concurrency N] [--resume]")
             print("示例: t migrate 学生表 学生备份表 姓名=姓名 年龄=年龄 成绩=成绩")
             print("示例: t migrate 学生表 优秀学生表 成绩>80")  # 带条件迁移
             return 1
@@ -110,97 +138,151 @@ def migrate_data(client, session, args: list):
                     }]
                 })
         
-        # 获取所有记录（分页处理）
-        all_records = []
-        page = 1
-        page_size = 100
-        
-        while True:
-            records_data = client.get_records(source_table_id, page=page, page_size=page_size, **query_params)
-            records = records_data.get('records', [])
-            
-            if not records:
-                break
-            
-            all_records.extend(records)
-            
-            if len(records) < page_size:
-                break
-            
-            page += 1
-        
-        if not all_records:
-            print(f"源表 '{source_table}' 中没有符合条件的记录")
-            return 0
-        
-        print(f"📋 找到 {len(all_records)} 条记录需要迁移")
-        
+        source_fields = client.get_table_fields(source_table_id)
         # 获取目标表字段信息
         target_fields = client.get_table_fields(target_table_id)
-        target_field_names = [field.get('name') for field in target_fields]
-        
-        # 准备要插入的记录
-        records_to_insert = []
-        skipped_records = 0
-        
-        for i, record in enumerate(all_records):
-            source_fields = record.get('fields', {})
-            
-            # 如果没有指定字段映射，尝试自动映射同名字段
-            if not field_mappings:
-                # 自动映射同名字段
-                target_data = {}
-                for field_name, value in source_fields.items():
-                    if field_name in target_field_names:
-                        target_data[field_name] = value
-            else:
-                # 使用指定的字段映射
-                target_data = {}
-                for source_field, target_field in field_mappings.items():
-                    if source_field in source_fields:
-                        target_data[target_field] = source_fields[source_field]
-            
-            if target_data:
-                records_to_insert.append({
-                    "fields": target_data
-                })
-            else:
-                skipped_records += 1
-                logger.warning(f"跳过记录 {i+1}: 没有有效的字段数据")
-        
-        if not records_to_insert:
-            print("错误: 没有有效的记录可以迁移")
-            return 1
-        
-        # 批量插入记录
-        print(f"🔄 开始插入 {len(records_to_insert)} 条记录到目标表...")
+        target_field_names = {field.get('name') for field in target_fields}
+        
+        # 断点：有autoNumber字段时记录游标值，否则记录已读取的源记录数（skip偏移）
+        cursor_field = client.find_cursor_field(source_fields)
+        checkpoint = Checkpoint(session.config.config_dir / 'checkpoints', 'migrate',
+                                source_table_id, target_table_id, field_mappings, condition)
+        state = checkpoint.load()
+        position = None
+        # 断点位置之后已经写入的批次（并发时前面的批次失败），每项为 [首条位置, 末条位置]
+        completed = []
+        counts = {'success': 0, 'skipped': 0}
+        if state and resume:
+            position = state.get('position')
+            completed = state.get('completed') or []
+            counts['success'] = state.get('migrated', 0)
+            counts['skipped'] = state.get('skipped', 0)
+            where = f"{cursor_field} > {position}" if cursor_field else f"第 {position} 条源记录之后"
+            print(f"从断点继续：已迁移 {counts['success']} 条记录，{where}")
+        elif state:
+            print(f"发现未完成的断点（已迁移 {state.get('migrated', 0)} 条记录），"
+                  f"可使用 --resume 从断点继续；本次从头开始，可能产生重复记录")
+        
+        # 只下载需要迁移的源字段（游标分页会自动加上游标字段）
+        if field_mappings:
+            query_params['projection'] = list(field_mappings)
+        else:
+            query_params['projection'] = [f.get('name') for f in source_fields
+                                           if f.get('name') in target_field_names]
         
-        success_count = 0
+        if cursor_field:
+            pages = client.iter_records_by_cursor(source_table_id, cursor_field, page_size=MIGRATE_PAGE_SIZE,
+                                                  start_after=position, **query_params)
+        else:
+            pages = client.iter_record_pages(source_table_id, page_size=MIGRATE_PAGE_SIZE,
+                                             offset=position or 0, **query_params)
+        
+        def transform():
+            """字段映射转换：产出 (源记录位置, 目标记录) 元组"""
+            offset = position or 0
+            for page in iter_in_background(pages, MIGRATE_QUEUE_PAGES):
+                for record in page:
+                    offset += 1
+                    fields_data = record.get('fields', {})
+                    record_position = fields_data.get(cursor_field) if cursor_field else offset
+                    if any(first <= record_position <= last for first, last in completed):
+                        # 上次运行时已经写入
+                        continue
+                    
+                    # 如果没有指定字段映射，尝试自动映射同名字段
+                    if not field_mappings:
+                        target_data = {name: value for name, value in fields_data.items()
+                                       if name in target_field_names}
+                    else:
+                        # 使用指定的字段映射
+                        target_data = {target_field: fields_data[source_field]
+                                       for source_field, target_field in field_mappings.items()
+                                       if source_field in fields_data}
+                    
+                    if not target_data:
+                        counts['skipped'] += 1
+                        logger.warning(f"跳过记录 {record.get('id')}: 没有有效的字段数据")
+                        continue
+                    
+                    yield record_position, {"fields": target_data}
+        
+        # 已经写入、但还没有按输入顺序确认的批次：首条位置 -> (末条位置, 插入数)。
+        # 在工作线程中记录，前面的批次失败或用户中断时，据此把后面已写入的批次保存到断点
+        finished = {}
+        finished_lock = threading.Lock()
+        
+        def process(batch):
+            inserted_records = send_batch(
+                lambda chunk: client.insert_records(target_table_id, chunk).get('records', []),
+                [item for _, item in batch], sizer
+            )
+            with finished_lock:
+                finished[batch[0][0]] = (batch[-1][0], len(inserted_records))
+            return len(inserted_records)
+        
+        confirmed = {'position': position}
+        
+        def save_checkpoint():
+            confirmed_position = confirmed['position']
+            checkpoint.save({
+                'source_table_id': source_table_id,
+                'target_table_id': target_table_id,
+                'cursor_field': cursor_field,
+                'position': confirmed_position,
+                'completed': [[first, last] for first, last in completed
+                              if confirmed_position is None or last > confirmed_position],
+                'migrated': counts['success'],
+                'skipped': counts['skipped']
+            })
+        
+        print(f"🔄 开始流式迁移到目标表，{describe_batch_size(sizer)}{describe_concurrency(bulk_options)}...")
+        
+        meter = ProgressMeter("迁移进度", every=MIGRATE_PROGRESS_EVERY, stream=sys.stderr)
         failed_count = 0
-        batch_size = 10  # 每批插入10条记录
+        # 断点之前的记录必须都已写入，因此并发时也按输入顺序确认批次
+        batches = read_batches(transform(), sizer, bulk_options['flush_interval'])
+        results = run_batches(batches, process, bulk_options['concurrency'], ordered=True)
+        try:
+            for batch, inserted in results:
+                with finished_lock:
+                    finished.pop(batch[0][0], None)
+                counts['success'] += inserted
+                failed_count += len(batch) - inserted
+                meter.add(len(batch))
+                confirmed['position'] = batch[-1][0]
+                save_checkpoint()
+        except (Exception, KeyboardInterrupt) as e:
+            # 等待在途批次结束（未开始的批次取消），把已经写入但没有按顺序确认的批次记入断点，
+            # 继续时跳过它们
+            results.close()
+            with finished_lock:
+                for first, (last, inserted) in sorted(finished.items()):
+                    completed.append([first, last])
+                    counts['success'] += inserted
+                finished.clear()
+            save_checkpoint()
+            reason = "用户中断" if isinstance(e, KeyboardInterrupt) else f"{e}"
+            print(f"❌ 数据迁移中断: {reason}")
+            print(f"已迁移 {counts['success']} 条记录")
+            print("使用相同的命令加 --resume 从断点继续")
+            logger.error(f"数据迁移中断: {reason}", exc_info=not isinstance(e, KeyboardInterrupt))
+            return 1
+        else:
+            # 源数据已全部读完并写入（read_batches 在用户中断时会抛出 KeyboardInterrupt），才清除断点
+            checkpoint.clear()
         
-        for i in range(0, len(records_to_insert), batch_size):
-            batch = records_to_insert[i:i+batch_size]
-            
-            try:
-                result = client.insert_records(target_table_id, batch)
-                inserted_records = result.get('records', [])
-                success_count += len(inserted_records)
-                
-                if len(inserted_records) < len(batch):
-                    failed_count += len(batch) - len(inserted_records)
-                
-                print(f"   已处理 {min(i+batch_size, len(records_to_insert))}/{len(records_to_insert)} 条记录")
-                
-            except Exception as e:
-                failed_count += len(batch)
-                logger.error(f"批量插入失败: {e}")
+        if meter.count == 0 and position is None:
+            if counts['skipped']:
+                print("错误: 没有有效的记录可以迁移")
+                return 1
+            print(f"源表 '{source_table}' 中没有符合条件的记录")
+            return 0
         
         # 显示结果
-        print(f"\n✅ 数据迁移完成!")
-        print(f"   成功: {success_count} 条记录")
+        print(f"\n✅ 数据迁移完成!（{meter.describe()}）")
+        print(f"   成功: {counts['success']} 条记录")
         print(f"   失败: {failed_count} 条记录")
-        print(f"   跳过: {skipped_records} 条记录")
+        print(f"   跳过: {counts['skipped']} 条记录")
         
         if failed_count > 0:
             return 1
@@ -5,8 +5,26 @@ Teable CLI 管道操作核心组件
 提供管道输入/输出检测和格式化功能
 """
 
+import os
 import sys
-from typing import Dict, Any, Optional, List
+import json
+import logging
+from typing import Dict, Any, Optional, List, Iterator
+
+logger = logging.getLogger(__name__)
+
+# 管道格式：text（recXXX 字段=值，兼容 grep/cut 等工具）、ndjson、msgpack（需要安装 msgpack）
+PIPE_FORMATS = ('text', 'ndjson', 'msgpack')
+# 指定默认管道格式的环境变量（auto 或 PIPE_FORMATS 之一）
+PIPE_FORMAT_ENV = 'TEABLE_PIPE_FORMAT'
+# 机器格式表结构头的版本
+PIPE_SCHEMA_VERSION = 1
+# 读取管道输入时单次读取的最大字节数
+PIPE_READ_BUFFER = 1024 * 1024
+# 机器格式每累计多少条记录写出一次
+PIPE_WRITE_BATCH = 1000
+# 识别为 t 命令的程序名（管道下游是 t 时自动使用机器格式）
+TEABLE_PROGRAMS = ('t', 'teable', 'cli.py', 'teable_daemon.py')
 
 
 def is_pipe_input() -> bool:
@@ -73,3 +91,252 @@ def parse_pipe_input_line(line: str) -> Optional[Dict[str, Any]]:
                 record['fields'][field_name] = field_value
     
     return record
+
+
+
+def pipe_value_text(value: Any) -> str:
+    """机器格式中的结构化值（关联字段、多选等）转换为文本，用于过滤条件、关联匹配等需要单个值的场景"""
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        for key in ('title', 'name', 'id'):
+            if value.get(key) is not None:
+                return str(value[key])
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, list):
+        return ','.join(pipe_value_text(item) for item in value)
+    return str(value)
+
+
+def resolve_pipe_format(pipe_format: Optional[str] = None) -> str:
+    """确定请求的管道格式：--pipe-format 优先，其次是环境变量 TEABLE_PIPE_FORMAT，默认 auto"""
+    requested = (pipe_format or os.environ.get(PIPE_FORMAT_ENV) or 'auto').lower()
+    if requested != 'auto' and requested not in PIPE_FORMATS:
+        print(f"警告: 无效的pipe-format值 '{requested}'，使用 auto", file=sys.stderr)
+        requested = 'auto'
+    return requested
+
+
+def _stdout_feeds_teable(stream) -> bool:
+    """标准输出是否是连接到另一个 t 命令的管道（Linux 下通过 /proc 查找管道的读端进程）"""
+    try:
+        target = os.readlink(f'/proc/self/fd/{stream.fileno()}')
+    except (OSError, ValueError, AttributeError):
+        return False
+    if not target.startswith('pipe:'):
+        return False
+    try:
+        pids = [pid for pid in os.listdir('/proc') if pid.isdigit() and int(pid) != os.getpid()]
+    except OSError:
+        return False
+    for pid in pids:
+        try:
+            if os.readlink(f'/proc/{pid}/fd/0') != target:
+                continue
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                argv = f.read().split(b'\0')[:2]
+        except OSError:
+            continue
+        if any(os.path.basename(arg.decode('utf-8', 'replace')) in TEABLE_PROGRAMS for arg in argv):
+            return True
+    return False
+
+
+def _load_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+class PipeWriter:
+    """管道记录输出
+
+    text 格式逐行输出 `recXXX 字段=值`；ndjson/msgpack 先输出一个表结构头
+    {"schema": {"version", "table", "fields": [{"name", "type"}]}}，之后每条记录一个
+    {"id", "fields"} 对象，字段值保持原始类型（数字、布尔、数组、关联字段对象），
+    按 PIPE_WRITE_BATCH 条合并写出。
+
+    auto 在第一次写出时确定格式：标准输出是连接到另一个 t 命令的管道时使用 ndjson，
+    否则使用 text（终端、文件、grep/head 等其他程序）。msgpack 只在明确指定时使用，
+    且要求命令的标准输出中没有其他文本（binary=True）。
+    """
+
+    def __init__(self, pipe_format: Optional[str] = None, table_name: Optional[str] = None,
+                 fields=None, binary: bool = False):
+        """
+        Args:
+            pipe_format: 请求的格式（auto/text/ndjson/msgpack），None 时按环境变量
+            table_name: 表名（写入表结构头）
+            fields: 字段信息列表，或返回字段信息列表的函数（只在需要写表结构头时调用）
+            binary: 标准输出是否只包含记录（允许使用 msgpack 二进制格式）
+        """
+        self.requested = resolve_pipe_format(pipe_format)
+        self.table_name = table_name
+        self.fields = fields
+        self.binary = binary
+        self.format = None
+        self._pending = []
+        self._packer = None
+
+    def _resolve(self, stream) -> str:
+        pipe_format = self.requested
+        if pipe_format == 'auto':
+            pipe_format = 'ndjson' if _stdout_feeds_teable(stream) else 'text'
+        if pipe_format == 'msgpack':
+            msgpack = _load_msgpack()
+            if msgpack is None:
+                print("警告: 未安装 msgpack，改用 ndjson 管道格式", file=sys.stderr)
+                pipe_format = 'ndjson'
+            elif not self.binary or getattr(stream, 'buffer', None) is None:
+                logger.debug("当前输出不支持二进制格式，改用 ndjson 管道格式")
+                pipe_format = 'ndjson'
+            else:
+                self._packer = msgpack.Packer(use_bin_type=True)
+        return pipe_format
+
+    def _schema(self, selected_fields: Optional[List[str]]) -> Dict[str, Any]:
+        fields = self.fields() if callable(self.fields) else (self.fields or [])
+        if selected_fields:
+            fields = [f for f in fields if f.get('name') in selected_fields]
+        return {'schema': {
+            'version': PIPE_SCHEMA_VERSION,
+            'table': self.table_name,
+            'fields': [{'name': f.get('name'), 'type': f.get('type')} for f in fields],
+        }}
+
+    def write(self, record: Dict[str, Any], selected_fields: List[str] = None):
+        """输出一条记录，selected_fields 指定时只输出这些字段"""
+        if self.format is None:
+            self.format = self._resolve(sys.stdout)
+            if self.format != 'text':
+                self._pending.append(self._encode(self._schema(selected_fields)))
+
+        if self.format == 'text':
+            print(format_record_for_pipe(record, selected_fields), flush=True)
+            return
+
+        fields = record.get('fields') or {}
+        if selected_fields:
+            fields = {name: fields[name] for name in selected_fields if name in fields}
+        self._pending.append(self._encode({'id': record.get('id', ''), 'fields': fields}))
+        if len(self._pending) >= PIPE_WRITE_BATCH:
+            self.flush()
+
+    def _encode(self, obj: Dict[str, Any]):
+        if self._packer is not None:
+            return self._packer.pack(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def flush(self):
+        """写出累计的记录（每页/每批结束时调用）"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self._packer is not None:
+            # 先写出文本层缓冲，再直接写二进制
+            sys.stdout.flush()
+            buffer = sys.stdout.buffer
+            data = memoryview(b''.join(pending))
+            while data:
+                written = buffer.write(data)
+                data = data[written if written is not None else len(data):]
+            buffer.flush()
+        else:
+            sys.stdout.write(''.join(pending))
+            sys.stdout.flush()
+
+
+class PipeReader:
+    """管道记录输入，自动识别 text/ndjson/msgpack 格式
+
+    按 PIPE_READ_BUFFER 字节整块读取标准输入；以 { 开头的行按 JSON 解析，其他行按文本格式解析
+    （不是 rec 开头的行，如上游命令输出的提示信息，直接忽略），所以文本和 ndjson 可以混合。
+    第一个字节是 msgpack map 时按 msgpack 流解析。读到表结构头后保存在 schema 属性中。
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdin
+        self.format = None
+        self.schema: Optional[Dict[str, Any]] = None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        binary = getattr(self.stream, 'buffer', None)
+        if binary is None:
+            # 没有二进制层的流（如 t exec 的行内管道）只能是文本或 ndjson
+            self.format = 'text'
+            for line in self.stream:
+                record = self._parse_line(line)
+                if record is not None:
+                    yield record
+            return
+
+        read = getattr(binary, 'read1', binary.read)
+        chunk = read(PIPE_READ_BUFFER)
+        if not chunk:
+            return
+        if chunk[0] in _MSGPACK_MAP_MARKERS:
+            yield from self._iter_msgpack(chunk, read)
+            return
+
+        self.format = 'text'
+        pending = b''
+        while chunk:
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                record = self._parse_line(line)
+                if record is not None:
+                    yield record
+            chunk = read(PIPE_READ_BUFFER)
+        if pending:
+            record = self._parse_line(pending)
+            if record is not None:
+                yield record
+
+    def _iter_msgpack(self, chunk: bytes, read) -> Iterator[Dict[str, Any]]:
+        msgpack = _load_msgpack()
+        if msgpack is None:
+            raise RuntimeError("管道输入是 msgpack 格式，需要安装 msgpack: pip install msgpack")
+        self.format = 'msgpack'
+        unpacker = msgpack.Unpacker(raw=False, max_buffer_size=0)
+        while chunk:
+            unpacker.feed(chunk)
+            for obj in unpacker:
+                record = self._to_record(obj)
+                if record is not None:
+                    yield record
+            chunk = read(PIPE_READ_BUFFER)
+
+    def _parse_line(self, line) -> Optional[Dict[str, Any]]:
+        if line[:1] in (b'{', '{'):
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                return None
+            self.format = 'ndjson'
+            return self._to_record(obj)
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        return parse_pipe_input_line(line)
+
+    def _to_record(self, obj) -> Optional[Dict[str, Any]]:
+        if not isinstance(obj, dict):
+            return None
+        if 'schema' in obj:
+            self.schema = obj['schema']
+            return None
+        record_id = obj.get('id')
+        if not isinstance(record_id, str) or not record_id.startswith('rec'):
+            return None
+        return {'id': record_id, 'fields': obj.get('fields') or {}}
+
+
+# msgpack map 的起始字节（fixmap、map16、map32）
+_MSGPACK_MAP_MARKERS = frozenset(range(0x80, 0x90)) | {0xde, 0xdf}
+
+
+def read_pipe_records(stream=None) -> Iterator[Dict[str, Any]]:
+    """逐条读取管道输入的记录（格式自动识别，见 PipeReader）"""
+    return iter(PipeReader(stream))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地副本核心组件
+
+t sync 把表格记录同步到 ~/.teable/replica/<base_id>/<table_id>.db（SQLite），
+t show --local 在副本上执行 where/order/limit 查询，不访问服务器。
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from .pipe_core import pipe_value_text
+
+logger = logging.getLogger(__name__)
+
+# 副本文件格式版本，不一致时重新全量同步
+REPLICA_FORMAT_VERSION = 2
+# 按数值比较的字段类型
+NUMERIC_FIELD_TYPES = {'number', 'autoNumber', 'rating', 'currency', 'percent', 'duration'}
+# 按布尔值比较的字段类型
+BOOLEAN_FIELD_TYPES = {'checkbox'}
+# 按时间字符串比较的字段类型
+DATE_FIELD_TYPES = {'date', 'createdTime', 'lastModifiedTime'}
+# 条件操作符 -> SQL 操作符（like 单独处理）
+SQL_OPERATORS = {'=': '=', '>': '>', '>=': '>=', '<': '<', '<=': '<='}
+
+
+class ReplicaError(Exception):
+    """副本不存在、字段不存在或条件无法在本地执行"""
+
+
+def replica_dir(config) -> Path:
+    """当前 base 的副本目录: ~/.teable/replica/<base_id>/"""
+    return config.config_dir / 'replica' / config.get('base_id', '')
+
+
+def replica_path(config, table_id: str) -> Path:
+    """表格副本文件路径"""
+    return replica_dir(config) / f"{table_id}.db"
+
+
+def find_replica_by_name(config, table_name: str) -> Optional['TableReplica']:
+    """按表格名称查找已同步的副本（不访问服务器），不存在返回None"""
+    base_dir = replica_dir(config)
+    if not base_dir.exists():
+        return None
+    for path in sorted(base_dir.glob('*.db')):
+        replica = TableReplica(path)
+        try:
+            if replica.meta.get('table_name') == table_name:
+                return replica
+        except sqlite3.Error as e:
+            logger.debug(f"副本文件读取失败，忽略: {path}: {e}")
+        replica.close()
+    return None
+
+
+def record_modified_time(record: Dict[str, Any], modified_field: Optional[str] = None) -> Optional[str]:
+    """记录的最后修改时间：优先使用 lastModifiedTime 字段，其次记录自身的时间戳"""
+    if modified_field:
+        value = record.get('fields', {}).get(modified_field)
+        if value:
+            return value
+    return record.get('lastModifiedTime') or record.get('createdTime')
+
+
+def _quote(name: str) -> str:
+    """SQLite 标识符（字段名可以包含中文、空格和引号）"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_value(value: Any) -> Any:
+    """字段值 -> 查询列的值：布尔转0/1，数组/对象转为文本（与文本管道格式一致）"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return pipe_value_text(value)
+    return value
+
+
+def _condition_value(field_type: str, value: Any) -> Any:
+    """条件值（命令行文本）按字段类型转换，与 _column_value 写入的值可比较"""
+    if field_type in NUMERIC_FIELD_TYPES:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+    if field_type in BOOLEAN_FIELD_TYPES:
+        return 1 if str(value).strip().lower() in ('true', '1', 'yes', '是') else 0
+    return value
+
+
+class TableReplica:
+    """单个表格的本地副本
+
+    records 表每条记录一行：记录ID、最后修改时间、完整字段（JSON），以及每个字段一列查询列，
+    where/order 直接翻译为对查询列的 SQL；查询用到的列第一次查询时建立索引。
+    meta 表保存表格名称、字段定义和同步水位线（已同步记录的最大修改时间）。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._meta: Optional[Dict[str, Any]] = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if not self.path.exists():
+                raise ReplicaError(f"本地副本不存在: {self.path}")
+            self._conn = sqlite3.connect(str(self.path))
+            # 同步写入时 show --local 仍然可以读取
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._meta = None
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """副本元数据（table_id/table_name/fields/watermark/max_cursor/synced_at/version）"""
+        if self._meta is None:
+            rows = self.connect().execute('SELECT key, value FROM meta').fetchall()
+            self._meta = {key: json.loads(value) for key, value in rows}
+        return self._meta
+
+    @property
+    def fields(self) -> List[Dict[str, Any]]:
+        return self.meta.get('fields', [])
+
+    def count(self) -> int:
+        return self.connect().execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    # ---------- 写入 ----------
+
+    def rebuild(self, table_id: str, table_name: str, fields: List[Dict[str, Any]],
+                pages: Iterable[List[Dict[str, Any]]], modified_field: Optional[str] = None,
+                cursor_field: Optional[str] = None) -> int:
+        """全量重建副本，返回写入的记录数
+
+        写入同目录下的临时文件，完成后原子替换，重建期间 show --local 读到的仍是旧副本。
+        """
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        conn = sqlite3.connect(str(tmp_path))
+        try:
+            columns = ''.join(f", {_quote(field['name'])}" for field in fields)
+            conn.execute(f'CREATE TABLE records (id TEXT PRIMARY KEY, modified TEXT, data TEXT{columns})')
+            conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+            meta = {
+                'version': REPLICA_FORMAT_VERSION,
+                'table_id': table_id,
+                'table_name': table_name,
+                'fields': [{'name': f.get('name'), 'type': f.get('type', '')} for f in fields],
+                'watermark': None,
+                'max_cursor': None,
+                # 全量重建后副本不含已删除的记录
+                'pruned_at': time.time(),
+            }
+            total = 0
+            for records in pages:
+                total += self._write_records(conn, meta, records, modified_field, cursor_field)
+            self._save_meta(conn, meta)
+            conn.commit()
+        except BaseException:
+            conn.close()
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        conn.close()
+        os.replace(tmp_path, self.path)
+        # WAL 文件属于旧副本，替换后删除
+        for suffix in ('-wal', '-shm'):
+            try:
+                os.unlink(f"{self.path}{suffix}")
+            except FileNotFoundError:
+                pass
+        return total
+
+    def upsert(self, records: List[Dict[str, Any]], modified_field: Optional[str] = None,
+               cursor_field: Optional[str] = None) -> int:
+        """增量写入新增和修改的记录，推进水位线"""
+        conn = self.connect()
+        meta = dict(self.meta)
+        with conn:
+            count = self._write_records(conn, meta, records, modified_field, cursor_field)
+            self._save_meta(conn, meta)
+        self._meta = meta
+        return count
+
+    def delete_missing(self, record_ids: set) -> int:
+        """删除服务器上已不存在的记录（record_ids 为服务器上的全部记录ID），返回删除数"""
+        conn = self.connect()
+        stale = [(record_id,) for (record_id,) in conn.execute('SELECT id FROM records')
+                 if record_id not in record_ids]
+        meta = dict(self.meta)
+        meta['pruned_at'] = time.time()
+        with conn:
+            if stale:
+                conn.executemany('DELETE FROM records WHERE id = ?', stale)
+            self._save_meta(conn, meta)
+        self._meta = meta
+        return len(stale)
+
+    def _write_records(self, conn: sqlite3.Connection, meta: Dict[str, Any],
+                       records: List[Dict[str, Any]], modified_field: Optional[str],
+                       cursor_field: Optional[str]) -> int:
+        names = [field['name'] for field in meta['fields']]
+        # 未勾选的复选框在记录中不出现，查询列写 0，使 字段=false 能匹配
+        defaults = [0 if field.get('type') in BOOLEAN_FIELD_TYPES else None for field in meta['fields']]
+        placeholders = ', '.join('?' * (len(names) + 3))
+        columns = ''.join(f", {_quote(name)}" for name in names)
+        rows = []
+        watermark = meta.get('watermark')
+        max_cursor = meta.get('max_cursor')
+        for record in records:
+            record_fields = record.get('fields', {})
+            modified = record_modified_time(record, modified_field)
+            if modified and (watermark is None or modified > watermark):
+                watermark = modified
+            cursor = record_fields.get(cursor_field) if cursor_field else None
+            if isinstance(cursor, (int, float)) and (max_cursor is None or cursor > max_cursor):
+                max_cursor = cursor
+            rows.append([record.get('id'), modified, json.dumps(record_fields, ensure_ascii=False)] +
+                        [_column_value(record_fields.get(name, default)) for name, default in zip(names, defaults)])
+        conn.executemany(f'INSERT OR REPLACE INTO records (id, modified, data{columns}) VALUES ({placeholders})',
+                         rows)
+        meta['watermark'] = watermark
+        meta['max_cursor'] = max_cursor
+        return len(rows)
+
+    @staticmethod
+    def _save_meta(conn: sqlite3.Connection, meta: Dict[str, Any]):
+        meta['synced_at'] = time.time()
+        conn.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                         [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()])
+
+    # ---------- 查询 ----------
+
+    def query(self, conditions: List[Dict[str, Any]], order_by: Optional[str] = None,
+              order_direction: str = 'asc', limit: Optional[int] = None,
+              ) -> Tuple[List[Dict[str, Any]], int]:
+        """按条件查询副本，返回(记录列表, 符合条件的总数)
+
+        conditions 为 _parse_where_conditions_with_mapping 解析出的条件（只支持常量条件）。
+        没有指定排序时按 autoNumber 字段（与服务器默认顺序一致）排序。
+        """
+        field_types = {field['name']: field.get('type', '') for field in self.fields}
+        clauses, params = [], []
+        used_columns = []
+        for condition in conditions:
+            name = condition['field']
+            if name not in field_types:
+                raise ReplicaError(f"字段 '{name}' 不存在")
+            if condition['type'] != 'constant':
+                raise ReplicaError(f"本地查询不支持 @字段名 条件: {name}")
+            field_type = field_types[name]
+            column = _quote(name)
+            operator = condition['operator']
+            value = _condition_value(field_type, condition['value'])
+            if operator == 'like':
+                clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+                escaped = str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                params.append(f"%{escaped}%")
+            elif field_type in DATE_FIELD_TYPES and operator == '=' and len(str(value)) == 10:
+                # 只有日期部分时匹配当天（按UTC时间），用范围条件以便使用索引
+                clauses.append(f"{column} >= ? AND {column} < ?")
+                params.extend([value, f"{value}~"])
+            else:
+                clauses.append(f"{column} {SQL_OPERATORS[operator]} ?")
+                params.append(value)
+            used_columns.append(name)
+
+        if order_by is None:
+            order_by = next((f['name'] for f in self.fields if f.get('type') == 'autoNumber'), None)
+        elif order_by not in field_types:
+            raise ReplicaError(f"排序字段 '{order_by}' 不存在")
+        if order_by:
+            used_columns.append(order_by)
+        self._ensure_indexes(used_columns)
+
+        where_sql = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        conn = self.connect()
+        total = conn.execute(f'SELECT COUNT(*) FROM records{where_sql}', params).fetchone()[0]
+
+        sql = f'SELECT id, data FROM records{where_sql}'
+        if order_by:
+            direction = 'DESC' if order_direction == 'desc' else 'ASC'
+            sql += f' ORDER BY {_quote(order_by)} {direction}, rowid'
+        if limit:
+            sql += ' LIMIT ?'
+            params = params + [limit]
+        records = [{'id': record_id, 'fields': json.loads(data)}
+                   for record_id, data in conn.execute(sql, params)]
+        return records, total
+
+    def _ensure_indexes(self, names: List[str]):
+        """为查询用到的列建立索引（只在第一次用到时建立）"""
+        conn = self.connect()
+        with conn:
+            for index, field in enumerate(self.fields):
+                if field['name'] in names:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_field_{index} ON records ({_quote(field["name"])})')
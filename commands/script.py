@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量脚本命令（t exec）
+
+在同一个进程、同一个 TeableCLI 实例中逐行执行脚本里的命令，共享客户端、连接池和表结构缓存，
+不再像 shell 循环那样每条命令都重新启动进程、认证和读取表结构。
+
+脚本语法（每行一条命令，行首的 t 可以省略）:
+    # 注释
+    use 订单表
+    订单 = insert 客户=张三 数量=2          # 变量捕获命令输出的记录ID
+    update ${订单} 状态=已确认              # ${变量} 引用变量，${1} ${2}... 引用脚本参数
+    show where 状态=待处理 | update 状态=处理中   # 行内管道
+    insert 日志表 内容=a &                  # 以 & 结尾的连续多行并发执行
+    insert 日志表 内容=b &
+    wait                                   # 等待并发命令完成（下一条普通命令前也会自动等待）
+    echo 完成: ${订单}
+"""
+
+import io
+import re
+import sys
+import copy
+import shlex
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from .table_common import _extract_option
+
+logger = logging.getLogger(__name__)
+
+# 并发执行的默认线程数
+DEFAULT_SCRIPT_CONCURRENCY = 4
+# 变量引用 ${名称}
+VARIABLE_PATTERN = re.compile(r'\$\{(\w+)\}')
+# 变量名（捕获语句 名称 = 命令）
+VARIABLE_NAME = re.compile(r'^\w+$')
+# 输出行开头的记录ID（标准管道格式）
+RECORD_ID_PATTERN = re.compile(r'^(rec\w+)')
+
+
+class ScriptError(Exception):
+    """脚本语法错误或变量未定义"""
+
+
+class ScriptLine:
+    """解析后的一行脚本"""
+
+    def __init__(self, lineno: int, text: str, stages: List[List[str]],
+                 variable: Optional[str] = None, background: bool = False):
+        self.lineno = lineno
+        self.text = text
+        self.stages = stages
+        self.variable = variable
+        self.background = background
+
+
+def parse_line(lineno: int, text: str) -> Optional[ScriptLine]:
+    """解析一行脚本，空行和注释返回None
+
+    Raises:
+        ScriptError: 引号不匹配、管道两侧缺少命令等语法错误
+    """
+    try:
+        tokens = shlex.split(text, comments=True)
+    except ValueError as e:
+        raise ScriptError(f"第 {lineno} 行语法错误: {e}")
+    if not tokens:
+        return None
+
+    background = tokens[-1] == '&'
+    if background:
+        tokens = tokens[:-1]
+
+    variable = None
+    if len(tokens) >= 2 and tokens[1] == '=':
+        if not VARIABLE_NAME.match(tokens[0]):
+            raise ScriptError(f"第 {lineno} 行变量名无效: {tokens[0]}")
+        variable, tokens = tokens[0], tokens[2:]
+
+    stages = [[]]
+    for token in tokens:
+        if token == '|':
+            stages.append([])
+        else:
+            stages[-1].append(token)
+    for stage in stages:
+        # 兼容直接从 shell 脚本复制过来的 t/teable 前缀
+        if stage and stage[0] in ('t', 'teable'):
+            del stage[0]
+        if not stage:
+            raise ScriptError(f"第 {lineno} 行缺少命令: {text.strip()}")
+        if stage[0] == 'exec':
+            raise ScriptError(f"第 {lineno} 行: 脚本中不能嵌套 exec")
+    if (variable or background or len(stages) > 1) and stages[0][0] == 'wait':
+        raise ScriptError(f"第 {lineno} 行: wait 不能捕获变量、并发执行或用于管道")
+
+    return ScriptLine(lineno, text.strip(), stages, variable, background)
+
+
+def extract_record_ids(output: str) -> List[str]:
+    """从命令输出中提取记录ID（每行开头的 recXXX）"""
+    record_ids = []
+    for line in output.splitlines():
+        match = RECORD_ID_PATTERN.match(line)
+        if match:
+            record_ids.append(match.group(1))
+    return record_ids
+
+
+class _NoInput(io.StringIO):
+    """脚本中命令的标准输入：没有管道输入（isatty 为 True，命令不会进入管道模式）"""
+
+    def isatty(self):
+        return True
+
+
+class _ThreadLocalStream:
+    """按线程转发的 sys.stdin/sys.stdout
+
+    脚本执行期间替换 sys.stdin/sys.stdout，每个线程可以单独重定向（行内管道、变量捕获、
+    并发行的输出缓冲），未重定向的线程使用原来的流。
+    """
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def redirect(self, stream):
+        """把当前线程的读写重定向到 stream，None 表示恢复原来的流"""
+        self._local.stream = stream
+
+    def _target(self):
+        return getattr(self._local, 'stream', None) or self._default
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+    def __iter__(self):
+        return iter(self._target())
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def isatty(self):
+        return self._target().isatty()
+
+
+class ScriptRunner:
+    """在一个 TeableCLI 实例中执行脚本
+
+    普通行按顺序执行，某一行失败（返回码非0或抛出异常）时停止，keep_going=True 时继续执行后续行。
+    连续以 & 结尾的行提交到线程池并发执行，使用会话的副本（并发行中的 use 不影响其他行，
+    也不写回会话文件），输出先缓冲，全部完成后按行号顺序输出。
+    """
+
+    def __init__(self, cli, variables: Optional[Dict[str, Any]] = None,
+                 concurrency: int = DEFAULT_SCRIPT_CONCURRENCY, keep_going: bool = False):
+        self.cli = cli
+        self.variables: Dict[str, List[str]] = {name: [str(value)] for name, value in (variables or {}).items()}
+        self.concurrency = max(1, concurrency)
+        self.keep_going = keep_going
+        self.exit_code = 0
+        self._executor = None
+        self._pending = []
+        self._stdin: Optional[_ThreadLocalStream] = None
+        self._stdout: Optional[_ThreadLocalStream] = None
+
+    def run(self, lines: List[str]) -> int:
+        """执行脚本，返回第一个失败命令的返回码（全部成功时为0）"""
+        # 先创建共享的客户端，并发行直接复用
+        self.cli.client  # noqa: B018
+        self._stdin = sys.stdin = _ThreadLocalStream(sys.stdin)
+        self._stdout = sys.stdout = _ThreadLocalStream(sys.stdout)
+        try:
+            for lineno, text in enumerate(lines, 1):
+                try:
+                    self._run_script_line(lineno, text)
+                except ScriptError as e:
+                    print(f"错误: {e}", file=sys.stderr)
+                    self._fail(1)
+                if self.exit_code and not self.keep_going:
+                    break
+            self._wait()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+            sys.stdin = self._stdin._default
+            sys.stdout = self._stdout._default
+        return self.exit_code
+
+    def _run_script_line(self, lineno: int, text: str):
+        line = parse_line(lineno, text)
+        if line is None:
+            return
+        if line.background:
+            self._submit(line)
+            return
+        # 普通行执行前先等待之前的并发行完成，它们捕获的变量和失败都在此时生效
+        if not self._wait() and not self.keep_going:
+            return
+        if line.stages[0][0] == 'wait':
+            return
+        code, output = self._run_line(line, self._expand(line), self.cli)
+        self._finish(line, code, output)
+
+    def _fail(self, code: int):
+        if not self.exit_code:
+            self.exit_code = code
+
+    def _expand(self, line: ScriptLine) -> List[List[str]]:
+        """替换各段命令参数中的 ${变量}
+
+        参数恰好是一个变量且变量有多个值（如 show 捕获的多个记录ID）时展开为多个参数，
+        否则多个值用逗号连接。
+        """
+        def lookup(name: str) -> List[str]:
+            if name not in self.variables:
+                raise ScriptError(f"第 {line.lineno} 行引用了未定义的变量: ${{{name}}}")
+            if not self.variables[name]:
+                # 空变量展开后可能把单条更新变成其他语义，直接报错
+                raise ScriptError(f"第 {line.lineno} 行引用的变量 ${{{name}}} 没有值（命令没有输出记录ID）")
+            return self.variables[name]
+
+        stages = []
+        for stage in line.stages:
+            args = []
+            for arg in stage:
+                whole = VARIABLE_PATTERN.fullmatch(arg)
+                if whole:
+                    args.extend(lookup(whole.group(1)))
+                else:
+                    args.append(VARIABLE_PATTERN.sub(lambda m: ','.join(lookup(m.group(1))), arg))
+            stages.append(args)
+        return stages
+
+    def _run_line(self, line: ScriptLine, stages: List[List[str]], cli, buffered: bool = False):
+        """执行一行（可能包含行内管道），返回(返回码, 捕获的输出)
+
+        前一段命令的输出作为后一段命令的标准输入；需要捕获变量或缓冲输出时最后一段的输出也写入缓冲区。
+        """
+        stdin = _NoInput()
+        output = None
+        try:
+            for index, stage in enumerate(stages):
+                last = index == len(stages) - 1
+                output = io.StringIO() if (not last or line.variable or buffered) else None
+                self._stdin.redirect(stdin)
+                self._stdout.redirect(output)
+                try:
+                    code = self._dispatch(cli, stage)
+                finally:
+                    self._stdin.redirect(None)
+                    self._stdout.redirect(None)
+                if code or last:
+                    return code, output.getvalue() if output is not None else None
+                stdin = io.StringIO(output.getvalue())
+        except Exception as e:
+            logger.debug("脚本命令执行异常", exc_info=True)
+            print(f"错误: 第 {line.lineno} 行执行异常: {e}", file=sys.stderr)
+            return 1, output.getvalue() if output is not None else None
+
+    @staticmethod
+    def _dispatch(cli, stage: List[str]) -> int:
+        command, args = stage[0], stage[1:]
+        if command == 'echo':
+            print(' '.join(args))
+            return 0
+        code = cli.dispatch(command, args)
+        return code if isinstance(code, int) else 0
+
+    def _finish(self, line: ScriptLine, code: int, output: Optional[str]):
+        """记录一行的执行结果：保存捕获的变量、输出缓冲的内容、记录失败"""
+        if line.variable:
+            self.variables[line.variable] = extract_record_ids(output or '')
+        elif output:
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        if code:
+            print(f"错误: 第 {line.lineno} 行执行失败（返回码 {code}）: {line.text}", file=sys.stderr)
+            self._fail(code)
+
+    def _submit(self, line: ScriptLine):
+        """提交并发行（变量在提交时展开，不能引用同一组并发行捕获的变量）"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        stages = self._expand(line)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        # 所有并发行共享客户端（提交前已创建），各自使用会话副本
+        self.cli.session.load_session()
+        worker_cli = copy.copy(self.cli)
+        worker_cli.session = copy.copy(self.cli.session)
+        worker_cli.session.save_session = lambda: None
+        worker_cli.session.tables_cache = dict(self.cli.session.tables_cache)
+        future = self._executor.submit(self._run_line, line, stages, worker_cli, True)
+        self._pending.append((line, future))
+
+    def _wait(self) -> bool:
+        """等待已提交的并发行全部完成，按行号顺序处理结果，全部成功时返回True"""
+        pending, self._pending = self._pending, []
+        ok = True
+        for line, future in pending:
+            code, output = future.result()
+            self._finish(line, code, output)
+            ok = ok and not code
+        return ok
+
+
+def exec_command(cli, args: list):
+    """t exec 脚本文件|- [参数...] [--concurrency N] [--keep-going]"""
+    keep_going, args = _extract_option(args, '--keep-going', '-k', flag=True)
+    concurrency, args = _extract_option(args, '--concurrency', '-j', default=DEFAULT_SCRIPT_CONCURRENCY)
+    if not args:
+        print("错误: 请指定脚本文件")
+        print("使用: t exec 脚本文件 [参数...]   或   t exec - （从标准输入读取脚本）")
+        return 1
+
+    try:
+        concurrency = int(concurrency)
+    except ValueError:
+        print(f"错误: 无效的concurrency值 '{concurrency}'")
+        return 1
+
+    script_path, params = args[0], args[1:]
+    if script_path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        try:
+            with open(script_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            print(f"错误: 无法读取脚本文件: {e}")
+            return 1
+
+    variables = {str(index): value for index, value in enumerate(params, 1)}
+    runner = ScriptRunner(cli, variables, concurrency=concurrency, keep_going=keep_going)
+    return runner.run(lines)
@@ -6,20 +6,20 @@
 
 import sys
 import json
+import math
 import logging
-from typing import Optional, Dict, List, Any
-from tabulate import tabulate
-from rich.console import Console
-from rich.table import Table
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Callable, Iterable, Iterator, Tuple
 
 # 导入管道操作组件
 from .pipe_core import (
-    is_pipe_output, format_record_for_pipe
+    is_pipe_output, format_record_for_pipe, pipe_value_text
 )
 
 
 logger = logging.getLogger(__name__)
-console = Console()
 
 
 
@@ -41,6 +41,75 @@ def detect_link_fields(client, table_id: str) -> Dict[str, Dict[str, Any]]:
 
 
 
+def _link_candidate_fields(fields: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """关联记录匹配使用的候选字段：前两个非系统、非关联字段"""
+    candidate_fields = []
+    for field in fields:
+        field_name = field.get('name', '')
+        field_type = field.get('type', '')
+        # 跳过系统字段和关联字段
+        if field_name not in ['id', 'createdTime', 'updatedTime', 'createdBy', 'updatedBy'] and field_type != 'link':
+            candidate_fields.append({
+                'name': field_name,
+                'type': field_type
+            })
+            if len(candidate_fields) >= 2:
+                break
+    return candidate_fields
+
+
+def _link_filter_items(candidate_fields: List[Dict[str, str]], identifier: str) -> List[Dict[str, Any]]:
+    """为一个关联值构建候选字段的过滤条件（调用方用 OR 连接）"""
+    filter_set = []
+    for field_info in candidate_fields:
+        field_name = field_info['name']
+        field_type = field_info['type']
+        
+        # 根据字段类型选择合适的操作符
+        if field_type == 'autoNumber':
+            # autoNumber 字段使用 is 操作符（精确匹配）
+            try:
+                # 尝试将 identifier 转换为数字
+                num_value = int(identifier)
+                filter_set.append({"fieldId": field_name, "operator": "is", "value": num_value})
+            except ValueError:
+                # 如果不是数字，跳过这个字段
+                pass
+        elif field_type in ['singleLineText', 'longText']:
+            # 文本字段使用 contains 进行模糊匹配
+            filter_set.append({"fieldId": field_name, "operator": "contains", "value": identifier})
+        elif field_type == 'formula':
+            # formula 字段可能显示为文本，尝试 contains 匹配
+            filter_set.append({"fieldId": field_name, "operator": "contains", "value": identifier})
+        elif field_type in ['singleSelect', 'multipleSelect']:
+            # 选择字段使用 is 操作符（精确匹配）
+            filter_set.append({"fieldId": field_name, "operator": "is", "value": identifier})
+    return filter_set
+
+
+def _link_value_matches(candidate_fields: List[Dict[str, str]], record: Dict[str, Any],
+                        identifier: str, exact: bool = False) -> bool:
+    """本地判断记录是否匹配关联值，规则与 _link_filter_items 的过滤条件一致
+
+    exact=True 时只接受候选字段值与关联值完全相同的记录
+    """
+    record_fields = record.get('fields', {})
+    for field_info in candidate_fields:
+        value = record_fields.get(field_info['name'])
+        if value is None:
+            continue
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            text = str(item)
+            if text == identifier:
+                return True
+            if not exact and field_info['type'] in ['singleLineText', 'longText', 'formula'] \
+                    and identifier in text:
+                return True
+    return False
+
+
+
 def find_linked_record(client, foreign_table_id: str, identifier: str) -> Optional[Dict[str, Any]]:
     """查找关联记录，支持精确匹配和模糊匹配
     使用前两个列进行查找，提高匹配准确性
@@ -60,45 +129,11 @@ def find_linked_record(client, foreign_table_id: str, identifier: str) -> Option
     # 先获取表格字段信息，找到前两个非系统字段（包括所有类型）
     try:
         fields = client.get_table_fields(foreign_table_id)
-        candidate_fields = []
-        for field in fields:
-            field_name = field.get('name', '')
-            field_type = field.get('type', '')
-            # 跳过系统字段和关联字段
-            if field_name not in ['id', 'createdTime', 'updatedTime', 'createdBy', 'updatedBy'] and field_type != 'link':
-                candidate_fields.append({
-                    'name': field_name,
-                    'type': field_type
-                })
-                if len(candidate_fields) >= 2:
-                    break
+        candidate_fields = _link_candidate_fields(fields)
         
         if candidate_fields:
             # 使用前两个列字段进行匹配（OR关系，只要有一个匹配即可）
-            filter_set = []
-            for field_info in candidate_fields:
-                field_name = field_info['name']
-                field_type = field_info['type']
-                
-                # 根据字段类型选择合适的操作符
-                if field_type == 'autoNumber':
-                    # autoNumber 字段使用 is 操作符（精确匹配）
-                    try:
-                        # 尝试将 identifier 转换为数字
-                        num_value = int(identifier)
-                        filter_set.append({"fieldId": field_name, "operator": "is", "value": num_value})
-                    except ValueError:
-                        # 如果不是数字，跳过这个字段
-                        pass
-                elif field_type in ['singleLineText', 'longText']:
-                    # 文本字段使用 contains 进行模糊匹配
-                    filter_set.append({"fieldId": field_name, "operator": "contains", "value": identifier})
-                elif field_type == 'formula':
-                    # formula 字段可能显示为文本，尝试 contains 匹配
-                    filter_set.append({"fieldId": field_name, "operator": "contains", "value": identifier})
-                elif field_type in ['singleSelect', 'multipleSelect']:
-                    # 选择字段使用 is 操作符（精确匹配）
-                    filter_set.append({"fieldId": field_name, "operator": "is", "value": identifier})
+            filter_set = _link_filter_items(candidate_fields, identifier)
             
             if filter_set:
                 # 使用 OR 关系，只要有一个字段匹配即可
@@ -194,8 +229,8 @@ def list_tables(client, verbose: bool = False):
             headers = ["表格名称", "表格ID", "描述", "创建时间"]
             rows = []
             
-            for table in tables:
-                table_info = client.get_table_details(table['id'])
+            details = _gather_table_details(client, [table['id'] for table in tables])
+            for table, table_info in zip(tables, details):
                 rows.append([
                     table.get('name', 'N/A'),
                     table.get('id', 'N/A'),  # 显示完整ID以便复制使用
@@ -203,6 +238,7 @@ def list_tables(client, verbose: bool = False):
                     table.get('createdTime', 'N/A')[:10]
                 ])
             
+            from tabulate import tabulate
             print(tabulate(rows, headers=headers, tablefmt='simple'))
         else:
             # 简洁模式
@@ -219,6 +255,29 @@ def list_tables(client, verbose: bool = False):
 
 
 
+def _gather_table_details(client, table_ids: List[str]) -> List[Dict[str, Any]]:
+    """并发获取多个表格的详情，结果顺序与 table_ids 一致
+
+    安装了 httpx 时使用 AsyncTeableClient 在一个事件循环中 gather 全部请求，
+    否则用线程池并发调用同步客户端。
+    """
+    try:
+        from async_teable_client import AsyncTeableClient
+        import httpx  # noqa: F401
+    except ImportError:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, min(len(table_ids), client.limiter.max_limit))) as executor:
+            return list(executor.map(client.get_table_details, table_ids))
+
+    import asyncio
+
+    async def gather():
+        async with AsyncTeableClient.from_client(client) as async_client:
+            return await asyncio.gather(*(async_client.get_table_details(table_id) for table_id in table_ids))
+
+    return asyncio.run(gather())
+
+
 def process_link_field_value(client, field_name: str, field_value: str, link_fields: Dict[str, Dict[str, Any]], session=None) -> Optional[str]:
     """处理关联字段值，返回关联记录ID"""
     if field_name not in link_fields:
@@ -346,6 +405,140 @@ def process_link_field_value(client, field_name: str, field_value: str, link_fie
 
 
 
+class LinkResolver:
+    """管道模式的关联字段批量解析器
+
+    同一批次中的关联值先去重，每个外键表用一次 OR 过滤查询解析全部未知值；
+    解析结果（包括未找到）按 (外键表ID, 值) 保存在 LRU 缓存中，同一次运行中
+    重复出现的值不再查询。匹配规则与 find_linked_record 相同，多个记录匹配时
+    优先取完全相等的唯一记录，否则视为无法解析（管道模式下不能交互选择）。
+    """
+    
+    # 单次 OR 查询包含的关联值数量，避免过滤条件过长
+    QUERY_CHUNK_SIZE = 50
+    
+    def __init__(self, client, link_fields: Dict[str, Dict[str, Any]], cache_size: int = 10000):
+        self.client = client
+        self.link_fields = link_fields
+        self.cache_size = cache_size
+        self.lookups = 0
+        self._cache = OrderedDict()
+        self._candidate_fields = {}
+        self._lock = threading.Lock()
+    
+    def _cache_get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return True, self._cache[key]
+        return False, None
+    
+    def _cache_put(self, key, record_id: Optional[str]):
+        with self._lock:
+            self._cache[key] = record_id
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _get_candidate_fields(self, foreign_table_id: str) -> List[Dict[str, str]]:
+        if foreign_table_id not in self._candidate_fields:
+            fields = self.client.get_table_fields(foreign_table_id)
+            self._candidate_fields[foreign_table_id] = _link_candidate_fields(fields)
+        return self._candidate_fields[foreign_table_id]
+    
+    @staticmethod
+    def _link_value(value: Any) -> str:
+        # 机器格式管道中的关联字段值是 {"id", "title"} 对象或其列表，按第一个对象的标题匹配
+        if isinstance(value, list):
+            value = value[0] if value else ''
+        return pipe_value_text(value) if isinstance(value, dict) else str(value)
+    
+    @staticmethod
+    def _is_record_id(value: str) -> bool:
+        # 管道模式下记录ID格式的值直接使用，不需要查找
+        return value.startswith('rec') and len(value) >= 15
+    
+    def prefetch(self, field_name: str, values: Iterable[Any]):
+        """批量解析一个关联字段的多个值，结果写入缓存"""
+        link_info = self.link_fields.get(field_name)
+        if not link_info:
+            return
+        foreign_table_id = link_info['foreign_table_id']
+        
+        pending = []
+        seen = set()
+        for value in values:
+            value = self._link_value(value)
+            if not value or self._is_record_id(value) or value in seen:
+                continue
+            seen.add(value)
+            if not self._cache_get((foreign_table_id, value))[0]:
+                pending.append(value)
+        
+        for i in range(0, len(pending), self.QUERY_CHUNK_SIZE):
+            self._resolve_values(foreign_table_id, pending[i:i + self.QUERY_CHUNK_SIZE])
+    
+    def _resolve_values(self, foreign_table_id: str, values: List[str]):
+        """用一次 OR 过滤查询解析多个关联值"""
+        try:
+            candidate_fields = self._get_candidate_fields(foreign_table_id)
+            filter_set = []
+            for value in values:
+                filter_set.extend(_link_filter_items(candidate_fields, value))
+            
+            records = []
+            if filter_set:
+                self.lookups += 1
+                query = {'filter': json.dumps({"conjunction": "or", "filterSet": filter_set})}
+                for page in self.client.iter_record_pages(foreign_table_id, page_size=1000, **query):
+                    records.extend(page)
+        except Exception as e:
+            logger.error(f"批量查找关联记录失败: {e}")
+            return
+        
+        for value in values:
+            matches = [r for r in records if _link_value_matches(candidate_fields, r, value)]
+            if len(matches) > 1:
+                exact = [r for r in matches if _link_value_matches(candidate_fields, r, value, exact=True)]
+                if len(exact) == 1:
+                    matches = exact
+                else:
+                    logger.warning(f"关联值 '{value}' 匹配到 {len(matches)} 条记录，无法确定，跳过")
+            record_id = matches[0].get('id') if len(matches) == 1 else None
+            self._cache_put((foreign_table_id, value), record_id)
+    
+    def resolve(self, field_name: str, field_value: Any) -> Optional[str]:
+        """返回关联值对应的记录ID，未找到或无法确定时返回None"""
+        field_value = self._link_value(field_value)
+        link_info = self.link_fields.get(field_name)
+        if not link_info:
+            return field_value
+        if self._is_record_id(field_value):
+            return field_value
+        
+        key = (link_info['foreign_table_id'], field_value)
+        found, record_id = self._cache_get(key)
+        if not found:
+            self.prefetch(field_name, [field_value])
+            found, record_id = self._cache_get(key)
+        if record_id is None:
+            logger.warning(f"未找到关联字段 '{field_name}' 的目标记录: {field_value}")
+        return record_id
+    
+    def prefetch_for_mappings(self, records: List[Dict[str, Any]], mappings: Dict[str, Dict[str, Any]]):
+        """根据字段映射（@字段/常量）收集一批管道记录中的关联值并批量解析"""
+        for target_field, mapping_info in mappings.items():
+            if target_field not in self.link_fields:
+                continue
+            if mapping_info['type'] == 'field_mapping':
+                source_field = mapping_info['source_field']
+                values = [r.get('fields', {}).get(source_field) for r in records]
+                self.prefetch(target_field, [v for v in values if v is not None])
+            else:
+                self.prefetch(target_field, [mapping_info['value']])
+
+
+
 def is_field_editable(field: Dict[str, Any]) -> bool:
     """检查字段是否可编辑（非公式、非引用字段）"""
     field_type = field.get('type', '')
@@ -409,28 +602,56 @@ def is_field_required(field: Dict[str, Any]) -> bool:
 
 
 
-def convert_field_value(field_type: str, value: Any) -> Any:
-    """根据字段类型转换值"""
-    if field_type in ['number', 'percent', 'currency']:
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return value
-    elif field_type == 'checkbox':
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ['true', '1', 'yes', '是']
-        return bool(value)
-    elif field_type == 'multipleSelect':
-        if isinstance(value, list):
-            return value
-        if isinstance(value, str):
-            return [v.strip() for v in value.split(',')]
+def _convert_number_value(value: Any) -> Any:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return value
+
+
+def _convert_checkbox_value(value: Any) -> Any:
+    if isinstance(value, bool):
         return value
+    if isinstance(value, str):
+        return value.lower() in ['true', '1', 'yes', '是']
+    return bool(value)
+
+
+def _convert_multiple_select_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',')]
     return value
 
 
+def _convert_plain_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        # 机器格式管道中的结构化值写入文本类字段时转换为文本
+        return pipe_value_text(value)
+    return value
+
+
+# 字段类型 -> 值转换函数（未列出的类型按文本类字段处理）
+FIELD_VALUE_CONVERTERS = {
+    'number': _convert_number_value,
+    'percent': _convert_number_value,
+    'currency': _convert_number_value,
+    'checkbox': _convert_checkbox_value,
+    'multipleSelect': _convert_multiple_select_value,
+}
+
+
+def field_value_converter(field_type: str) -> Callable[[Any], Any]:
+    """返回字段类型对应的值转换函数，批量写入时按字段预先取出，不必每个值都按类型分派"""
+    return FIELD_VALUE_CONVERTERS.get(field_type, _convert_plain_value)
+
+
+def convert_field_value(field_type: str, value: Any) -> Any:
+    """根据字段类型转换值"""
+    return field_value_converter(field_type)(value)
+
+
 
 def use_table(client, session, table_name: str):
     """切换到指定表格"""
@@ -477,46 +698,133 @@ def use_table(client, session, table_name: str):
 
 
 
+# 删除操作默认每批记录数（每批一次批量删除请求）
+DELETE_DEFAULT_BATCH_SIZE = 100
+# 删除汇总中最多列出的失败记录数
+DELETE_FAILURE_DISPLAY_LIMIT = 20
+# 批次中个别记录不合法或不存在时，服务器拒绝整个批量删除请求的状态码
+DELETE_ROW_ERROR_STATUS_CODES = {400, 404, 422}
+
+
+def _confirm_from_tty(prompt: str) -> bool:
+    """管道模式下的确认：stdin 被管道占用，从终端读取回答"""
+    try:
+        with open('/dev/tty', 'r+') as tty:
+            tty.write(prompt)
+            tty.flush()
+            answer = tty.readline().strip().lower()
+    except OSError:
+        print("错误: 管道模式下无法交互确认，请使用 --yes 跳过确认", file=sys.stderr)
+        return False
+    return answer in ['y', 'yes', '是']
+
+
+
+def _delete_record_batch(client, table_id: str, record_ids: List[str], sizer=None):
+    """删除一批记录，返回(已删除的记录ID列表, 失败列表[(记录ID, 错误)])
+    
+    批量删除请求被服务器以 400/404/422 拒绝时（如其中某条记录已不存在），拆成两半分别重试，
+    直到定位出具体失败的记录，其余记录照常删除。413 由 send_batch 拆分重试，已删除的子批次
+    不会重新发送；其他错误（如服务器不可用）直接抛出。
+    """
+    from .bulk_core import send_batch
+    
+    failed = []
+    
+    def send(chunk):
+        try:
+            client.batch_delete_records(table_id, chunk)
+            return chunk
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            if response is None or response.status_code not in DELETE_ROW_ERROR_STATUS_CODES:
+                raise
+            if len(chunk) == 1:
+                failed.append((chunk[0], e))
+                return []
+            logger.warning(f"批量删除 {len(chunk)} 条记录失败，拆分重试: {str(e).splitlines()[0]}")
+            middle = len(chunk) // 2
+            return send_batch(send, chunk[:middle], sizer) + send_batch(send, chunk[middle:], sizer)
+    
+    # 同一批次中的重复ID只删除一次
+    record_ids = list(dict.fromkeys(record_ids))
+    return send_batch(send, record_ids, sizer), failed
+
+
+
+def _print_delete_summary(success_count: int, failed: List[tuple]) -> int:
+    """打印删除汇总（含部分失败的记录和原因），返回状态码"""
+    print(f"\n📊 删除完成: 成功 {success_count} 条，失败 {len(failed)} 条")
+    if not failed:
+        return 0
+    
+    # 按错误类型（HTTP状态码或异常类型）分组汇总
+    groups = OrderedDict()
+    for record_id, error in failed:
+        response = getattr(error, 'response', None)
+        reason = f"HTTP {response.status_code}" if response is not None else type(error).__name__
+        groups.setdefault(reason, []).append((record_id, error))
+    for reason, items in groups.items():
+        record_ids = [record_id for record_id, _ in items]
+        shown = ', '.join(record_ids[:DELETE_FAILURE_DISPLAY_LIMIT])
+        more = f" 等 {len(record_ids)} 条" if len(record_ids) > DELETE_FAILURE_DISPLAY_LIMIT else ""
+        print(f"❌ {reason}（{len(record_ids)} 条）: {shown}{more}")
+        print(f"  示例错误: {str(items[0][1]).splitlines()[0]}")
+    return 1
+
+
+
 def delete_record(client, session, args: list):
-    """删除记录"""
+    """删除记录
+    
+    使用: t delete 记录ID1 [记录ID2 ...] [--yes]
+          t show ... | t delete [--yes] [--batch-size N] [--concurrency N]
+    """
     try:
+        from .pipe_core import is_pipe_input
+        from .bulk_core import parse_bulk_options, make_batch_sizer
+        
         table_id = session.get_current_table_id()
         table_name = session.get_current_table()
         
+        bulk_options, args = parse_bulk_options(args)
+        yes, args = _extract_option(args, '--yes', '-y', flag=True)
+        sizer = make_batch_sizer(bulk_options, default_size=DELETE_DEFAULT_BATCH_SIZE)
+        
+        if not args and is_pipe_input():
+            return _delete_pipe_mode(client, table_id, table_name, bulk_options, sizer, yes)
+        
         if not args:
             print("错误: 请指定要删除的记录ID")
             print("使用: t delete 记录ID1 [记录ID2 ...]")
             return 1
         
         # 确认删除
-        confirm = input(f"确定要删除 {len(args)} 条记录吗？ (y/N): ").strip().lower()
-        if confirm not in ['y', 'yes', '是']:
-            print("取消删除操作")
-            return 0
+        if not yes:
+            confirm = input(f"确定要删除 {len(args)} 条记录吗？ (y/N): ").strip().lower()
+            if confirm not in ['y', 'yes', '是']:
+                print("取消删除操作")
+                return 0
         
         success_count = 0
         failed_records = []
         
-        for record_id in args:
-            try:
-                result = client.delete_record(table_id, record_id)
-                if result:
-                    success_count += 1
+        # 按批次使用批量删除接口
+        try:
+            for i in range(0, len(args), sizer.size):
+                deleted, failed = _delete_record_batch(client, table_id, args[i:i + sizer.size], sizer)
+                for record_id in deleted:
                     print(f"✅ 已删除记录 {record_id}")
-                else:
-                    failed_records.append(record_id)
-                    print(f"❌ 删除记录 {record_id} 失败")
-            except Exception as e:
-                failed_records.append(record_id)
-                print(f"❌ 删除记录 {record_id} 失败: {e}")
-        
-        print(f"\n📊 删除完成: 成功 {success_count} 条，失败 {len(failed_records)} 条")
-        
-        if failed_records:
-            print(f"失败的记录ID: {', '.join(failed_records)}")
+                for record_id, error in failed:
+                    print(f"❌ 删除记录 {record_id} 失败: {str(error).splitlines()[0]}")
+                success_count += len(deleted)
+                failed_records.extend(failed)
+        except Exception as e:
+            print(f"错误: 删除记录失败: {e}")
+            _print_delete_summary(success_count, failed_records)
             return 1
         
-        return 0
+        return _print_delete_summary(success_count, failed_records)
             
     except Exception as e:
         print(f"错误: 删除记录失败: {e}")
@@ -524,6 +832,83 @@ def delete_record(client, session, args: list):
 
 
 
+def _delete_pipe_mode(client, table_id: str, table_name: str, bulk_options: Dict[str, Any],
+                      sizer, yes: bool = False):
+    """管道模式的delete命令 - 从管道流式读取记录ID，按批次批量删除"""
+    from .pipe_core import read_pipe_records
+    from .bulk_core import describe_batch_size, describe_concurrency, read_batches, run_batches
+    
+    if not yes and not _confirm_from_tty(f"确定要删除管道输入的所有记录（表格 '{table_name}'）吗？ (y/N): "):
+        print("取消删除操作")
+        return 0
+    
+    print(f"开始流式删除，{describe_batch_size(sizer)}{describe_concurrency(bulk_options)}...")
+    
+    record_ids = (record['id'] for record in read_pipe_records())
+    batches = read_batches(record_ids, sizer, bulk_options['flush_interval'])
+    
+    total_processed = 0
+    success_count = 0
+    failed_records = []
+    try:
+        for batch, (deleted, failed) in run_batches(
+                batches, lambda batch: _delete_record_batch(client, table_id, batch, sizer),
+                bulk_options['concurrency'], bulk_options['ordered']):
+            previous_processed = total_processed
+            total_processed += len(batch)
+            success_count += len(deleted)
+            failed_records.extend(failed)
+        
+            if total_processed // 500 > previous_processed // 500:
+                print(f"实时流式删除进度: 已处理 {total_processed} 条记录，成功 {success_count} 条，失败 {len(failed_records)} 条")
+    except (Exception, KeyboardInterrupt) as e:
+        reason = "用户中断" if isinstance(e, KeyboardInterrupt) else f"{e}"
+        print(f"❌ 流式删除已中断（{reason}），已处理 {total_processed} 条记录")
+        _print_delete_summary(success_count, failed_records)
+        return 1
+    
+    if total_processed == 0:
+        print("错误: 没有从管道接收到有效的记录数据")
+        return 1
+    
+    return _print_delete_summary(success_count, failed_records)
+
+
+
+def _extract_option(args: list, *names: str, flag: bool = False, default: Any = None):
+    """从参数列表中提取选项，返回(选项值, 剩余参数)
+
+    支持 `--name 值`、`--name=值` 两种写法；flag=True 时选项不带值，出现即为True。
+    选项参数中的 '=' 会干扰字段赋值的解析，所以需要在解析字段之前先提取出来。
+
+    Args:
+        args: 参数列表
+        *names: 选项名（如 '--prefetch'）
+        flag: 是否为开关选项
+        default: 选项未出现时的默认值
+    """
+    value = default
+    remaining = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        name, sep, inline_value = arg.partition('=')
+        if name in names:
+            if flag:
+                value = True
+            elif sep:
+                value = inline_value
+            elif i + 1 < len(args):
+                value = args[i + 1]
+                i += 1
+            i += 1
+            continue
+        remaining.append(arg)
+        i += 1
+    return value, remaining
+
+
+
 def _parse_where_condition_arg(arg: str) -> Optional[Dict[str, Any]]:
     """解析单个where条件参数，支持@字段名语法
     
@@ -633,7 +1018,9 @@ def _resolve_condition_value(condition: Dict[str, Any], pipe_fields: Dict[str, A
         if not source_field:
             return None
         if pipe_fields and source_field in pipe_fields:
-            return pipe_fields[source_field]
+            value = pipe_fields[source_field]
+            # 机器格式管道中的数组/对象值转换为文本作为过滤条件
+            return pipe_value_text(value) if isinstance(value, (dict, list)) else value
         else:
             logger.warning(f"管道记录中不存在字段 '{source_field}'")
             return None
@@ -740,6 +1127,100 @@ def _build_query_params_from_conditions(conditions: List[Dict[str, Any]],
 
 
 
+def _normalize_join_value(value: Any) -> str:
+    """连接键规范化：数字统一格式（100 与 100.0 视为相同），其他值取字符串"""
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    if math.isfinite(number) and number.is_integer():
+        return str(int(number))
+    return repr(number)
+
+
+def _join_value_candidates(value: Any) -> List[str]:
+    """字段值可参与连接的所有规范化形式（多值字段的每个元素、关联字段的标题也可以匹配）"""
+    if value is None:
+        return []
+    candidates = [_normalize_join_value(value)]
+    if isinstance(value, list):
+        for item in value:
+            candidates.extend(_join_value_candidates(item))
+    elif isinstance(value, dict) and 'title' in value:
+        candidates.append(_normalize_join_value(value['title']))
+    return candidates
+
+
+def _record_join_keys(record: Dict[str, Any], key_fields: List[str]) -> List[Tuple[str, ...]]:
+    """目标表记录的连接键（可能有多个）"""
+    record_fields = record.get('fields', {})
+    per_field = [set(_join_value_candidates(record_fields.get(name))) for name in key_fields]
+    return list(itertools.product(*per_field))
+
+
+def _pipe_join_key(pipe_record: Dict[str, Any], source_fields: List[str]):
+    """管道记录的连接键和原始值，缺少字段时返回(None, None)"""
+    pipe_fields = pipe_record.get('fields', {})
+    raw_values = []
+    for source_field in source_fields:
+        if source_field not in pipe_fields:
+            logger.warning(f"管道记录中不存在字段 '{source_field}'")
+            return None, None
+        value = pipe_fields[source_field]
+        raw_values.append(pipe_value_text(value) if isinstance(value, (dict, list)) else value)
+    return tuple(_normalize_join_value(v) for v in raw_values), raw_values
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fetch_records_by_join_keys(client, table_id: str, key_fields: List[str],
+                                keys: Dict[Tuple[str, ...], List[Any]],
+                                static_filter_set: Optional[List[Dict[str, Any]]] = None,
+                                page_size: int = 1000, **kwargs):
+    """用一次 OR 过滤查询取回多个连接键的匹配记录
+    
+    Args:
+        client: Teable客户端
+        table_id: 目标表ID
+        key_fields: 目标表的连接字段
+        keys: 规范化连接键 -> 原始值列表（原始值用于构建过滤条件）
+        static_filter_set: 需要同时满足的其他过滤条件
+        page_size: 分页大小
+        **kwargs: 其他查询参数（如 orderBy）
+    
+    Returns:
+        (连接键 -> 匹配记录列表, 查询的页数)
+    """
+    key_filters = []
+    for raw_values in keys.values():
+        items = [{"fieldId": name, "operator": "is", "value": value}
+                 for name, value in zip(key_fields, raw_values)]
+        key_filters.append(items[0] if len(items) == 1 else {"conjunction": "and", "filterSet": items})
+    kwargs['filter'] = json.dumps({
+        "conjunction": "and",
+        "filterSet": list(static_filter_set or []) + [{"conjunction": "or", "filterSet": key_filters}]
+    })
+    
+    matches = {key: [] for key in keys}
+    pages = 0
+    for page in client.iter_record_pages(table_id, page_size=page_size, **kwargs):
+        pages += 1
+        for record in page:
+            for key in _record_join_keys(record, key_fields):
+                if key in matches:
+                    matches[key].append(record)
+    return matches, pages
+
+
+
 def _parse_where_conditions(where_args: list) -> Dict[str, str]:
     """解析where条件参数，返回条件字典（旧版本，保持兼容）"""
     where_conditions = {}
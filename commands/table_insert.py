@@ -6,11 +6,9 @@
 
 import sys
 import json
+import itertools
 import logging
 from typing import Optional, Dict, List, Any
-from tabulate import tabulate
-from rich.console import Console
-from rich.table import Table
 
 # 导入管道操作组件
 from .pipe_core import (
@@ -19,11 +17,15 @@ from .pipe_core import (
 
 
 logger = logging.getLogger(__name__)
-console = Console()
 
 
 
 from .table_common import *
+from .codec_core import TableCodec
+from .bulk_core import (
+    BatchSizer, parse_bulk_options, make_batch_sizer, describe_batch_size,
+    describe_concurrency, read_batches, run_batches, send_batch
+)
 
 def insert_record(client, session, args: list):
     """插入记录，返回(状态码, 记录ID)元组"""
@@ -332,11 +334,16 @@ def insert_record(client, session, args: list):
 def insert_pipe_mode(client, session, table_id: str, table_name: str, args: list):
     """管道模式的insert命令 - 从管道流式读取记录并批量插入"""
     try:
-        from .pipe_core import parse_pipe_input_line
+        from .pipe_core import read_pipe_records
+        
+        # 提取批量选项（--batch-size / --flush-interval），避免被当作字段赋值解析
+        bulk_options, args = parse_bulk_options(args)
+        sizer = make_batch_sizer(bulk_options)
         
-        # 直接读取第一行
-        first_line = sys.stdin.readline()
-        if not first_line or not first_line.strip():
+        # 直接读取第一条记录（管道格式自动识别）
+        pipe_records = read_pipe_records()
+        first_record = next(pipe_records, None)
+        if first_record is None:
             print("错误: 没有从管道接收到有效的记录数据", file=sys.stderr)
             return 1
         
@@ -400,58 +407,50 @@ def insert_pipe_mode(client, session, table_id: str, table_name: str, args: list
         logger.info(f"字段映射详情: {field_mappings}")
         
         # 流式处理参数
-        batch_size = 10  # 小批次，快速响应
         total_processed = 0
-        current_batch = []
         success_count = 0
         error_count = 0
         
-        print(f"开始真正流式处理，每批{batch_size}条记录...")
+        print(f"开始真正流式处理，{describe_batch_size(sizer)}{describe_concurrency(bulk_options)}...")
+        
+        # 从管道流式读取记录（第一条已经在前面读取了）
+        logger.debug(f"第一条管道记录: {first_record}")
+        pipe_records = itertools.chain([first_record], pipe_records)
+        
+        # 关联值解析结果在整个运行中复用，相同的值只查询一次
+        link_resolver = LinkResolver(client, link_fields)
+        
+        # 写入计划只编译一次，每条记录按计划直接转换
+        codec = TableCodec(fields, link_fields, field_mappings)
         
-        # 从管道流式读取记录
+        def process(batch):
+            return _process_insert_batch(client, table_id, batch, codec, sizer, link_resolver)
+        
+        # 批次满或到达刷新时限时立即处理；--concurrency 时多个批次同时在途，
+        # 在途批次已满时暂停读取管道（背压）
+        batches = read_batches(pipe_records, sizer, bulk_options['flush_interval'])
         try:
-            # 先处理第一行（已经在前面读取了）
-            logger.debug(f"解析第一行管道输入: '{first_line.strip()}'")
-            pipe_record = parse_pipe_input_line(first_line)
-            if pipe_record:
-                logger.debug(f"解析成功: record_id='{pipe_record.get('id')}', fields={list(pipe_record.get('fields', {}).keys())}")
-                current_batch.append(pipe_record)
-            else:
-                logger.warning(f"第一行解析失败，跳过: '{first_line.strip()}'")
+            for current_batch, (batch_success, batch_errors, inserted_ids) in run_batches(
+                    batches, process, bulk_options['concurrency'], bulk_options['ordered']):
+                # 统一输出格式：总是输出记录ID到stdout（标准管道格式），只在主线程输出
+                for record_id in inserted_ids:
+                    print(record_id, flush=True)
             
-            # 继续读取剩余的行
-            for line in sys.stdin:
-                pipe_record = parse_pipe_input_line(line)
-                if pipe_record:
-                    current_batch.append(pipe_record)
-                    
-                    # 当批次满时立即处理
-                    if len(current_batch) >= batch_size:
-                        batch_success, batch_errors = _process_insert_batch(
-                            client, table_id, current_batch, field_mappings,
-                            fields, link_fields, total_processed + len(current_batch)
-                        )
-                        success_count += batch_success
-                        error_count += batch_errors
-                        total_processed += len(current_batch)
-                        current_batch = []
-                        
-                        # 显示实时进度
-                        if total_processed % 50 == 0:
-                            print(f"实时流式插入进度: 已处理 {total_processed} 条记录，成功 {success_count} 条，失败 {error_count} 条")
-        
+                # 人类可读的消息输出到stderr，这样不会影响管道传递
+                if inserted_ids and sys.stdout.isatty():
+                    print(f"✅ 成功插入 {len(inserted_ids)} 条记录", file=sys.stderr)
+            
+                success_count += batch_success
+                error_count += batch_errors
+                previous_processed = total_processed
+                total_processed += len(current_batch)
+            
+                # 显示实时进度（每50条）
+                if total_processed // 50 > previous_processed // 50:
+                    print(f"实时流式插入进度: 已处理 {total_processed} 条记录，成功 {success_count} 条，失败 {error_count} 条")
         except KeyboardInterrupt:
-            print(f"\n用户中断，正在处理剩余记录...")
-        
-        # 处理剩余记录
-        if current_batch:
-            batch_success, batch_errors = _process_insert_batch(
-                client, table_id, current_batch, field_mappings,
-                fields, link_fields, total_processed + len(current_batch)
-            )
-            success_count += batch_success
-            error_count += batch_errors
-            total_processed += len(current_batch)
+            print(f"❌ 流式插入已中断，已处理 {total_processed} 条记录，成功 {success_count} 条，失败 {error_count} 条")
+            return 1
         
         if total_processed > 0:
             print(f"✅ 真正流式插入完成，共处理 {total_processed} 条记录，成功 {success_count} 条，失败 {error_count} 条")
@@ -467,89 +466,31 @@ def insert_pipe_mode(client, session, table_id: str, table_name: str, args: list
 
 
 def _process_insert_batch(client, table_id: str, batch_records: List[Dict[str, Any]],
-                         field_mappings: Dict[str, str], fields: List[Dict[str, Any]],
-                         link_fields: Dict[str, Dict[str, Any]], progress_count: int):
-    """处理一批插入记录"""
+                         codec: TableCodec, sizer: Optional[BatchSizer] = None,
+                         link_resolver: Optional[LinkResolver] = None):
+    """处理一批插入记录，返回(成功数, 失败数, 插入的记录ID列表)
+
+    可能在工作线程中执行，因此不直接写stdout，由调用方按顺序输出记录ID。
+    """
     try:
+        # 批次内的关联值去重后一次查询解析
+        link_resolver = link_resolver or LinkResolver(client, codec.link_fields)
+        codec.prefetch(batch_records, link_resolver)
+        
         insert_records = []
+        inserted_ids = []
         batch_success = 0
         batch_errors = 0
         
-        # 构建字段名到字段信息的映射，方便查找
-        field_info_map = {}
-        for field in fields:
-            field_name = field.get('name', '')
-            field_info_map[field_name] = field
-        
+        # 按编译好的写入计划转换每条记录
+        encode = codec.encode
         for pipe_record in batch_records:
             try:
-                record_data = {}
-                record_id = pipe_record.get('id', '')
-                pipe_fields = pipe_record.get('fields', {})
-                logger.info(f"处理管道记录: record_id='{record_id}', pipe_fields={list(pipe_fields.keys())}")
-                
-                # 根据字段映射构建记录数据
-                for target_field, mapping_info in field_mappings.items():
-                    # 检查目标字段是否存在
-                    target_field_info = field_info_map.get(target_field)
-                    
-                    if not target_field_info:
-                        logger.warning(f"目标字段 '{target_field}' 不存在，跳过")
-                        continue
-                    
-                    # 跳过系统字段和不可编辑字段
-                    if target_field in ['id', 'createdTime', 'updatedTime', 'createdBy', 'updatedBy']:
-                        continue
-                    if not is_field_editable(target_field_info):
-                        logger.debug(f"跳过不可编辑字段 '{target_field}'")
-                        continue
-                    
-                    field_type = target_field_info.get('type', 'singleLineText')
-                    
-                    # 确定字段值：根据映射类型决定
-                    if mapping_info['type'] == 'field_mapping':
-                        # 字段映射：从管道记录中获取字段值
-                        source_field = mapping_info['source_field']
-                        logger.info(f"处理字段映射: 目标字段='{target_field}', 源字段='{source_field}', record_id='{record_id}'")
-                        # 特殊处理：@id 表示记录ID，从 pipe_record 的 id 字段获取
-                        if source_field == 'id' or source_field == '@id':
-                            field_value = record_id
-                            logger.info(f"使用记录ID: field_value='{field_value}'")
-                            if not field_value:
-                                logger.warning(f"记录ID为空，跳过字段 '{target_field}'")
-                                continue
-                        elif source_field in pipe_fields:
-                            field_value = pipe_fields[source_field]
-                        else:
-                            logger.warning(f"管道记录中不存在字段 '{source_field}'，跳过字段 '{target_field}'")
-                            continue
-                    else:
-                        # 常量值：直接使用
-                        field_value = mapping_info['value']
-                    
-                    # 处理关联字段
-                    if target_field in link_fields:
-                        linked_record_id = process_link_field_value(
-                            client, target_field, str(field_value), link_fields, session=None
-                        )
-                        if linked_record_id:
-                            relationship = link_fields[target_field].get('relationship', 'manyOne')
-                            if relationship in ['manyMany', 'oneMany']:
-                                record_data[target_field] = [{'id': linked_record_id}]
-                            else:
-                                record_data[target_field] = {'id': linked_record_id}
-                        else:
-                            logger.warning(f"关联字段 '{target_field}' 处理失败，跳过")
-                            continue
-                    else:
-                        # 普通字段，转换值类型
-                        converted_value = convert_field_value(field_type, field_value)
-                        record_data[target_field] = converted_value
-                
+                record_data = encode(pipe_record, link_resolver)
                 if record_data:
                     insert_records.append({'fields': record_data})
                 else:
-                    logger.warning(f"记录 {record_id} 没有有效字段数据，跳过")
+                    logger.warning(f"记录 {pipe_record.get('id', '')} 没有有效字段数据，跳过")
                     batch_errors += 1
                     
             except Exception as e:
@@ -558,29 +499,19 @@ def _process_insert_batch(client, table_id: str, batch_records: List[Dict[str, A
         
         # 执行批量插入
         if insert_records:
-            # 检查是否有关联字段
-            has_link_fields = any(
-                any(target_field in link_fields for target_field in record.get('fields', {}).keys())
-                for record in insert_records
-            )
-            
-            # 如果有关联字段，使用字段名模式（fieldKeyType: "name"）
             try:
-                result = client.insert_records(table_id, insert_records, use_field_ids=False)
-                if result and 'records' in result:
-                    inserted_count = len(result['records'])
+                # 批次过大(413)时自动拆分重试
+                inserted_records = send_batch(
+                    lambda chunk: client.insert_records(table_id, chunk,
+                                                        use_field_ids=codec.use_field_ids).get('records', []),
+                    insert_records, sizer
+                )
+                if inserted_records:
+                    inserted_count = len(inserted_records)
                     batch_success += inserted_count
-                    logger.info(f"成功插入批次: {inserted_count} 条记录 (累计: {progress_count})")
-                    
-                    # 统一输出格式：总是输出记录ID到stdout（标准管道格式）
-                    for inserted_record in result['records']:
-                        record_id = inserted_record.get('id', '')
-                        if record_id:
-                            print(record_id, flush=True)
-                    
-                    # 人类可读的消息输出到stderr，这样不会影响管道传递
-                    if sys.stdout.isatty():
-                        print(f"✅ 成功插入 {inserted_count} 条记录", file=sys.stderr)
+                    batch_errors += len(insert_records) - inserted_count
+                    logger.info(f"成功插入批次: {inserted_count} 条记录")
+                    inserted_ids = [r.get('id', '') for r in inserted_records if r.get('id')]
                 else:
                     logger.warning(f"批次插入失败: {len(insert_records)} 条记录")
                     batch_errors += len(insert_records)
@@ -589,12 +520,12 @@ def _process_insert_batch(client, table_id: str, batch_records: List[Dict[str, A
                 logger.error(f"插入数据: {insert_records}")
                 batch_errors += len(insert_records)
         
-        return batch_success, batch_errors
+        return batch_success, batch_errors, inserted_ids
         
     except Exception as e:
         logger.error(f"批次插入失败: {e}", exc_info=True)
-        print(f"⚠️  批次插入失败 ({len(batch_records)} 条记录): {e}")
-        return 0, len(batch_records)
+        print(f"⚠️  批次插入失败 ({len(batch_records)} 条记录): {e}", file=sys.stderr)
+        return 0, len(batch_records), []
 
 
 
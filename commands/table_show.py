@@ -6,11 +6,11 @@
 
 import sys
 import json
+import math
 import logging
-from typing import Optional, Dict, List, Any
-from tabulate import tabulate
-from rich.console import Console
-from rich.table import Table
+import itertools
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Iterable, Tuple
 
 # 导入管道操作组件
 from .pipe_core import (
@@ -19,18 +19,35 @@ from .pipe_core import (
 
 
 logger = logging.getLogger(__name__)
-console = Console()
 
 
 
 from .table_common import *
 from .table_common import (
     _parse_where_conditions_with_mapping,
-    _build_query_params_from_conditions
+    _build_query_params_from_conditions,
+    _build_filter_set_from_conditions,
+    _extract_option,
+    _record_join_keys,
+    _pipe_join_key,
+    _fetch_records_by_join_keys,
+    _chunked
 )
 
+# 关联查询每次从管道读取的记录数（每块去重后发一次 OR 查询）
+JOIN_CHUNK_SIZE = 100
+# 关联查询缓存的连接键数量
+JOIN_CACHE_SIZE = 10000
+# 关联查询/全表扫描的分页大小
+JOIN_PAGE_SIZE = 1000
+
 def show_current_table(client, session, args: list):
     """显示当前表格数据 - 支持智能管道操作和关联查询"""
+    # 本地副本查询不访问服务器
+    local, args = _extract_option(args, '--local', flag=True)
+    if local:
+        return show_local_mode(session, args)
+    
     if not client:
         print("错误: 无法连接到Teable服务", file=sys.stderr)
         return 1
@@ -99,7 +116,15 @@ def show_current_table(client, session, args: list):
 def show_pipe_input_mode(client, session, args: list, table_id: str, table_name: str):
     """管道输入模式的show命令 - 关联查询，根据管道记录中的值查询当前表"""
     try:
-        from .pipe_core import parse_pipe_input_line, format_record_for_pipe
+        from .pipe_core import PipeReader, PipeWriter
+        
+        pipe_format, args = _extract_option(args, '--pipe-format')
+        
+        # 连接方式：filter（按块 OR 查询）、scan（全表扫描后本地哈希连接）、auto（自动选择）
+        join_mode, args = _extract_option(args, '--join', default='auto')
+        if join_mode not in ('auto', 'filter', 'scan'):
+            print(f"警告: 无效的join值 '{join_mode}'，使用 auto", file=sys.stderr)
+            join_mode = 'auto'
         
         # 解析查询条件参数，支持@字段名语法
         where_args = []
@@ -139,46 +164,43 @@ def show_pipe_input_mode(client, session, args: list, table_id: str, table_name:
             print("示例: t show 订单表 | t show 客户表 where 客户ID=@订单客户ID")
             return 1
         
-        # 流式处理：对于每条管道记录，查询匹配的记录
-        total_processed = 0
-        total_found = 0
+        # 等值的 @字段 条件可以批量连接；含 >、<、like 的 @字段 条件只能逐条查询
+        join_conditions = [c for c in where_conditions if c['type'] == 'field_mapping']
+        static_conditions = [c for c in where_conditions if c['type'] != 'field_mapping']
+        set_based = bool(join_conditions) and all(c['operator'] == '=' for c in join_conditions)
         
         print(f"开始关联查询处理...")
         
-        # 从管道流式读取记录
+        # 尝试读取第一条记录，如果没有数据或读取失败，回退到正常模式
+        reader = iter(PipeReader())
         try:
-            # 使用迭代器读取，避免阻塞
-            import sys
-            
-            # 尝试读取第一行，如果没有数据或读取失败，回退到正常模式
-            try:
-                first_line = sys.stdin.readline()
-                logger.info(f"管道输入模式：读取第一行: {repr(first_line)}")
-                if not first_line or not first_line.strip():
-                    # 没有数据，回退到正常模式
-                    logger.info("管道输入模式：没有数据，回退到正常模式")
-                    return show_table_mode(client, session, args, table_id, table_name)
-            except Exception as e:
-                # 读取失败，回退到正常模式
-                logger.info(f"管道输入模式：读取失败，回退到正常模式: {e}")
-                return show_table_mode(client, session, args, table_id, table_name)
-            
-            # 先处理第一行
-            pipe_record = parse_pipe_input_line(first_line)
-            if pipe_record:
-                found_count = _process_show_pipe_input(client, table_id, pipe_record, 
-                                                      where_conditions, fields, limit, 
-                                                      order_by, order_direction)
-                total_found += found_count
-            
-            # 继续读取剩余行
-            for line in sys.stdin:
-                pipe_record = parse_pipe_input_line(line)
-                if pipe_record:
-                    # 对于每条管道记录，构建查询条件并查询匹配的记录
+            first_record = next(reader, None)
+            logger.info(f"管道输入模式：读取第一条记录: {first_record}")
+        except Exception as e:
+            logger.info(f"管道输入模式：读取失败，回退到正常模式: {e}")
+            return show_table_mode(client, session, args, table_id, table_name)
+        if first_record is None:
+            logger.info("管道输入模式：没有数据，回退到正常模式")
+            return show_table_mode(client, session, args, table_id, table_name)
+        
+        pipe_records = itertools.chain([first_record], reader)
+        writer = PipeWriter(pipe_format, table_name, fields)
+        
+        total_processed = 0
+        total_found = 0
+        try:
+            if set_based:
+                # 按块读取管道记录，去重后每块一次 OR 查询（或全表扫描后本地哈希连接）
+                total_processed, total_found = _show_pipe_join(
+                    client, table_id, fields, pipe_records, join_conditions, static_conditions,
+                    limit, order_by, order_direction, join_mode, writer
+                )
+            else:
+                # 对于每条管道记录，构建查询条件并查询匹配的记录
+                for pipe_record in pipe_records:
                     found_count = _process_show_pipe_input(client, table_id, pipe_record, 
                                                           where_conditions, fields, limit, 
-                                                          order_by, order_direction)
+                                                          order_by, order_direction, writer)
                     total_processed += 1
                     total_found += found_count
                     
@@ -186,11 +208,9 @@ def show_pipe_input_mode(client, session, args: list, table_id: str, table_name:
                         logger.info(f"关联查询进度: 已处理 {total_processed} 条管道记录，找到 {total_found} 条匹配记录")
         
         except KeyboardInterrupt:
-            print(f"\n用户中断，正在处理剩余记录...")
-        except Exception as e:
-            # 如果读取失败，回退到正常模式
-            logger.debug(f"管道读取失败，回退到正常模式: {e}")
-            return show_table_mode(client, session, args, table_id, table_name)
+            print(f"\n用户中断", file=sys.stderr)
+        finally:
+            writer.flush()
         
         if total_processed > 0:
             logger.info(f"关联查询完成，共处理 {total_processed} 条管道记录，找到 {total_found} 条匹配记录")
@@ -206,11 +226,119 @@ def show_pipe_input_mode(client, session, args: list, table_id: str, table_name:
 
 
 
+def _show_pipe_join(client, table_id: str, fields: List[Dict[str, Any]], pipe_records: Iterable[Dict[str, Any]],
+                    join_conditions: List[Dict[str, Any]], static_conditions: List[Dict[str, Any]],
+                    limit: Optional[int], order_by: Optional[str], order_direction: str,
+                    join_mode: str = 'auto', writer=None) -> Tuple[int, int]:
+    """集合方式的关联查询
+    
+    filter 方式：每块管道记录的连接键去重后，用一次 OR 过滤查询取回全部匹配记录，
+    本地按连接键分组；已查询过的连接键缓存复用。
+    scan 方式：流式扫描目标表建立连接键哈希表，管道记录直接在本地匹配。
+    auto 方式：先用 filter，累计查询页数达到全表扫描所需页数时切换为 scan。
+    
+    每条管道记录按输入顺序输出自己的匹配记录（writer 为 PipeWriter，None 时使用默认格式）。
+    
+    Returns:
+        (处理的管道记录数, 输出的匹配记录数)
+    """
+    from .pipe_core import PipeWriter
+    
+    writer = writer or PipeWriter()
+    key_fields = [c['field'] for c in join_conditions]
+    source_fields = [c['source_field'] for c in join_conditions]
+    static_filter_set = _build_filter_set_from_conditions(static_conditions)
+    query_params = {}
+    if order_by:
+        query_params['orderBy'] = json.dumps([{"fieldId": order_by, "order": order_direction}])
+    
+    def build_scan_index():
+        params = dict(query_params)
+        if static_filter_set:
+            params['filter'] = json.dumps({"conjunction": "and", "filterSet": static_filter_set})
+        index = {}
+        for page in client.scan_record_pages(table_id, fields=fields, page_size=JOIN_PAGE_SIZE, **params):
+            for record in page:
+                for key in _record_join_keys(record, key_fields):
+                    index.setdefault(key, []).append(record)
+        logger.info(f"关联查询：全表扫描完成，{len(index)} 个连接键")
+        return index
+    
+    matches_by_key = OrderedDict()
+    scan_index = None
+    scan_pages = None
+    pages_queried = 0
+    
+    if join_mode == 'scan':
+        scan_index = build_scan_index()
+    elif join_mode == 'auto':
+        # 估算全表扫描需要的页数，作为切换阈值
+        try:
+            params = {'take': 1}
+            if static_filter_set:
+                params['filter'] = json.dumps({"conjunction": "and", "filterSet": static_filter_set})
+            total = client.get_records(table_id, **params).get('total')
+            if total is not None:
+                scan_pages = max(1, math.ceil(total / JOIN_PAGE_SIZE))
+        except Exception as e:
+            logger.debug(f"无法获取目标表记录数，不自动切换为全表扫描: {e}")
+    
+    total_processed = 0
+    total_found = 0
+    for chunk in _chunked(pipe_records, JOIN_CHUNK_SIZE):
+        keyed = [_pipe_join_key(record, source_fields) for record in chunk]
+        
+        if scan_index is None:
+            missing = {}
+            for key, raw_values in keyed:
+                if key is None or key in missing:
+                    continue
+                if key in matches_by_key:
+                    matches_by_key.move_to_end(key)
+                else:
+                    missing[key] = raw_values
+            if missing:
+                found, pages = _fetch_records_by_join_keys(
+                    client, table_id, key_fields, missing, static_filter_set,
+                    page_size=JOIN_PAGE_SIZE, **query_params
+                )
+                matches_by_key.update(found)
+                pages_queried += pages
+                if scan_pages is not None and pages_queried >= scan_pages:
+                    logger.info(f"关联查询：已查询 {pages_queried} 页，切换为全表扫描")
+                    scan_index = build_scan_index()
+        
+        lookup = scan_index if scan_index is not None else matches_by_key
+        for key, _ in keyed:
+            total_processed += 1
+            if key is None:
+                continue
+            matched_records = lookup.get(key, [])
+            if limit:
+                matched_records = matched_records[:limit]
+            for record in matched_records:
+                writer.write(record)
+            total_found += len(matched_records)
+        writer.flush()
+        
+        # 连接键缓存超出上限时淘汰最早的
+        while len(matches_by_key) > JOIN_CACHE_SIZE:
+            matches_by_key.popitem(last=False)
+        
+        logger.info(f"关联查询进度: 已处理 {total_processed} 条管道记录，找到 {total_found} 条匹配记录")
+    
+    return total_processed, total_found
+
+
+
 def _process_show_pipe_input(client, table_id: str, pipe_record: Dict[str, Any],
                             where_conditions: List[Dict[str, Any]], 
                             fields: List[Dict[str, Any]], limit: Optional[int],
-                            order_by: Optional[str], order_direction: str) -> int:
+                            order_by: Optional[str], order_direction: str, writer=None) -> int:
     """处理关联查询：根据管道记录中的值查询匹配的记录"""
+    from .pipe_core import PipeWriter
+    
+    writer = writer or PipeWriter()
     try:
         pipe_fields = pipe_record.get('fields', {})
         
@@ -238,8 +366,7 @@ def _process_show_pipe_input(client, table_id: str, pipe_record: Dict[str, Any],
         
         # 输出匹配的记录（管道格式）
         for record in matched_records:
-            output_line = format_record_for_pipe(record)
-            print(output_line, flush=True)
+            writer.write(record)
         
         return len(matched_records)
         
@@ -249,6 +376,95 @@ def _process_show_pipe_input(client, table_id: str, pipe_record: Dict[str, Any],
 
 
 
+def show_local_mode(session, args: list):
+    """本地副本查询模式（--local）：在 t sync 同步的 SQLite 副本上执行 where/order/limit 查询
+    
+    条件语法与服务器查询相同（由 _parse_where_conditions_with_mapping 解析），翻译为对副本查询列的 SQL。
+    """
+    from .replica_core import TableReplica, ReplicaError, replica_path, find_replica_by_name
+    
+    # 第一个参数不是条件或选项时作为表名，按副本中记录的表名查找
+    replica = None
+    if args and not args[0].startswith('-') and args[0].lower() != 'where' \
+            and not any(op in args[0] for op in ('=', '>', '<', 'like')):
+        table_name = args[0]
+        args = args[1:]
+        replica = find_replica_by_name(session.config, table_name)
+    elif session.is_table_selected():
+        table_name = session.get_current_table()
+        replica = TableReplica(replica_path(session.config, session.get_current_table_id()))
+    else:
+        print("错误: 请先选择表格", file=sys.stderr)
+        return 1
+    
+    if replica is None or not replica.exists():
+        print(f"错误: 表格 '{table_name}' 没有本地副本，请先执行: t sync {table_name}", file=sys.stderr)
+        return 1
+    
+    try:
+        pipe_format, args = _extract_option(args, '--pipe-format')
+        selected, args = _extract_option(args, '-f', '--fields')
+        ids_only, args = _extract_option(args, '--ids-only', flag=True)
+        
+        # 与服务器查询一致：终端默认显示20条，管道输出默认不限制
+        limit = None if is_pipe_output() else 20
+        order_by = None
+        order_direction = 'asc'
+        condition_args = []
+        for arg in args:
+            if arg.lower() == 'where' or arg in ('-v', '--verbose'):
+                continue
+            if arg.startswith('limit='):
+                try:
+                    limit = int(arg.split('=', 1)[1])
+                except ValueError:
+                    print(f"警告: 无效的limit值 '{arg}'，使用默认值", file=sys.stderr)
+            elif arg.startswith('order='):
+                order_spec = arg.split('=', 1)[1]
+                order_by, _, direction = order_spec.partition(':')
+                if direction.lower() in ('asc', 'desc'):
+                    order_direction = direction.lower()
+            else:
+                condition_args.append(arg)
+        
+        conditions = _parse_where_conditions_with_mapping(condition_args)
+        records, total = replica.query(conditions, order_by, order_direction, limit)
+        fields = replica.fields
+        
+        if selected:
+            selected_fields = [name.strip() for name in selected.split(',') if name.strip()]
+            fields = [field for field in fields if field['name'] in selected_fields]
+            for record in records:
+                record['fields'] = {name: value for name, value in record['fields'].items()
+                                    if name in selected_fields}
+        if ids_only:
+            fields = []
+            records = [{'id': record['id'], 'fields': {}} for record in records]
+        
+        if is_pipe_output():
+            from .pipe_core import PipeWriter
+            writer = PipeWriter(pipe_format, table_name, fields, binary=True)
+            for record in records:
+                writer.write(record)
+            writer.flush()
+        elif records:
+            _print_records(records, fields, table_name, total)
+            synced_at = replica.meta.get('synced_at')
+            if synced_at:
+                import time
+                print(f"（本地副本，同步于 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(synced_at))}）",
+                      file=sys.stderr)
+        else:
+            print(f"表格 '{table_name}' 的本地副本中没有符合条件的记录", file=sys.stderr)
+        return 0
+    
+    except ReplicaError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    finally:
+        replica.close()
+
+
 def show_pipe_mode(client, session, args: list, table_id: str, table_name: str):
     """管道模式的show命令 - 真正的流式处理，查询一页→输出→下一页"""
     try:
@@ -259,9 +475,37 @@ def show_pipe_mode(client, session, args: list, table_id: str, table_name: str):
         order_direction = 'asc'
         page_size = 100  # 每页大小，用于流式处理
         
+        # 预取页数：同时在途的分页请求数（--prefetch K；auto 时按客户端并发上限提交，
+        # 实际在途请求数由自适应并发限制器控制）
+        prefetch, args = _extract_option(args, '--prefetch', default=1)
+        try:
+            prefetch = client.limiter.max_limit if str(prefetch).lower() == 'auto' else max(1, int(prefetch))
+        except (TypeError, ValueError):
+            print(f"警告: 无效的prefetch值 '{prefetch}'，使用顺序获取", file=sys.stderr)
+            prefetch = 1
+        
+        # 字段投影：-f 只输出（并只下载）指定字段，--ids-only 只输出记录ID
+        selected, args = _extract_option(args, '-f', '--fields')
+        ids_only, args = _extract_option(args, '--ids-only', flag=True)
+        # 管道格式：text/ndjson/msgpack，默认 auto（下游是 t 命令时使用 ndjson）
+        pipe_format, args = _extract_option(args, '--pipe-format')
+        
         # 获取字段信息
         fields = client.get_table_fields(table_id)
         
+        selected_fields = None
+        projection = None
+        if ids_only:
+            projection = client.id_projection(fields)
+        elif selected:
+            field_names = {f.get('name') for f in fields}
+            selected_fields = [name.strip() for name in selected.split(',') if name.strip()]
+            for name in selected_fields:
+                if name not in field_names:
+                    print(f"警告: 字段 '{name}' 不存在，忽略", file=sys.stderr)
+            selected_fields = [name for name in selected_fields if name in field_names]
+            projection = selected_fields or client.id_projection(fields)
+        
         # 解析查询条件参数
         for arg in args:
             # 跳过where关键字
@@ -401,59 +645,43 @@ def show_pipe_mode(client, session, args: list, table_id: str, table_name: str):
             }]
             base_query_params['orderBy'] = json.dumps(order_config)
         
+        # 过滤和排序由服务器执行，条件字段不需要返回
+        if projection:
+            base_query_params['projection'] = projection
+        
+        from .pipe_core import PipeWriter
+        # 只输出记录，没有其他文本，可以使用二进制格式
+        writer = PipeWriter(pipe_format, table_name, [] if ids_only else fields, binary=True)
+        
         # 真正的流式处理 - 查询一页，输出一页，再查询下一页
+        # prefetch > 1 时后续页面并行预取，但仍按页顺序输出
         total_processed = 0
-        page = 1
+        page = 0
         
-        while True:
-            # 计算当前页参数
-            skip = (page - 1) * page_size
-            current_limit = page_size
-            
-            # 如果指定了总limit，需要调整
-            if limit and total_processed + page_size > limit:
-                current_limit = limit - total_processed
-            
-            if current_limit <= 0:
-                break
-            
-            # 构建当前页查询参数
-            query_params = base_query_params.copy()
-            query_params['take'] = current_limit
-            query_params['skip'] = skip
-            
-            # 获取当前页数据
-            logger.info(f"查询第{page}页数据: skip={skip}, take={current_limit}")
-            records_data = client.get_records(table_id, **query_params)
-            records = records_data.get('records', [])
-            
+        if prefetch > 1:
+            logger.info(f"并行预取模式: 同时在途 {prefetch} 个分页请求")
+        
+        # 没有自定义排序时按 autoNumber 游标分页，深分页代价与第一页相同
+        for records in client.scan_record_pages(table_id, fields=fields, page_size=page_size,
+                                                limit=limit, prefetch=prefetch,
+                                                **base_query_params):
+            page += 1
             logger.info(f"第{page}页获取到 {len(records)} 条记录")
             
-            if not records:
-                logger.info(f"第{page}页没有记录，结束查询")
-                break
-            
-            # 流式输出当前页记录 - 立即输出，不缓存
+            # 流式输出当前页记录 - 每页输出一次，不跨页缓存
             for record in records:
-                output_line = format_record_for_pipe(record)
-                print(output_line, flush=True)
+                if ids_only:
+                    writer.write({'id': record.get('id', '')})
+                else:
+                    # 游标分页会额外返回游标字段，按 -f 指定的字段输出
+                    writer.write(record, selected_fields)
+            writer.flush()
             
             total_processed += len(records)
             
-            # 如果获取的记录数少于请求的页大小，说明没有更多数据了
-            if len(records) < current_limit:
-                logger.info(f"第{page}页记录数({len(records)})少于请求数({current_limit})，结束查询")
-                break
-            
-            # 如果指定了limit且已经达到limit，结束查询
-            if limit and total_processed >= limit:
-                break
-            
             # 显示进度（可选）
             if page % 5 == 0:  # 每5页显示一次进度
                 logger.info(f"流式处理进度: 已处理 {total_processed} 条记录")
-            
-            page += 1
         
         logger.info(f"流式处理完成: 共输出 {total_processed} 条记录")
         return 0
@@ -467,6 +695,9 @@ def show_pipe_mode(client, session, args: list, table_id: str, table_name: str):
 def show_table_mode(client, session, args: list, table_id: str, table_name: str):
     """表格显示模式（原有功能）"""
     try:
+        # 输出到终端时始终使用文本格式
+        _, args = _extract_option(args, '--pipe-format')
+        
         # 解析参数
         limit = 20  # 默认显示20条
         verbose = '-v' in args or '--verbose' in args
@@ -640,52 +871,8 @@ def show_table_mode(client, session, args: list, table_id: str, table_name: str)
                 print(f"表格 '{table_name}' 中没有记录", file=sys.stderr)
             return 0
         
-        # 获取字段信息
-        fields = client.get_table_fields(table_id)
-        field_names = [field.get('name', 'N/A') for field in fields]
-        
-        # 准备数据 - 添加recordId作为第一列
-        rows = []
-        for record in records:
-            record_id = record.get('id', '')
-            record_fields = record.get('fields', {})
-            row = [record_id]  # 第一列是记录ID
-            for field_name in field_names:
-                value = record_fields.get(field_name, '')
-                # 处理长文本
-                if isinstance(value, str) and len(value) > 50:
-                    value = value[:47] + '...'
-                row.append(value)
-            rows.append(row)
-        
-        # 统一输出格式：总是输出标准管道格式到stdout
-        from .pipe_core import format_record_for_pipe
-        for record in records:
-            output_line = format_record_for_pipe(record)
-            print(output_line, flush=True)
-        
-        # 如果输出到终端，额外显示人类可读的表格到stderr
-        if sys.stdout.isatty():
-            if console.is_terminal:
-                table = Table(title=f"表格: {table_name}")
-                
-                # 添加recordId列作为第一列
-                table.add_column("记录ID", style="yellow", no_wrap=False)
-                for field_name in field_names:
-                    table.add_column(field_name, style="cyan", no_wrap=False)
-                
-                for row in rows:
-                    table.add_row(*[str(cell) for cell in row])
-                
-                console.print(table, file=sys.stderr)
-            else:
-                # 非终端环境使用tabulate - 添加recordId到表头
-                headers = ["记录ID"] + field_names
-                print(tabulate(rows, headers=headers, tablefmt='simple'), file=sys.stderr)
-            
-            # 显示统计信息到stderr
-            total_count = records_data.get('total', len(records))
-            print(f"\n📊 显示 {len(records)}/{total_count} 条记录", file=sys.stderr)
+        # 字段信息已在解析参数前获取，这里直接复用
+        _print_records(records, fields, table_name, records_data.get('total', len(records)))
         
         return 0
         
@@ -694,3 +881,54 @@ def show_table_mode(client, session, args: list, table_id: str, table_name: str)
         return 1
 
 
+def _print_records(records: List[Dict[str, Any]], fields: List[Dict[str, Any]], table_name: str,
+                   total_count: int):
+    """输出查询结果：标准管道格式到stdout，输出到终端时另外在stderr显示表格"""
+    field_names = [field.get('name', 'N/A') for field in fields]
+    
+    # 准备数据 - 添加recordId作为第一列
+    rows = []
+    for record in records:
+        record_id = record.get('id', '')
+        record_fields = record.get('fields', {})
+        row = [record_id]  # 第一列是记录ID
+        for field_name in field_names:
+            value = record_fields.get(field_name, '')
+            # 处理长文本
+            if isinstance(value, str) and len(value) > 50:
+                value = value[:47] + '...'
+            row.append(value)
+        rows.append(row)
+    
+    # 统一输出格式：总是输出标准管道格式到stdout
+    from .pipe_core import format_record_for_pipe
+    for record in records:
+        output_line = format_record_for_pipe(record)
+        print(output_line, flush=True)
+    
+    # 如果输出到终端，额外显示人类可读的表格到stderr
+    if sys.stdout.isatty():
+        # 表格渲染库只在输出到终端时才导入，管道场景不加载
+        from rich.console import Console
+        console = Console(stderr=True)
+        if console.is_terminal:
+            from rich.table import Table
+            table = Table(title=f"表格: {table_name}")
+            
+            # 添加recordId列作为第一列
+            table.add_column("记录ID", style="yellow", no_wrap=False)
+            for field_name in field_names:
+                table.add_column(field_name, style="cyan", no_wrap=False)
+            
+            for row in rows:
+                table.add_row(*[str(cell) for cell in row])
+            
+            console.print(table)
+        else:
+            # 非终端环境使用tabulate - 添加recordId到表头
+            headers = ["记录ID"] + field_names
+            from tabulate import tabulate
+            print(tabulate(rows, headers=headers, tablefmt='simple'), file=sys.stderr)
+        
+        # 显示统计信息到stderr
+        print(f"\n📊 显示 {len(records)}/{total_count} 条记录", file=sys.stderr)
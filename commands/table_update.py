@@ -7,10 +7,8 @@
 import sys
 import json
 import logging
+from collections import OrderedDict
 from typing import Optional, Dict, List, Any
-from tabulate import tabulate
-from rich.console import Console
-from rich.table import Table
 
 # 导入管道操作组件
 from .pipe_core import (
@@ -19,18 +17,41 @@ from .pipe_core import (
 
 
 logger = logging.getLogger(__name__)
-console = Console()
 
 
 
 from .table_common import *
+from .codec_core import TableCodec
+from .bulk_core import (
+    BatchSizer, parse_bulk_options, make_batch_sizer, describe_batch_size,
+    describe_concurrency, read_batches, run_batches, send_batch,
+    ProgressMeter, Checkpoint
+)
 from .table_common import (
     _parse_where_conditions_with_mapping,
     _build_query_params_from_conditions,
+    _build_filter_set_from_conditions,
     _parse_where_conditions,
-    _build_query_params
+    _build_query_params,
+    _extract_option,
+    _pipe_join_key,
+    _fetch_records_by_join_keys,
+    _chunked
 )
 
+# merge update 每个窗口读取的管道记录数（窗口内的where键一次查询）
+MERGE_WINDOW_SIZE = 100
+# merge update 未指定 --batch-size 时的写入批次大小
+MERGE_DEFAULT_BATCH_SIZE = 100
+# 每条管道记录最多匹配的目标记录数
+MERGE_MATCH_LIMIT = 1000
+# 条件更新每页查询的记录数
+WHERE_PAGE_SIZE = 1000
+# 条件更新未指定 --batch-size 时的写入批次大小
+WHERE_DEFAULT_BATCH_SIZE = 200
+# 条件更新每处理多少条记录输出一次进度
+WHERE_PROGRESS_EVERY = 5000
+
 def update_record(client, session, args: list):
     """更新记录，支持条件更新（where语法）和智能管道操作，支持指定表名"""
     try:
@@ -133,7 +154,10 @@ def update_record(client, session, args: list):
             # 传统模式：单记录更新
             return _update_single_record(client, session, table_id, table_name, fields, link_fields, field_names, remaining_args)
         else:
-            # 条件更新模式
+            # 条件更新模式：先提取批量选项（--batch-size / --concurrency / --resume），避免被当作条件解析
+            bulk_options, remaining_args = parse_bulk_options(remaining_args)
+            resume, remaining_args = _extract_option(remaining_args, '--resume', flag=True)
+            where_index = [arg.lower() for arg in remaining_args].index('where')
             update_args = remaining_args[:where_index]
             where_args = remaining_args[where_index + 1:]
             
@@ -145,7 +169,8 @@ def update_record(client, session, args: list):
                 print("错误: where条件后必须指定过滤条件")
                 return 1
             
-            return _update_with_where(client, session, table_id, table_name, fields, link_fields, field_names, update_args, where_args)
+            return _update_with_where(client, session, table_id, table_name, fields, link_fields, field_names,
+                                      update_args, where_args, bulk_options, resume)
             
     except Exception as e:
         print(f"错误: 更新记录失败: {e}")
@@ -157,6 +182,9 @@ def update_record(client, session, args: list):
 def update_pipe_mode(client, session, table_id: str, table_name: str, args: list):
     """管道模式的update命令 - 支持直接更新和merge update（带where条件），支持指定表名"""
     try:
+        # 提取批量选项（--batch-size / --flush-interval），避免被当作字段赋值解析
+        bulk_options, args = parse_bulk_options(args)
+        
         # 检查第一个参数是否是表名
         target_table_name = None
         remaining_args = args
@@ -186,8 +214,6 @@ def update_pipe_mode(client, session, table_id: str, table_name: str, args: list
             table_id = session.get_current_table_id()
             table_name = session.get_current_table()
         
-        from .pipe_core import parse_pipe_input_line
-        
         # 解析参数，分离更新字段和where条件
         where_index = -1
         for i, arg in enumerate(remaining_args):
@@ -197,7 +223,8 @@ def update_pipe_mode(client, session, table_id: str, table_name: str, args: list
         
         if where_index == -1:
             # 直接更新模式：更新管道记录本身
-            return _update_pipe_direct_mode(client, session, table_id, table_name, remaining_args)
+            return _update_pipe_direct_mode(client, session, table_id, table_name, remaining_args,
+                                            bulk_options)
         else:
             # Merge update模式：根据where条件查找并更新匹配的记录
             update_args = remaining_args[:where_index]
@@ -211,7 +238,8 @@ def update_pipe_mode(client, session, table_id: str, table_name: str, args: list
                 print("错误: where条件后必须指定过滤条件")
                 return 1
             
-            return _update_pipe_merge_mode(client, session, table_id, table_name, update_args, where_args)
+            return _update_pipe_merge_mode(client, session, table_id, table_name, update_args, where_args,
+                                           bulk_options)
             
     except Exception as e:
         print(f"错误: 流式管道模式更新记录失败: {e}")
@@ -220,10 +248,18 @@ def update_pipe_mode(client, session, table_id: str, table_name: str, args: list
 
 
 
-def _update_pipe_direct_mode(client, session, table_id: str, table_name: str, args: list):
+def _update_pipe_direct_mode(client, session, table_id: str, table_name: str, args: list,
+                             bulk_options: Optional[Dict[str, Any]] = None):
     """直接更新模式：更新管道记录本身"""
     try:
-        from .pipe_core import parse_pipe_input_line
+        if bulk_options is None:
+            bulk_options, args = parse_bulk_options(args)
+        sizer = make_batch_sizer(bulk_options)
+        
+        from .pipe_core import PipeWriter, read_pipe_records
+        
+        # 链式管道输出更新后的记录，格式同 show（--pipe-format）
+        pipe_format, args = _extract_option(args, '--pipe-format')
         
         # 解析更新字段（支持@字段名语法和常量值）
         update_fields = {}
@@ -254,41 +290,40 @@ def _update_pipe_direct_mode(client, session, table_id: str, table_name: str, ar
         # 获取字段信息
         fields = client.get_table_fields(table_id)
         link_fields = detect_link_fields(client, table_id)
-        has_link_fields = any(field_name in link_fields for field_name in update_fields.keys())
+        # 写入计划只编译一次，每条记录按计划直接转换
+        codec = TableCodec(fields, link_fields, update_fields)
         
         # 流式处理参数
-        batch_size = 10
         total_processed = 0
-        current_batch = []
         
-        print(f"开始流式处理，每批{batch_size}条记录...")
+        print(f"开始流式处理，{describe_batch_size(sizer)}{describe_concurrency(bulk_options)}...")
         
-        # 从管道流式读取记录
-        try:
-            for line in sys.stdin:
-                record = parse_pipe_input_line(line)
-                if record:
-                    current_batch.append(record)
-                    
-                    if len(current_batch) >= batch_size:
-                        _process_update_batch_direct(client, table_id, current_batch, update_fields,
-                                                    fields, link_fields, has_link_fields, 
-                                                    total_processed + len(current_batch))
-                        total_processed += len(current_batch)
-                        current_batch = []
-                        
-                        if total_processed % 50 == 0:
-                            print(f"实时流式更新进度: 已处理 {total_processed} 条记录")
+        link_resolver = LinkResolver(client, link_fields)
         
-        except KeyboardInterrupt:
-            print(f"\n用户中断，正在处理剩余记录...")
+        def process(batch):
+            return _process_update_batch_direct(client, table_id, batch, codec, sizer, link_resolver)
         
-        # 处理剩余记录
-        if current_batch:
-            _process_update_batch_direct(client, table_id, current_batch, update_fields,
-                                        fields, link_fields, has_link_fields, 
-                                        total_processed + len(current_batch))
-            total_processed += len(current_batch)
+        # 从管道流式读取记录，批次满或到达刷新时限时立即处理；
+        # --concurrency 时多个批次同时在途，在途批次已满时暂停读取管道（背压）
+        writer = PipeWriter(pipe_format, table_name, fields)
+        pipe_records = read_pipe_records()
+        batches = read_batches(pipe_records, sizer, bulk_options['flush_interval'])
+        try:
+            for current_batch, output_records in run_batches(
+                    batches, process, bulk_options['concurrency'], bulk_options['ordered']):
+                # 链式管道输出只在主线程写stdout
+                for output_record in output_records:
+                    writer.write(output_record)
+                writer.flush()
+            
+                previous_processed = total_processed
+                total_processed += len(current_batch)
+            
+                if total_processed // 50 > previous_processed // 50:
+                    print(f"实时流式更新进度: 已处理 {total_processed} 条记录")
+        except KeyboardInterrupt:
+            print(f"❌ 流式更新已中断，已处理 {total_processed} 条记录")
+            return 1
         
         if total_processed > 0:
             print(f"✅ 流式更新完成，共处理 {total_processed} 条记录")
@@ -305,10 +340,19 @@ def _update_pipe_direct_mode(client, session, table_id: str, table_name: str, ar
 
 
 def _update_pipe_merge_mode(client, session, table_id: str, table_name: str, 
-                             update_args: list, where_args: list):
-    """Merge update模式：根据where条件查找并更新匹配的记录"""
+                             update_args: list, where_args: list,
+                             bulk_options: Optional[Dict[str, Any]] = None):
+    """Merge update模式：根据where条件查找并更新匹配的记录
+    
+    按窗口处理管道记录：每个窗口的where键去重后一次查询，本地构建
+    记录→更新数据的映射，再按批次写入。
+    """
     try:
-        from .pipe_core import parse_pipe_input_line
+        from .pipe_core import read_pipe_records
+        
+        if bulk_options is None:
+            bulk_options, update_args = parse_bulk_options(update_args)
+        sizer = make_batch_sizer(bulk_options, default_size=MERGE_DEFAULT_BATCH_SIZE)
         
         # 解析更新字段（支持@字段名语法和常量值）
         update_fields = {}
@@ -344,29 +388,31 @@ def _update_pipe_merge_mode(client, session, table_id: str, table_name: str,
         fields = client.get_table_fields(table_id)
         link_fields = detect_link_fields(client, table_id)
         
+        # 关联值解析结果在整个运行中复用，相同的值只查询一次
+        link_resolver = LinkResolver(client, link_fields)
+        codec = TableCodec(fields, link_fields, update_fields)
+        
         # 流式处理
         total_processed = 0
         total_updated = 0
         
-        print(f"开始merge update处理...")
+        print(f"开始merge update处理，每个窗口{MERGE_WINDOW_SIZE}条管道记录，{describe_batch_size(sizer)}...")
         
-        # 从管道流式读取记录
+        # 从管道按窗口读取记录
         try:
-            for line in sys.stdin:
-                pipe_record = parse_pipe_input_line(line)
-                if pipe_record:
-                    # 对于每条管道记录，构建查询条件并更新匹配的记录
-                    updated_count = _process_merge_update(client, table_id, pipe_record, 
-                                                          update_fields, where_conditions,
-                                                          fields, link_fields)
-                    total_processed += 1
-                    total_updated += updated_count
-                    
-                    if total_processed % 50 == 0:
-                        print(f"实时merge update进度: 已处理 {total_processed} 条管道记录，更新 {total_updated} 条目标记录")
+            pipe_records = read_pipe_records()
+            for window in _chunked(pipe_records, MERGE_WINDOW_SIZE):
+                updates = _process_merge_window(client, table_id, window, codec,
+                                                where_conditions, fields, link_resolver)
+                total_updated += _send_merge_updates(client, table_id, updates, sizer, codec)
+                previous_processed = total_processed
+                total_processed += len(window)
+                
+                if total_processed // 50 > previous_processed // 50:
+                    print(f"实时merge update进度: 已处理 {total_processed} 条管道记录，更新 {total_updated} 条目标记录")
         
         except KeyboardInterrupt:
-            print(f"\n用户中断，正在处理剩余记录...")
+            print(f"\n用户中断，停止处理")
         
         if total_processed > 0:
             print(f"✅ Merge update完成，共处理 {total_processed} 条管道记录，更新 {total_updated} 条目标记录")
@@ -383,73 +429,45 @@ def _update_pipe_merge_mode(client, session, table_id: str, table_name: str,
 
 
 def _process_update_batch_direct(client, table_id: str, batch_records: List[Dict[str, Any]],
-                                 update_fields: Dict[str, Dict[str, Any]], 
-                                 fields: List[Dict[str, Any]], link_fields: Dict[str, Dict[str, Any]],
-                                 has_link_fields: bool, progress_count: int):
-    """处理直接更新模式的批次"""
+                                 codec: TableCodec, sizer: Optional[BatchSizer] = None,
+                                 link_resolver: Optional[LinkResolver] = None) -> List[Dict[str, Any]]:
+    """处理直接更新模式的批次，返回需要输出到管道的记录（更新后的记录）
+
+    可能在工作线程中执行，因此不直接写stdout，由调用方按顺序输出。
+    """
+    output_records = []
     try:
-        from .pipe_core import is_pipe_output, format_record_for_pipe
+        # 批次内的关联值去重后一次查询解析
+        link_resolver = link_resolver or LinkResolver(client, codec.link_fields)
+        codec.prefetch(batch_records, link_resolver)
+        
+        from .pipe_core import is_pipe_output
         
         updates = []
         updated_record_ids = []  # 记录更新的记录ID，用于管道输出
-        field_info_map = {f.get('name'): f for f in fields}
         
+        # 按编译好的写入计划构建更新数据
+        encode = codec.encode
         for record in batch_records:
-            record_id = record['id']
-            pipe_fields = record.get('fields', {})
-            
-            # 构建更新数据
-            fields_data = {}
-            for target_field, mapping_info in update_fields.items():
-                # 确定字段值
-                if mapping_info['type'] == 'field_mapping':
-                    source_field = mapping_info['source_field']
-                    if source_field in pipe_fields:
-                        field_value = pipe_fields[source_field]
-                    else:
-                        logger.warning(f"管道记录中不存在字段 '{source_field}'，跳过字段 '{target_field}'")
-                        continue
-                else:
-                    field_value = mapping_info['value']
-                
-                # 处理关联字段
-                if target_field in link_fields:
-                    linked_record_id = process_link_field_value(
-                        client, target_field, str(field_value), link_fields, session=None
-                    )
-                    if linked_record_id:
-                        relationship = link_fields[target_field].get('relationship', 'manyOne')
-                        if relationship in ['manyMany', 'oneMany']:
-                            fields_data[target_field] = [{'id': linked_record_id}]
-                        else:
-                            fields_data[target_field] = {'id': linked_record_id}
-                    else:
-                        logger.warning(f"关联字段 '{target_field}' 处理失败，跳过")
-                        continue
-                else:
-                    # 普通字段，转换值类型
-                    target_field_info = field_info_map.get(target_field)
-                    if target_field_info:
-                        field_type = target_field_info.get('type', 'singleLineText')
-                        converted_value = convert_field_value(field_type, field_value)
-                        fields_data[target_field] = converted_value
-            
+            fields_data = encode(record, link_resolver)
             if fields_data:
+                record_id = record['id']
                 updates.append({
                     'record_id': record_id,
                     'fields_data': fields_data
                 })
                 updated_record_ids.append(record_id)
         
-        # 执行批量更新
+        # 执行批量更新（批次过大(413)时自动拆分重试）
         if updates:
-            if has_link_fields:
-                result = client.batch_update_records(table_id, updates, use_field_ids=False)
-            else:
-                result = client.batch_update_records(table_id, updates)
+            def send(chunk):
+                client.batch_update_records(table_id, chunk, use_field_ids=codec.use_field_ids)
+                return chunk
+            
+            result = send_batch(send, updates, sizer)
             
             if result:
-                logger.info(f"成功更新批次: {len(updates)} 条记录 (累计: {progress_count})")
+                logger.info(f"成功更新批次: {len(updates)} 条记录")
                 
                 # 如果有管道输出，输出更新的记录（链式管道操作）
                 if is_pipe_output() and updated_record_ids:
@@ -474,15 +492,15 @@ def _process_update_batch_direct(client, table_id: str, batch_records: List[Dict
                         }
                         updated_records = client.get_records(table_id, **query_params)
                         if updated_records and 'records' in updated_records:
-                            for updated_record in updated_records['records']:
-                                output_line = format_record_for_pipe(updated_record)
-                                print(output_line, flush=True)
+                            output_records.extend(updated_records['records'])
             else:
                 logger.warning(f"批次更新失败: {len(updates)} 条记录")
             
     except Exception as e:
         logger.error(f"批次更新失败: {e}", exc_info=True)
-        print(f"⚠️  批次更新失败 ({len(batch_records)} 条记录): {e}")
+        print(f"⚠️  批次更新失败 ({len(batch_records)} 条记录): {e}", file=sys.stderr)
+    
+    return output_records
 
 
 
@@ -517,105 +535,93 @@ def _process_update_batch(client, table_id: str, batch_records: List[Dict[str, A
 
 
 
-def _process_merge_update(client, table_id: str, pipe_record: Dict[str, Any],
-                          update_fields: Dict[str, Dict[str, Any]], 
+def _process_merge_window(client, table_id: str, window: List[Dict[str, Any]],
+                          codec: TableCodec,
                           where_conditions: List[Dict[str, Any]],
-                          fields: List[Dict[str, Any]], link_fields: Dict[str, Dict[str, Any]]) -> int:
-    """处理merge update：根据where条件查找并更新匹配的记录"""
-    try:
-        pipe_fields = pipe_record.get('fields', {})
-        
-        # 使用通用函数构建查询参数
-        query_params = _build_query_params_from_conditions(
-            conditions=where_conditions,
-            pipe_fields=pipe_fields,
-            limit=1000,  # 限制每次最多更新1000条
-            skip=0
-        )
-        
-        if 'filter' not in query_params:
-            logger.warning("没有有效的查询条件，跳过")
-            return 0
-        
-        records_data = client.get_records(table_id, **query_params)
-        matched_records = records_data.get('records', [])
-        
-        if not matched_records:
-            logger.debug(f"没有找到匹配的记录，跳过")
-            return 0
-        
-        # 构建更新数据（使用管道记录中的值替换@字段名）
-        field_info_map = {f.get('name'): f for f in fields}
-        fields_data = {}
-        
-        for target_field, mapping_info in update_fields.items():
-            # 确定字段值
-            if mapping_info['type'] == 'field_mapping':
-                source_field = mapping_info['source_field']
-                if source_field in pipe_fields:
-                    field_value = pipe_fields[source_field]
-                else:
-                    logger.warning(f"管道记录中不存在字段 '{source_field}'，跳过字段 '{target_field}'")
-                    continue
-            else:
-                field_value = mapping_info['value']
-            
-            # 处理关联字段
-            if target_field in link_fields:
-                linked_record_id = process_link_field_value(
-                    client, target_field, str(field_value), link_fields, session=None
+                          fields: List[Dict[str, Any]],
+                          link_resolver: LinkResolver) -> List[Dict[str, Any]]:
+    """处理一个窗口的merge update，返回去重后的更新列表（record_id + fields_data）
+    
+    where条件中的@字段全部为等值条件时，窗口内的where键去重后用一次 OR 查询取回
+    全部匹配记录；否则逐条查询。同一目标记录被多条管道记录匹配时，后面的管道记录
+    覆盖前面的字段值，与逐条更新的结果一致。
+    """
+    join_conditions = [c for c in where_conditions if c['type'] == 'field_mapping']
+    static_conditions = [c for c in where_conditions if c['type'] != 'field_mapping']
+    
+    if join_conditions and all(c['operator'] == '=' for c in join_conditions):
+        key_fields = [c['field'] for c in join_conditions]
+        keyed = [_pipe_join_key(r, [c['source_field'] for c in join_conditions]) for r in window]
+        keys = {key: raw_values for key, raw_values in keyed if key is not None}
+        matches = {}
+        if keys:
+            try:
+                # 只需要记录ID和连接字段
+                matches, _ = _fetch_records_by_join_keys(
+                    client, table_id, key_fields, keys,
+                    _build_filter_set_from_conditions(static_conditions),
+                    projection=key_fields
                 )
-                if linked_record_id:
-                    relationship = link_fields[target_field].get('relationship', 'manyOne')
-                    if relationship in ['manyMany', 'oneMany']:
-                        fields_data[target_field] = [{'id': linked_record_id}]
-                    else:
-                        fields_data[target_field] = {'id': linked_record_id}
-                else:
-                    logger.warning(f"关联字段 '{target_field}' 处理失败，跳过")
-                    continue
-            else:
-                # 普通字段，转换值类型
-                target_field_info = field_info_map.get(target_field)
-                if target_field_info:
-                    field_type = target_field_info.get('type', 'singleLineText')
-                    converted_value = convert_field_value(field_type, field_value)
-                    fields_data[target_field] = converted_value
-        
+            except Exception as e:
+                logger.error(f"Merge update查询失败: {e}", exc_info=True)
+        matched_per_record = [matches.get(key, [])[:MERGE_MATCH_LIMIT] if key else [] for key, _ in keyed]
+    else:
+        matched_per_record = []
+        for pipe_record in window:
+            query_params = _build_query_params_from_conditions(
+                conditions=where_conditions,
+                pipe_fields=pipe_record.get('fields', {}),
+                limit=MERGE_MATCH_LIMIT,
+                skip=0
+            )
+            if 'filter' not in query_params:
+                logger.warning("没有有效的查询条件，跳过")
+                matched_per_record.append([])
+                continue
+            query_params['projection'] = client.id_projection(fields)
+            try:
+                matched_per_record.append(client.get_records(table_id, **query_params).get('records', []))
+            except Exception as e:
+                logger.error(f"Merge update查询失败: {e}", exc_info=True)
+                matched_per_record.append([])
+    
+    # 窗口内的关联值去重后一次查询解析
+    codec.prefetch(window, link_resolver)
+    
+    updates = OrderedDict()
+    for pipe_record, matched_records in zip(window, matched_per_record):
+        if not matched_records:
+            continue
+        fields_data = codec.encode(pipe_record, link_resolver)
         if not fields_data:
             logger.warning("没有有效的更新字段，跳过")
-            return 0
-        
-        # 批量更新匹配的记录
-        updates = []
+            continue
         for record in matched_records:
-            record_id = record.get('id')
-            updates.append({
-                'record_id': record_id,
-                'fields_data': fields_data
-            })
-        
-        # 检查是否有关联字段
-        has_link_fields = any(field_name in link_fields for field_name in fields_data.keys())
-        
-        if updates:
-            if has_link_fields:
-                result = client.batch_update_records(table_id, updates, use_field_ids=False)
-            else:
-                result = client.batch_update_records(table_id, updates)
-            
-            if result:
-                logger.info(f"成功更新 {len(updates)} 条匹配记录")
-                return len(updates)
-            else:
-                logger.warning(f"更新失败: {len(updates)} 条记录")
-                return 0
-        
-        return 0
-        
-    except Exception as e:
-        logger.error(f"Merge update处理失败: {e}", exc_info=True)
-        return 0
+            updates.setdefault(record.get('id'), {}).update(fields_data)
+    
+    return [{'record_id': record_id, 'fields_data': fields_data}
+            for record_id, fields_data in updates.items()]
+
+
+
+def _send_merge_updates(client, table_id: str, updates: List[Dict[str, Any]],
+                        sizer: BatchSizer, codec: TableCodec) -> int:
+    """按批次发送merge update的更新，返回成功更新的记录数"""
+    updated = 0
+    processed = 0
+    while processed < len(updates):
+        chunk = updates[processed:processed + sizer.size]
+        processed += len(chunk)
+        try:
+            def send(items):
+                client.batch_update_records(table_id, items, use_field_ids=codec.use_field_ids)
+                return items
+            updated += len(send_batch(send, chunk, sizer))
+            logger.info(f"成功更新 {len(chunk)} 条匹配记录")
+        except Exception as e:
+            logger.error(f"Merge update批次更新失败 ({len(chunk)} 条记录): {e}", exc_info=True)
+            print(f"⚠️  批次更新失败 ({len(chunk)} 条记录): {e}", file=sys.stderr)
+    return updated
 
 
 
@@ -738,8 +744,13 @@ def _update_single_record(client, session, table_id, table_name, fields, link_fi
 # ==================== 通用查询函数 ====================
 
 
-def _update_with_where(client, session, table_id, table_name, fields, link_fields, field_names, update_args, where_args):
-    """条件更新模式 - 复用show_current_table的过滤逻辑"""
+def _update_with_where(client, session, table_id, table_name, fields, link_fields, field_names, update_args, where_args,
+                       bulk_options: Optional[Dict[str, Any]] = None, resume: bool = False):
+    """条件更新模式 - 复用show_current_table的过滤逻辑
+    
+    流式执行：查询一页匹配记录 → 按批次写入 → 下一页，内存占用不随匹配数增长。
+    表格有autoNumber字段时使用游标分页并保存断点，中断后可用 --resume 继续。
+    """
     # 解析更新字段
     update_data = {}
     for arg in update_args:
@@ -779,69 +790,91 @@ def _update_with_where(client, session, table_id, table_name, fields, link_field
     # 构建查询参数 - 复用show_current_table的构建逻辑
     query_params = _build_query_params(where_conditions)
     
-    # 查询符合条件的记录 - 支持分页获取所有记录
-    print(f"正在查询符合条件的记录...")
-    all_records = []
-    page_size = 100  # 每页获取100条记录
-    page = 1
+    if bulk_options is None:
+        bulk_options, _ = parse_bulk_options([])
+    sizer = make_batch_sizer(bulk_options, default_size=WHERE_DEFAULT_BATCH_SIZE)
     
-    while True:
-        # 设置分页参数
-        page_query_params = query_params.copy()
-        page_query_params['take'] = page_size
-        page_query_params['skip'] = (page - 1) * page_size
-        
-        # 获取当前页数据
-        records_data = client.get_records(table_id, **page_query_params)
-        records = records_data.get('records', [])
-        
-        if not records:
-            break
-        
-        all_records.extend(records)
-        
-        # 检查是否还有更多数据
-        total_count = records_data.get('total', len(records))
-        if len(all_records) >= total_count:
-            break
-        
-        page += 1
-        
-        # 显示进度
-        if len(all_records) % 500 == 0:
-            print(f"已获取 {len(all_records)} 条记录...")
+    # 有autoNumber字段时使用游标分页：深分页不会变慢，更新导致记录不再匹配条件也不会跳过记录，
+    # 并且可以按游标保存断点
+    cursor_field = client.find_cursor_field(fields)
+    checkpoint = None
+    start_after = None
+    updated_count = 0
+    if cursor_field:
+        checkpoint = Checkpoint(session.config.config_dir / 'checkpoints',
+                                'update', table_id, update_args, where_args)
+        state = checkpoint.load()
+        if state and resume:
+            start_after = state.get('last_cursor')
+            updated_count = state.get('updated', 0)
+            print(f"从断点继续：已更新 {updated_count} 条记录，{cursor_field} > {start_after}")
+        elif state:
+            print(f"发现未完成的断点（已更新 {state.get('updated', 0)} 条记录），可使用 --resume 从断点继续；本次从头开始")
+    elif resume:
+        print("警告: 表格没有autoNumber字段，无法断点续传；条件更新可以安全地重新执行")
     
-    if not all_records:
-        print("没有找到符合条件的记录")
-        return 0
+    print(f"正在流式更新符合条件的记录，{describe_batch_size(sizer)}{describe_concurrency(bulk_options)}...")
     
-    print(f"找到 {len(all_records)} 条符合条件的记录")
+    # 只需要记录ID（和游标），不下载其他字段
+    query_params['projection'] = client.id_projection(fields)
     
-    # 批量更新记录
-    updates = []
-    for record in all_records:
-        record_id = record.get('id')
-        updates.append({
-            'record_id': record_id,
-            'fields_data': update_data
-        })
+    if cursor_field:
+        pages = client.iter_records_by_cursor(table_id, cursor_field, page_size=WHERE_PAGE_SIZE,
+                                              start_after=start_after, **query_params)
+    elif any(key.rsplit('__', 1)[0] in update_data for key in where_conditions):
+        # skip/take 分页时，已更新的记录离开结果集会导致后续页偏移、漏掉记录，
+        # 因此先只收集记录ID，再分批更新
+        print("提示: 表格没有autoNumber字段且更新字段出现在条件中，先收集记录ID再更新")
+        record_ids = [record['id'] for page in client.iter_record_pages(table_id, page_size=WHERE_PAGE_SIZE,
+                                                                        **query_params)
+                      for record in page]
+        pages = _chunked(({'id': record_id} for record_id in record_ids), WHERE_PAGE_SIZE)
+    else:
+        pages = client.iter_record_pages(table_id, page_size=WHERE_PAGE_SIZE, **query_params)
     
-    # 检查是否有关联字段需要特殊处理
-    has_link_fields = any(field_name in link_fields for field_name in update_data.keys())
+    def chunks():
+        for page in pages:
+            for i in range(0, len(page), sizer.size):
+                yield page[i:i + sizer.size]
     
-    if has_link_fields:
-        # 使用批量更新API，关联字段需要使用字段ID模式
-        result = client.batch_update_records(table_id, updates, use_field_ids=False)
-    else:
-        # 普通批量更新
-        result = client.batch_update_records(table_id, updates)
+    def process(chunk):
+        updates = [{'record_id': record['id'], 'fields_data': update_data} for record in chunk]
+        
+        def send(items):
+            client.batch_update_records(table_id, items, use_field_ids=False)
+            return items
+        
+        return len(send_batch(send, updates, sizer))
     
-    if result:
-        print(f"✅ 成功更新 {len(all_records)} 条记录")
-        return 0
-    else:
-        print(f"❌ 批量更新失败")
+    meter = ProgressMeter("条件更新进度", every=WHERE_PROGRESS_EVERY)
+    # 保存断点时必须按顺序确认批次，断点之前的记录才保证都已更新
+    ordered = True if checkpoint else bulk_options['ordered']
+    try:
+        for chunk, count in run_batches(chunks(), process, bulk_options['concurrency'], ordered):
+            updated_count += count
+            meter.add(count)
+            if checkpoint:
+                checkpoint.save({
+                    'table_id': table_id,
+                    'cursor_field': cursor_field,
+                    'last_cursor': chunk[-1].get('fields', {}).get(cursor_field),
+                    'updated': updated_count
+                })
+    except (Exception, KeyboardInterrupt) as e:
+        reason = "用户中断" if isinstance(e, KeyboardInterrupt) else f"{e}"
+        print(f"❌ 条件更新中断: {reason}")
+        print(f"已更新 {updated_count} 条记录")
+        if checkpoint:
+            print("使用相同的命令加 --resume 从断点继续")
+        logger.error(f"条件更新中断: {reason}", exc_info=not isinstance(e, KeyboardInterrupt))
         return 1
-
-
-
+    
+    if checkpoint:
+        checkpoint.clear()
+    
+    if meter.count == 0 and start_after is None:
+        print("没有找到符合条件的记录")
+        return 0
+    
+    print(f"✅ 成功更新 {updated_count} 条记录（{meter.describe()}）")
+    return 0
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变更订阅命令（t watch）
+
+按“最后修改时间”字段保存水位线，每次轮询只按修改时间倒序查询一页，取出水位线之后修改的记录；
+从未修改过的新记录最后修改时间为空，另外按自动编号（或创建时间）游标取出。记录以管道格式输出，
+下游可以直接接 t update/t insert 等命令。
+没有变化时轮询间隔逐步加倍，出现变化后恢复到最小间隔。
+水位线保存在 ~/.teable/watch/ 下，相同的命令（表格+条件）再次执行时从上次的位置继续。
+"""
+
+import sys
+import json
+import time
+import logging
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from .bulk_core import Checkpoint
+from .table_common import (
+    _extract_option,
+    _parse_where_conditions_with_mapping,
+    _build_filter_set_from_conditions
+)
+
+logger = logging.getLogger(__name__)
+
+# 每次轮询查询的记录数（一次变化超过一页时继续翻页）
+WATCH_PAGE_SIZE = 100
+# 首次订阅时补发现有记录的分页大小
+WATCH_CATCH_UP_PAGE_SIZE = 1000
+# 默认最小/最大轮询间隔（秒）
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 30.0
+
+
+class ChangeFeed:
+    """轮询一个表格的新增和修改记录
+
+    修改过的记录按“最后修改时间”水位线查询；从未修改过的新记录最后修改时间为空，另外按
+    插入游标（自动编号或创建时间字段）查询，与 sync 的增量拉取相同。两个游标都保存已输出记录
+    的最大值，以及值等于最大值、已经输出过的记录ID（同一时刻可能有多条记录），下次轮询时跳过它们。
+    """
+
+    def __init__(self, client, table_id: str, modified_field: str,
+                 filter_set: Optional[List[Dict[str, Any]]] = None,
+                 watermark: Optional[str] = None, seen: Optional[List[str]] = None,
+                 cursor_field: Optional[str] = None):
+        self.client = client
+        self.table_id = table_id
+        self.modified_field = modified_field
+        self.cursor_field = cursor_field
+        self.filter_set = filter_set or []
+        self.watermark = watermark
+        self.seen = set(seen or [])
+        self.cursor = None
+        self.cursor_seen = set()
+
+    def state(self) -> Dict[str, Any]:
+        """可持久化的游标"""
+        return {'watermark': self.watermark, 'seen': sorted(self.seen),
+                'cursor': self.cursor, 'cursor_seen': sorted(self.cursor_seen)}
+
+    def _query_params(self, field: str) -> Dict[str, Any]:
+        """按 field 倒序、只查询 field 不为空的记录"""
+        filter_set = self.filter_set + [{"fieldId": field, "operator": "isNotEmpty", "value": None}]
+        return {'orderBy': json.dumps([{"fieldId": field, "order": "desc"}]),
+                'filter': json.dumps({"conjunction": "and", "filterSet": filter_set})}
+
+    def _modified(self, record: Dict[str, Any]) -> Optional[str]:
+        return record.get('fields', {}).get(self.modified_field)
+
+    @staticmethod
+    def _advanced(field: str, value: Any, seen: set,
+                  records: List[Dict[str, Any]]) -> Tuple[Any, set]:
+        """输出 records 之后 field 游标的新位置"""
+        seen = set(seen)
+        for record in records:
+            current = record.get('fields', {}).get(field)
+            if current is None or current == '':
+                continue
+            if value is None or current > value:
+                value, seen = current, {record['id']}
+            elif current == value:
+                seen.add(record['id'])
+        return value, seen
+
+    def _latest(self, field: str) -> Tuple[Any, set]:
+        """field 当前的最大值，以及取值等于最大值的记录ID"""
+        records = self.client.get_records(self.table_id, skip=0, take=WATCH_PAGE_SIZE,
+                                          **self._query_params(field)).get('records', [])
+        return self._advanced(field, None, set(), records)
+
+    def _since(self, field: str, value: Any, seen: set) -> List[Dict[str, Any]]:
+        """field 大于 value（或等于 value 但没有输出过）的记录
+
+        通常一次查询即可：按 field 倒序取一页，遇到小于 value 的记录就停止；整页都满足时继续翻页。
+        """
+        params = self._query_params(field)
+        found = []
+        skip = 0
+        while True:
+            records = self.client.get_records(self.table_id, skip=skip, take=WATCH_PAGE_SIZE,
+                                              **params).get('records', [])
+            reached = False
+            for record in records:
+                current = record.get('fields', {}).get(field)
+                if current is None or current == '':
+                    continue
+                if value is not None:
+                    if current < value:
+                        reached = True
+                        break
+                    if current == value and record['id'] in seen:
+                        continue
+                found.append(record)
+            if reached or len(records) < WATCH_PAGE_SIZE:
+                break
+            skip += len(records)
+        return found
+
+    def start_from_latest(self):
+        """从当前最新的位置开始订阅（不输出现有记录）"""
+        self.watermark, self.seen = self._latest(self.modified_field)
+        self.start_cursor_from_latest()
+
+    def start_cursor_from_latest(self):
+        """插入游标从当前最新的位置开始（没有插入游标的旧订阅继续时使用）"""
+        if self.cursor_field:
+            self.cursor, self.cursor_seen = self._latest(self.cursor_field)
+
+    def catch_up(self, fields: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """首次订阅：按页输出现有的全部匹配记录，之后从扫描开始前的最新位置继续轮询
+
+        扫描期间新增或修改的记录会在之后的轮询中再次输出（至少一次）。
+        """
+        start_watermark, _ = self._latest(self.modified_field)
+        start_cursor = self._latest(self.cursor_field)[0] if self.cursor_field else None
+
+        seen_at_start, cursor_seen_at_start = set(), set()
+        scan_params = {}
+        if self.filter_set:
+            scan_params['filter'] = json.dumps({"conjunction": "and", "filterSet": self.filter_set})
+        for records in self.client.scan_record_pages(self.table_id, fields=fields,
+                                                     page_size=WATCH_CATCH_UP_PAGE_SIZE, **scan_params):
+            for record in records:
+                if start_watermark is not None and self._modified(record) == start_watermark:
+                    seen_at_start.add(record['id'])
+                if start_cursor is not None and \
+                        record.get('fields', {}).get(self.cursor_field) == start_cursor:
+                    cursor_seen_at_start.add(record['id'])
+            yield records
+        self.watermark, self.seen = start_watermark, seen_at_start
+        self.cursor, self.cursor_seen = start_cursor, cursor_seen_at_start
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """查询上次轮询之后新增和修改的记录，修改过的记录按修改时间升序在前，新记录在后"""
+        modified = self._since(self.modified_field, self.watermark, self.seen)
+        modified.sort(key=lambda record: (self._modified(record), record['id']))
+        inserted = []
+        if self.cursor_field:
+            inserted = self._since(self.cursor_field, self.cursor, self.cursor_seen)
+            inserted.sort(key=lambda record: (record['fields'][self.cursor_field], record['id']))
+
+        # 游标只按各自查询的结果推进：两次查询之间插入的记录不会因为另一个游标推进而被跳过
+        self.watermark, self.seen = self._advanced(self.modified_field, self.watermark, self.seen, modified)
+        if self.cursor_field:
+            self.cursor, self.cursor_seen = self._advanced(self.cursor_field, self.cursor,
+                                                           self.cursor_seen, inserted)
+
+        # 新建后又修改过的记录两个查询都会返回，只输出一次
+        emitted = {record['id'] for record in modified}
+        return modified + [record for record in inserted if record['id'] not in emitted]
+
+
+def _parse_interval(value: Any, name: str) -> Tuple[Optional[float], Optional[str]]:
+    try:
+        interval = float(value)
+    except (TypeError, ValueError):
+        return None, f"错误: 无效的{name}值 '{value}'"
+    if interval <= 0:
+        return None, f"错误: {name} 必须大于0"
+    return interval, None
+
+
+def watch_command(client, session, args: list):
+    """t watch [表名] [-w 条件...] [--since start|now|时间] [--interval 秒] [--max-interval 秒]
+    [--once] [--reset] [--pipe-format 格式]"""
+    if not client:
+        print("错误: 无法连接到Teable服务", file=sys.stderr)
+        return 1
+
+    pipe_format, args = _extract_option(args, '--pipe-format')
+    since, args = _extract_option(args, '--since')
+    once, args = _extract_option(args, '--once', flag=True)
+    reset, args = _extract_option(args, '--reset', flag=True)
+    min_interval, args = _extract_option(args, '--interval', default=DEFAULT_MIN_INTERVAL)
+    max_interval, args = _extract_option(args, '--max-interval', default=DEFAULT_MAX_INTERVAL)
+    min_interval, error = _parse_interval(min_interval, 'interval')
+    if error is None:
+        max_interval, error = _parse_interval(max_interval, 'max-interval')
+    if error:
+        print(error, file=sys.stderr)
+        return 1
+    max_interval = max(min_interval, max_interval)
+
+    try:
+        # 第一个参数不是条件时作为表名
+        table_id = session.get_current_table_id()
+        table_name = session.get_current_table()
+        if args and args[0].lower() not in ('where', '-w', '--where') and \
+                not any(op in args[0] for op in ('=', '>', '<', 'like')):
+            table_name = args[0]
+            args = args[1:]
+            table_id = next((table.get('id') for table in client.get_tables()
+                             if table.get('name') == table_name), None)
+            if not table_id:
+                print(f"错误: 表格 '{table_name}' 不存在", file=sys.stderr)
+                return 1
+        if not table_id:
+            print("错误: 请指定表格名称或先选择表格", file=sys.stderr)
+            return 1
+
+        condition_args = [arg for arg in args if arg.lower() not in ('where', '-w', '--where')]
+        conditions = _parse_where_conditions_with_mapping(condition_args)
+        if any(condition['type'] != 'constant' for condition in conditions):
+            print("错误: t watch 的条件不支持 @字段名", file=sys.stderr)
+            return 1
+
+        fields = client.get_table_fields(table_id)
+        modified_field = next((f.get('name') for f in fields if f.get('type') == 'lastModifiedTime'), None)
+        if not modified_field:
+            print(f"错误: 表格 '{table_name}' 没有“最后修改时间”字段，无法订阅变更", file=sys.stderr)
+            print("请先在表格中添加一个“最后修改时间”类型的字段", file=sys.stderr)
+            return 1
+
+        # 游标按表格和条件保存，相同的订阅再次启动时从上次的位置继续
+        checkpoint = Checkpoint(session.config.config_dir / 'watch', 'watch', table_id, sorted(condition_args))
+        if reset:
+            checkpoint.clear()
+        state = checkpoint.load() if since is None else None
+
+        created_field = next((f.get('name') for f in fields if f.get('type') == 'createdTime'), None)
+        cursor_field = client.find_cursor_field(fields) or created_field
+        if not cursor_field:
+            print(f"⚠️  表格 '{table_name}' 没有自动编号或创建时间字段，从未修改过的新记录不会输出", file=sys.stderr)
+
+        feed = ChangeFeed(client, table_id, modified_field, _build_filter_set_from_conditions(conditions),
+                          cursor_field=cursor_field)
+
+        from .pipe_core import PipeWriter
+        # 只输出记录，提示信息写到 stderr，可以使用二进制格式
+        writer = PipeWriter(pipe_format, table_name, fields, binary=True)
+
+        def emit(records: List[Dict[str, Any]], save: bool = True):
+            for record in records:
+                writer.write(record)
+            writer.flush()
+            # 输出之后再保存游标：中断时最多重复输出，不会丢失变更
+            if save:
+                checkpoint.save(feed.state())
+
+        if state and 'cursor' not in state and state.get('watermark') is None:
+            # 旧版本保存的游标：首次补发没有完成（或表格当时没有记录），没有可以继续的位置
+            print(f"上次的订阅没有水位线，重新补发 '{table_name}' 的现有记录", file=sys.stderr)
+            state = None
+
+        if state:
+            feed.watermark, feed.seen = state.get('watermark'), set(state.get('seen') or [])
+            if 'cursor' in state:
+                feed.cursor, feed.cursor_seen = state.get('cursor'), set(state.get('cursor_seen') or [])
+            else:
+                # 旧版本保存的游标没有插入游标，从当前最新的记录开始
+                feed.start_cursor_from_latest()
+            print(f"从上次的位置继续订阅 '{table_name}'（{feed.watermark}）", file=sys.stderr)
+        elif since == 'now':
+            feed.start_from_latest()
+            checkpoint.save(feed.state())
+        elif since and since != 'start':
+            feed.watermark = since
+            if cursor_field and cursor_field == created_field:
+                feed.cursor = since
+            else:
+                # 自动编号无法按时间定位，从未修改过的新记录只输出启动之后插入的
+                feed.start_cursor_from_latest()
+        else:
+            # 补发期间水位线尚未确定，补发完成后才保存游标；中断时下次重新补发
+            for records in feed.catch_up(fields):
+                emit(records, save=False)
+            checkpoint.save(feed.state())
+
+        interval = min_interval
+        while True:
+            try:
+                changed = feed.poll()
+            except Exception as e:
+                # 常驻的订阅不因为一次查询失败而退出，按退避间隔重试
+                logger.debug("轮询失败", exc_info=True)
+                print(f"⚠️  轮询失败: {e}", file=sys.stderr)
+                changed = None
+            if changed:
+                emit(changed)
+                interval = min_interval
+            if once:
+                return 0 if changed is not None else 1
+
+            time.sleep(interval if changed is not None else max_interval)
+            if not changed:
+                # 没有变化时轮询间隔加倍，直到最大间隔
+                interval = min(interval * 2, max_interval)
+    except KeyboardInterrupt:
+        return 0
+    except BrokenPipeError:
+        # 下游命令已退出
+        return 0
+    except Exception as e:
+        logger.error(f"订阅变更失败: {e}", exc_info=True)
+        print(f"错误: 订阅变更失败: {e}", file=sys.stderr)
+        return 1
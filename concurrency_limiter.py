@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制
+按 AIMD（加性增、乘性减）调整同时在途的请求数，由 TeableClient 的所有请求共享
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Awaitable, Callable
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 初始并发上限
+DEFAULT_INITIAL_LIMIT = 4
+# 延迟超过同类请求平均延迟的多少倍视为服务器变慢
+DEFAULT_LATENCY_TOLERANCE = 3.0
+# 平均延迟的平滑系数（指数加权移动平均）
+LATENCY_SMOOTHING = 0.1
+# 低于该延迟（秒）时不视为变慢，避免基线很小时抖动触发降速
+LATENCY_FLOOR = 0.2
+# 降速系数
+DECREASE_FACTOR = 0.5
+
+
+class AIMDLimiter:
+    """AIMD 自适应并发限制器
+
+    每个 HTTP 请求发送前占用一个名额，名额用完时等待。
+    请求成功且延迟正常时上限加性增长（约每轮 limit 个请求 +1）；
+    遇到 429/5xx/超时/连接错误，或延迟超过同类请求（按 HTTP 方法区分，查询和批量写入
+    的正常耗时差别很大）平均延迟的 latency_tolerance 倍时上限减半。
+    同一轮内并发失败的多个请求只减半一次，避免一次限流把上限降到最低。
+
+    所有批量操作（show 预取、insert/update/delete 管道、migrate）使用同一个客户端，
+    因此共享同一个上限：--concurrency 决定工作线程数，实际在途请求数不超过该上限。
+    """
+
+    def __init__(self, max_limit: int, initial_limit: int = DEFAULT_INITIAL_LIMIT,
+                 min_limit: int = 1, latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(max(self.min_limit, min(initial_limit, self.max_limit)))
+        self._in_flight = 0
+        self._latency = {}
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """当前在途请求数"""
+        return self._in_flight
+
+    def acquire(self):
+        """占用一个名额，名额用完时阻塞等待"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, overloaded: bool, latency: float, kind: str = ""):
+        """释放名额并根据请求结果调整上限
+
+        Args:
+            overloaded: 服务器是否过载（429/5xx/超时/连接错误）
+            latency: 请求耗时（秒）
+            kind: 请求类别（HTTP 方法），分别统计平均延迟
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._adjust(overloaded, latency, kind)
+            self._condition.notify_all()
+
+    def _adjust(self, overloaded: bool, latency: float, kind: str):
+        slow = False
+        if not overloaded:
+            average = self._latency.get(kind)
+            if average is not None:
+                slow = latency > max(LATENCY_FLOOR, average * self.latency_tolerance)
+                self._latency[kind] = average + LATENCY_SMOOTHING * (latency - average)
+            else:
+                self._latency[kind] = latency
+        if overloaded or slow:
+            self._decrease(latency, "服务器过载" if overloaded else f"延迟 {latency:.2f}s")
+        elif self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _decrease(self, latency: float, reason: str):
+        now = time.monotonic()
+        # 距上次降速不足一个请求耗时的失败属于同一轮，不重复降速
+        if now - self._last_decrease < max(latency, LATENCY_FLOOR):
+            return
+        self._last_decrease = now
+        new_limit = max(float(self.min_limit), self._limit * DECREASE_FACTOR)
+        if int(new_limit) != int(self._limit):
+            logger.info(f"{reason}，并发上限调整为 {int(new_limit)}")
+        self._limit = new_limit
+
+    def call(self, send: Callable[[], requests.Response], kind: str = "") -> requests.Response:
+        """占用名额发送一次请求，按结果调整上限（请求异常视为过载）"""
+        self.acquire()
+        start = time.monotonic()
+        overloaded = True
+        try:
+            response = send()
+            overloaded = response.status_code == 429 or response.status_code >= 500
+            return response
+        finally:
+            self.release(overloaded, time.monotonic() - start, kind)
+
+
+class AsyncAIMDLimiter(AIMDLimiter):
+    """AIMDLimiter 的 asyncio 版本，供 AsyncTeableClient 使用（名额等待不阻塞事件循环）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._async_condition = None
+
+    def _get_condition(self):
+        # asyncio.Condition 需要在事件循环中创建
+        if self._async_condition is None:
+            import asyncio
+            self._async_condition = asyncio.Condition()
+        return self._async_condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    async def release(self, overloaded: bool, latency: float, kind: str = ""):
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            self._adjust(overloaded, latency, kind)
+            condition.notify_all()
+
+    async def call(self, send: Callable[[], Awaitable[Any]], kind: str = "") -> Any:
+        """占用名额发送一次请求，按结果调整上限（请求异常视为过载）"""
+        await self.acquire()
+        start = time.monotonic()
+        overloaded = True
+        try:
+            response = await send()
+            overloaded = response.status_code == 429 or response.status_code >= 500
+            return response
+        finally:
+            await self.release(overloaded, time.monotonic() - start, kind)
@@ -19,6 +19,7 @@ class Config:
         self.token_file = self.config_dir / 'token.txt'
         self.session_file = self.config_dir / 'session.json'
         self.history_file = self.config_dir / 'history'
+        self.cache_dir = self.config_dir / 'cache'
         
         # 默认配置
         self.defaults = {
@@ -26,6 +27,11 @@ class Config:
             'token': '',
             'base_id': '',
             'timeout': 30,
+            'pool_size': 10,
+            'http2': False,
+            'max_retries': 3,
+            'schema_cache_ttl': 300,
+            'daemon_idle_timeout': 3600,
             'page_size': 20,
             'color_output': True,
             'table_format': 'simple',
@@ -33,14 +39,17 @@ class Config:
         }
         
         self.config = self.defaults.copy()
-        self.ensure_config_dir()
+        self._config_dir_ready = False
         self.load_config()
     
     def ensure_config_dir(self):
-        """确保配置目录存在"""
+        """确保配置目录存在（第一次写入文件前调用，只读的命令不需要创建目录）"""
+        if self._config_dir_ready:
+            return
         self.config_dir.mkdir(exist_ok=True)
         # 设置目录权限为700（仅所有者可读写执行）
         os.chmod(self.config_dir, 0o700)
+        self._config_dir_ready = True
     
     def load_config(self):
         """加载配置文件"""
@@ -65,6 +74,7 @@ class Config:
     def save_config(self):
         """保存配置文件"""
         try:
+            self.ensure_config_dir()
             # 不保存敏感信息到配置文件
             safe_config = {k: v for k, v in self.config.items() 
                           if k not in ['token']}
@@ -122,6 +132,7 @@ class Config:
     def save_session(self, session_data: Dict[str, Any]):
         """保存会话信息"""
         try:
+            self.ensure_config_dir()
             with open(self.session_file, 'w', encoding='utf-8') as f:
                 json.dump(session_data, f, indent=2, ensure_ascii=False)
             
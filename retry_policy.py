@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求重试策略
+为 TeableClient 提供指数退避重试、Retry-After 支持、熔断器和重试统计
+"""
+
+import sys
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+# 默认最大重试次数（不含第一次请求）
+DEFAULT_MAX_RETRIES = 3
+# 退避基数和上限（秒）
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+# Retry-After 最长等待时间（秒），超过时不再重试
+MAX_RETRY_AFTER = 120.0
+# 连续失败多少次后熔断
+DEFAULT_FAILURE_THRESHOLD = 5
+# 熔断后多久允许试探请求（秒）
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# 服务器暂时不可用的状态码
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 重复执行结果不变的请求方法（Teable 的 PATCH 是按字段赋值，重复执行结果相同）
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'PATCH', 'DELETE'}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """熔断器打开时直接拒绝请求"""
+
+
+class RetryStats:
+    """重试统计（线程安全），命令结束时输出汇总"""
+
+    def __init__(self):
+        self.retries = 0
+        self.gave_up = 0
+        self.rejected = 0
+        self.reasons: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """清零统计（交互式模式下每条命令单独统计）"""
+        with self._lock:
+            self.retries = 0
+            self.gave_up = 0
+            self.rejected = 0
+            self.reasons = {}
+
+    def record_retry(self, reason: str):
+        with self._lock:
+            self.retries += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def record_gave_up(self):
+        with self._lock:
+            self.gave_up += 1
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def summary(self) -> Optional[str]:
+        """重试汇总，没有发生重试或熔断时返回None"""
+        if not (self.retries or self.gave_up or self.rejected):
+            return None
+        parts = [f"重试 {self.retries} 次"]
+        if self.reasons:
+            detail = "，".join(f"{reason}: {count}" for reason, count in
+                              sorted(self.reasons.items(), key=lambda item: -item[1]))
+            parts[0] += f"（{detail}）"
+        if self.gave_up:
+            parts.append(f"{self.gave_up} 个请求重试后仍失败")
+        if self.rejected:
+            parts.append(f"熔断拒绝 {self.rejected} 个请求")
+        return "请求重试统计: " + "，".join(parts)
+
+
+class CircuitBreaker:
+    """熔断器
+
+    连续 failure_threshold 次请求遇到 5xx/连接错误后打开（429 只是限流，由退避重试和
+    并发限制器处理，不计入失败），
+    reset_timeout 秒内的请求直接失败，不再压向已经过载的服务器；
+    之后进入半开状态，只放行一个试探请求，成功则关闭，失败则重新打开；
+    试探请求得到 429 说明服务器能够响应，也视为成功。
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """是否允许发送请求"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                return False
+            # 半开状态：放行一个试探请求
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("服务器已恢复，熔断器关闭")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                logger.warning(f"连续 {self._failures} 次请求失败，熔断 {self.reset_timeout:.0f} 秒")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def end_probe(self):
+        """试探请求结束但没有记录成功或失败时（如抛出非请求异常）结束半开试探，允许下一个试探请求"""
+        with self._lock:
+            self._probing = False
+
+
+class RetryPolicy:
+    """请求重试策略
+
+    - 429、5xx 和连接错误按指数退避加随机抖动重试，响应带 Retry-After 时按其等待
+    - 只重试幂等请求；非幂等请求（如 POST 插入记录）只在确定服务器没有处理时重试：
+      429（服务器拒绝处理）和建立连接超时/失败
+    """
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = RetryStats()
+
+    def call(self, method: str, send: Callable[[], requests.Response],
+             idempotent: Optional[bool] = None) -> requests.Response:
+        """按重试策略发送请求
+
+        Args:
+            method: HTTP 方法
+            send: 发送一次请求的函数
+            idempotent: 是否幂等，None 表示按 HTTP 方法判断
+
+        Returns:
+            最后一次请求的响应（可能仍是错误状态码，由调用方处理）
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            requests.exceptions.RequestException: 连接错误等不可重试或重试耗尽的异常
+        """
+        attempt = 0
+        while True:
+            probe = self._check_breaker()
+            response, error = None, None
+            try:
+                try:
+                    response = send()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                wait = self._next_delay(method, idempotent, response, error, attempt)
+            finally:
+                if probe:
+                    self.breaker.end_probe()
+            if wait is None:
+                if error is not None:
+                    raise error
+                return response
+            time.sleep(wait)
+            attempt += 1
+
+    async def acall(self, method: str, send: Callable[[], Awaitable[Any]],
+                    idempotent: Optional[bool] = None,
+                    errors: Tuple[Type[BaseException], ...] = (Exception,)) -> Any:
+        """call 的异步版本，供 AsyncTeableClient 使用
+
+        Args:
+            method: HTTP 方法
+            send: 发送一次请求的协程函数
+            idempotent: 是否幂等，None 表示按 HTTP 方法判断
+            errors: 视为请求失败（参与重试判断）的异常类型
+        """
+        attempt = 0
+        while True:
+            probe = self._check_breaker()
+            response, error = None, None
+            try:
+                try:
+                    response = await send()
+                except errors as e:
+                    error = e
+                wait = self._next_delay(method, idempotent, response, error, attempt)
+            finally:
+                if probe:
+                    self.breaker.end_probe()
+            if wait is None:
+                if error is not None:
+                    raise error
+                return response
+            await _async_sleep(wait)
+            attempt += 1
+
+    def _check_breaker(self) -> bool:
+        """熔断器拒绝时抛出 CircuitOpenError，返回本次请求是否为半开状态的试探请求"""
+        if not self.breaker.allow():
+            self.stats.record_rejected()
+            raise CircuitOpenError("服务器连续请求失败，已暂停发送请求（熔断中），请稍后重试")
+        return self.breaker.is_open
+
+    def _next_delay(self, method: str, idempotent: Optional[bool], response, error: Optional[Exception],
+                    attempt: int) -> Optional[float]:
+        """记录一次请求结果，返回重试前的等待时间；不需要或不能再重试时返回None"""
+        if error is not None or response.status_code >= 500:
+            self.breaker.record_failure()
+        elif response.status_code != 429 or self.breaker.is_open:
+            # 429 只是限流，不影响连续失败计数；但半开试探得到 429 说明服务器已恢复响应
+            self.breaker.record_success()
+
+        reason = self.retry_reason(method, idempotent, response, error)
+        if reason is None:
+            return None
+        wait = self.delay(attempt, response) if attempt < self.max_retries else None
+        if wait is None:
+            self.stats.record_gave_up()
+            return None
+        self.stats.record_retry(reason)
+        logger.warning(f"请求失败({reason})，{wait:.1f} 秒后第 {attempt + 1} 次重试")
+        return wait
+
+    def retry_reason(self, method: str, idempotent: Optional[bool],
+                     response: Optional[requests.Response] = None,
+                     error: Optional[Exception] = None) -> Optional[str]:
+        """判断请求结果是否可以重试，可以时返回原因（用于统计），否则返回None"""
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        if response is not None:
+            status = response.status_code
+            if status == 429:
+                return "429"
+            if status in RETRYABLE_STATUS and idempotent:
+                return str(status)
+            return None
+
+        if is_connect_failure(error):
+            return "连接失败"
+        if not idempotent:
+            return None
+        if isinstance(error, requests.exceptions.Timeout) or _is_httpx_error(error, 'TimeoutException'):
+            return "超时"
+        if isinstance(error, requests.exceptions.ConnectionError) or _is_httpx_error(error, 'TransportError'):
+            return "连接错误"
+        return None
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """第 attempt 次重试前的等待时间（秒）；Retry-After 超过上限时返回None表示放弃"""
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= MAX_RETRY_AFTER else None
+        # full jitter：在 [0, min(上限, 基数 * 2^attempt)] 内随机，避免并发批次同时重试
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+async def _async_sleep(seconds: float):
+    # 延迟导入 asyncio，同步命令不需要加载
+    import asyncio
+    await asyncio.sleep(seconds)
+
+
+def is_connect_failure(error: Optional[Exception]) -> bool:
+    """是否为建立连接阶段的失败（请求尚未发出，重试不会导致重复执行）"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return any(_is_httpx_error(error, name) for name in ('ConnectError', 'ConnectTimeout', 'PoolTimeout'))
+
+
+def _is_httpx_error(error: Optional[Exception], name: str) -> bool:
+    """是否为 httpx 的指定异常类型（只在 httpx 已被导入时判断，不引入依赖）"""
+    httpx = sys.modules.get('httpx')
+    return httpx is not None and isinstance(error, getattr(httpx, name))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），无法解析时返回None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表结构缓存
+将表格列表和字段定义缓存到 ~/.teable/cache，避免每次执行命令都重新查询
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存有效期（秒）
+DEFAULT_TTL = 300
+
+
+class SchemaCache:
+    """表结构磁盘缓存
+
+    按 base 分目录存放，每个条目一个 JSON 文件：
+        ~/.teable/cache/<base_id>/tables.json          表格列表
+        ~/.teable/cache/<base_id>/fields_<table_id>.json  字段定义
+
+    条目在 TTL 内直接使用；过期后由客户端用 ETag 做条件请求重新验证。
+    字段条目同时记录所属表格的 lastModifiedTime（version），表格列表刷新后
+    version 不一致的字段条目视为失效。
+    """
+
+    def __init__(self, cache_dir: Path, base_id: str, ttl: float = DEFAULT_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.base_dir = self.cache_dir / base_id
+        self.ttl = ttl
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目（包含 data/etag/version/cached_at），不存在返回None"""
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.debug(f"缓存文件读取失败，忽略: {path}: {e}")
+            return None
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """条目是否仍在有效期内"""
+        return time.time() - entry.get('cached_at', 0) < self.ttl
+
+    def set(self, key: str, data: Any, etag: Optional[str] = None, version: Optional[str] = None):
+        """写入缓存条目（先写临时文件再替换，避免并发进程读到半个文件）"""
+        entry = {
+            'data': data,
+            'etag': etag,
+            'version': version,
+            'cached_at': time.time()
+        }
+        with self._lock:
+            self._memory[key] = entry
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except IOError as e:
+            logger.debug(f"缓存文件写入失败，忽略: {e}")
+
+    def invalidate(self, key: str):
+        """删除缓存条目"""
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except IOError as e:
+            logger.debug(f"缓存文件删除失败，忽略: {e}")
+
+    def clear(self):
+        """清除当前 base 的全部缓存"""
+        with self._lock:
+            self._memory.clear()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+
+def clear_all(cache_dir: Path) -> int:
+    """清除所有 base 的缓存，返回删除的缓存文件数"""
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return 0
+    count = sum(1 for _ in cache_dir.rglob('*.json'))
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return count
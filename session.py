@@ -9,23 +9,36 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 
 
+# 从会话文件加载的属性
+SESSION_ATTRIBUTES = ('current_table', 'current_table_id', 'tables_cache')
+
+
 class Session:
-    """Teable CLI 会话管理"""
+    """Teable CLI 会话管理
+
+    会话文件在第一次访问 current_table 等属性时才读取，t version、t help 等命令不需要解析。
+    """
     
     def __init__(self, config):
         self.config = config
-        self.current_table = None
-        self.current_table_id = None
-        self.tables_cache = {}  # 表格信息缓存
+    
+    def __getattr__(self, name):
+        # 只在属性尚未设置时调用：加载会话文件后再返回
+        if name not in SESSION_ATTRIBUTES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
         self.load_session()
+        return self.__dict__[name]
     
     def load_session(self):
-        """加载会话信息"""
+        """加载会话信息（已经赋值的属性不会被文件内容覆盖）"""
         session_data = self.config.load_session()
-        if session_data:
-            self.current_table = session_data.get('current_table')
-            self.current_table_id = session_data.get('current_table_id')
-            self.tables_cache = session_data.get('tables_cache', {})
+        defaults = {
+            'current_table': session_data.get('current_table'),
+            'current_table_id': session_data.get('current_table_id'),
+            'tables_cache': session_data.get('tables_cache', {}),  # 表格信息缓存
+        }
+        for name, value in defaults.items():
+            self.__dict__.setdefault(name, value)
     
     def save_session(self):
         """保存会话信息"""
@@ -35,11 +35,17 @@ setup(
         "tabulate>=0.9.0",
         "rich>=12.0.0",
     ],
-    py_modules=["cli", "config", "session", "teable_api_client"],
+    extras_require={
+        "async": ["httpx>=0.24.0"],
+        "msgpack": ["msgpack>=1.0"],
+        "parquet": ["pyarrow>=8.0"],
+        "zstd": ["zstandard>=0.18"],
+    },
+    py_modules=["async_teable_client", "cli", "concurrency_limiter", "config", "session", "retry_policy", "schema_cache", "teable_api_client", "teable_daemon"],
     entry_points={
         "console_scripts": [
-            "t=cli:main",
-            "teable=cli:main",
+            "t=teable_daemon:main",
+            "teable=teable_daemon:main",
         ],
     },
 )
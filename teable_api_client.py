@@ -6,19 +6,39 @@ Teable API 客户端
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import logging
+import functools
 from typing import Dict, List, Any, Optional
 
-# 配置日志
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from retry_policy import RetryPolicy
+from concurrency_limiter import AIMDLimiter
+
 logger = logging.getLogger(__name__)
 
 
+def _changes_schema(method):
+    """修改表结构的方法（第一个参数为 table_id）返回后清除该表的字段缓存
+
+    不能只在请求前清除：请求期间的并发读取会把旧的字段结构重新写入缓存。
+    请求失败时服务器也可能已经部分修改，同样清除。
+    """
+    @functools.wraps(method)
+    def wrapper(self, table_id: str, *args, **kwargs):
+        try:
+            return method(self, table_id, *args, **kwargs)
+        finally:
+            self._invalidate_schema(table_id)
+    return wrapper
+
+
 class TeableClient:
     """Teable API 客户端"""
     
-    def __init__(self, base_url: str, token: str, base_id: str):
+    def __init__(self, base_url: str, token: str, base_id: str,
+                 pool_size: int = 10, http2: bool = False, schema_cache=None, retry_policy=None,
+                 limiter=None):
         """
         初始化 Teable 客户端
         
@@ -26,6 +46,11 @@ class TeableClient:
             base_url: API 基础URL
             token: 认证令牌
             base_id: 数据库ID
+            pool_size: 连接池大小（同一主机保持的长连接数）
+            http2: 是否尝试启用 HTTP/2（需要 urllib3>=2.3 和 h2）
+            schema_cache: 表结构缓存（SchemaCache），为None时不缓存
+            retry_policy: 请求重试策略（RetryPolicy），为None时使用默认策略
+            limiter: 自适应并发限制器（AIMDLimiter），为None时按连接池大小创建
         """
         self.base_url = base_url
         self.token = token
@@ -34,29 +59,78 @@ class TeableClient:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        self.http_session = self._create_http_session(pool_size, http2)
+        self.schema_cache = schema_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 所有线程共享的在途请求上限，最大不超过连接池大小
+        self.limiter = limiter or AIMDLimiter(max_limit=pool_size)
         logger.info("Teable 客户端初始化完成")
 
+    def _create_http_session(self, pool_size: int, http2: bool) -> requests.Session:
+        """
+        创建进程内共享的 HTTP 会话
+        
+        所有请求复用同一个连接池，保持 keep-alive 长连接，
+        避免每个请求（每页查询、每个批次）都重新进行 TCP+TLS 握手。
+        
+        Args:
+            pool_size: 连接池大小
+            http2: 是否尝试启用 HTTP/2
+            
+        Returns:
+            配置好的 requests.Session
+        """
+        if http2:
+            try:
+                # urllib3 2.3+ 的实验性 HTTP/2 支持，需要安装 h2
+                import urllib3.http2
+                urllib3.http2.inject_into_urllib3()
+                logger.info("已启用 HTTP/2")
+            except Exception as e:
+                logger.warning(f"HTTP/2 不可用，使用 HTTP/1.1 keep-alive: {e}")
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        """关闭 HTTP 会话，释放连接池"""
+        self.http_session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def _request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                 params: Optional[Dict] = None) -> Dict[str, Any]:
+                 params: Optional[Dict] = None, idempotent: Optional[bool] = None) -> Dict[str, Any]:
         """
         发送 HTTP 请求
         
+        遇到 429、5xx 和连接错误时按重试策略退避重试（非幂等请求只在服务器确定未处理时重试）；
+        每次发送占用自适应并发限制器的一个名额。
+        
         Args:
             method: HTTP 方法
             endpoint: API 端点
             data: 请求数据
             params: 查询参数
+            idempotent: 请求是否可以安全地重复执行，None 表示按 HTTP 方法判断
             
         Returns:
             API 响应数据
         """
         url = f"{self.base_url}/api{endpoint}"
+        body = json.dumps(data) if data else None
         try:
-            response = requests.request(
-                method, url, headers=self.headers,
-                data=json.dumps(data) if data else None,
-                params=params, timeout=10
-            )
+            response = self.retry_policy.call(method, lambda: self.limiter.call(
+                lambda: self.http_session.request(method, url, data=body, params=params, timeout=10),
+                kind=method
+            ), idempotent=idempotent)
             # 对于创建操作，201也是成功状态码
             # 对于更新操作，204 No Content 也是成功状态码
             if response.status_code not in [200, 201, 204]:
@@ -95,6 +169,80 @@ class TeableClient:
             logger.error(f"发生未知错误: {e}")
             raise
 
+    def _get_with_etag(self, endpoint: str, etag: Optional[str] = None):
+        """
+        条件 GET 请求
+        
+        Args:
+            endpoint: API 端点
+            etag: 上次响应的 ETag，非空时发送 If-None-Match
+            
+        Returns:
+            (响应数据, ETag) 元组；服务器返回 304 时响应数据为 None
+        """
+        url = f"{self.base_url}/api{endpoint}"
+        headers = {'If-None-Match': etag} if etag else None
+        response = self.retry_policy.call("GET", lambda: self.limiter.call(
+            lambda: self.http_session.get(url, headers=headers, timeout=10), kind="GET"))
+        if response.status_code == 304 and etag:
+            return None, etag
+        if response.status_code != 200:
+            logger.error(f"请求失败: {response.status_code} - {response.text}")
+            error_detail = f"{response.status_code} Error: {url}\n响应内容: {response.text}"
+            raise requests.exceptions.HTTPError(error_detail, response=response)
+        return response.json(), response.headers.get('ETag')
+
+    def _cached_get(self, key: str, endpoint: str, version: Optional[str] = None) -> Any:
+        """
+        经表结构缓存的 GET 请求
+        
+        缓存有效期内直接返回缓存数据；过期后带 ETag 重新验证（304 时沿用缓存）。
+        version 与缓存条目记录的不一致时（如表格已被修改）视为失效，重新获取。
+        
+        Args:
+            key: 缓存键
+            endpoint: API 端点
+            version: 数据版本标识（如表格的 lastModifiedTime）
+            
+        Returns:
+            API 响应数据
+        """
+        cache = self.schema_cache
+        if cache is None:
+            return self._request("GET", endpoint)
+        
+        entry = cache.get(key)
+        if entry is not None and version is not None and entry.get('version') != version:
+            entry = None
+        if entry is not None and cache.is_fresh(entry):
+            logger.debug(f"使用表结构缓存: {key}")
+            return entry['data']
+        
+        data, etag = self._get_with_etag(endpoint, entry.get('etag') if entry else None)
+        if data is None:
+            logger.debug(f"表结构未变化(304)，沿用缓存: {key}")
+            data = entry['data']
+        cache.set(key, data, etag=etag, version=version)
+        return data
+
+    def _table_version(self, table_id: str) -> Optional[str]:
+        """从已缓存的表格列表中取表格的最后修改时间，用于校验字段缓存（不发起请求）"""
+        if self.schema_cache is None:
+            return None
+        entry = self.schema_cache.get("tables")
+        if not entry or not isinstance(entry.get('data'), list):
+            return None
+        for table in entry['data']:
+            if table.get('id') == table_id:
+                return table.get('lastModifiedTime') or table.get('updatedTime')
+        return None
+
+    def _invalidate_schema(self, table_id: Optional[str] = None):
+        """表结构变更后清除对应缓存：指定table_id时清除该表字段缓存，否则清除表格列表缓存"""
+        if self.schema_cache is None:
+            return
+        self.schema_cache.invalidate(f"fields_{table_id}" if table_id else "tables")
+
     def create_table(self, table_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         创建表格
@@ -117,7 +265,10 @@ class TeableClient:
         """
         logger.info(f"创建表格: {table_config.get('name', '未知')}")
         endpoint = f"/base/{self.base_id}/table/"
-        return self._request("POST", endpoint, data=table_config)
+        try:
+            return self._request("POST", endpoint, data=table_config)
+        finally:
+            self._invalidate_schema()
     
     def get_table_fields(self, table_id: str) -> List[Dict[str, Any]]:
         """
@@ -131,8 +282,9 @@ class TeableClient:
         """
         logger.info(f"获取表格字段: {table_id}")
         endpoint = f"/table/{table_id}/field/"
-        return self._request("GET", endpoint)
+        return self._cached_get(f"fields_{table_id}", endpoint, version=self._table_version(table_id))
 
+    @_changes_schema
     def add_field(self, table_id: str, field_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         添加字段
@@ -222,7 +374,8 @@ class TeableClient:
         
         return self._request("POST", endpoint, data=data)
 
-    def get_records(self, table_id: str, page: int = 1, page_size: int = 100, **kwargs) -> Dict[str, Any]:
+    def get_records(self, table_id: str, page: int = 1, page_size: int = 100,
+                    projection: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
         """
         查询记录
         
@@ -230,6 +383,8 @@ class TeableClient:
             table_id: 表格ID
             page: 页码，从1开始
             page_size: 每页记录数
+            projection: 只返回这些字段（字段名列表），None 表示返回全部字段；
+                注意空列表同样返回全部字段，只需要记录ID时使用 id_projection()
             **kwargs: 其他查询参数，如filter, orderBy, take, skip等
             
         Returns:
@@ -257,9 +412,234 @@ class TeableClient:
             # 添加其他参数
             params.update(kwargs)
         
+        if projection:
+            params['projection[]'] = list(projection)
+        
         logger.info(f"实际请求参数: {params}")
         return self._request("GET", endpoint, params=params)
 
+    def iter_record_pages(self, table_id: str, page_size: int = 100, limit: Optional[int] = None,
+                          prefetch: int = 1, offset: int = 0, **kwargs):
+        """
+        按页迭代记录（skip/take 分页），支持并行预取
+
+        第一页同步获取，如果响应中带有 total，则据此规划后续页的 skip，
+        之后最多保持 prefetch 个分页请求同时在途；页面始终按顺序产出。
+
+        Args:
+            table_id: 表格ID
+            page_size: 每页记录数
+            limit: 最多返回的记录数（None 表示不限制）
+            prefetch: 同时在途的分页请求数，1 表示顺序获取
+            offset: 跳过前 offset 条记录（用于断点续传）
+            **kwargs: 其他查询参数，如filter, orderBy等
+
+        Yields:
+            每页的记录列表
+        """
+        def fetch(skip: int, take: int) -> Dict[str, Any]:
+            return self.get_records(table_id, skip=skip, take=take, **kwargs)
+
+        first_take = min(page_size, limit) if limit else page_size
+        if first_take <= 0:
+            return
+
+        first_page = fetch(offset, first_take)
+        records = first_page.get('records', [])
+        if records:
+            yield records
+        if len(records) < first_take:
+            return
+
+        # 用第一页的 total 规划剩余分页
+        end = offset + limit if limit else None
+        total = first_page.get('total')
+        if isinstance(total, int):
+            end = total if end is None else min(end, total)
+        next_skip = offset + len(records)
+
+        def plan_next():
+            nonlocal next_skip
+            if end is not None and next_skip >= end:
+                return None
+            take = page_size if end is None else min(page_size, end - next_skip)
+            skip = next_skip
+            next_skip += take
+            return skip, take
+
+        if prefetch <= 1:
+            while True:
+                planned = plan_next()
+                if planned is None:
+                    return
+                skip, take = planned
+                records = fetch(skip, take).get('records', [])
+                if records:
+                    yield records
+                if len(records) < take:
+                    return
+
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=prefetch) as executor:
+            pending = deque()
+
+            def fill():
+                while len(pending) < prefetch:
+                    planned = plan_next()
+                    if planned is None:
+                        return
+                    skip, take = planned
+                    pending.append((take, executor.submit(fetch, skip, take)))
+
+            try:
+                fill()
+                while pending:
+                    take, future = pending.popleft()
+                    records = future.result().get('records', [])
+                    if records:
+                        yield records
+                    if len(records) < take:
+                        break
+                    fill()
+            finally:
+                # 提前结束（数据取完或下游关闭管道）时取消尚未开始的请求
+                for _, future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def find_cursor_field(fields: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        查找可用于游标分页的字段
+
+        autoNumber 字段单调递增且唯一，可以作为稳定的排序键。
+
+        Args:
+            fields: 表格字段列表
+
+        Returns:
+            autoNumber 字段名，如果表格没有该字段返回None
+        """
+        for field in fields:
+            if field.get('type') == 'autoNumber':
+                return field.get('name')
+        return None
+
+    @classmethod
+    def id_projection(cls, fields: List[Dict[str, Any]]) -> List[str]:
+        """
+        只需要记录ID时使用的字段投影
+        
+        Teable 不支持不返回任何字段，因此只请求一个体积最小的字段：
+        优先 autoNumber 字段（游标分页也需要它），否则主字段。
+        
+        Args:
+            fields: 表格字段列表
+            
+        Returns:
+            字段名列表
+        """
+        cursor_field = cls.find_cursor_field(fields)
+        if cursor_field:
+            return [cursor_field]
+        for field in fields:
+            if field.get('isPrimary'):
+                return [field.get('name')]
+        return [fields[0].get('name')] if fields else []
+
+    def iter_records_by_cursor(self, table_id: str, cursor_field: str, page_size: int = 100,
+                               limit: Optional[int] = None, start_after: Optional[Any] = None,
+                               **kwargs):
+        """
+        按游标分页迭代记录（keyset 分页）
+
+        按 cursor_field 升序排序，每页用 `cursor_field > 上一页最后一个值` 过滤，
+        而不是使用越来越大的 skip，因此第2000页与第1页的查询代价相同，
+        并且分页期间的并发插入不会导致记录被跳过或重复。
+
+        Args:
+            table_id: 表格ID
+            cursor_field: 游标字段名（autoNumber 字段）
+            page_size: 每页记录数
+            limit: 最多返回的记录数（None 表示不限制）
+            start_after: 从该游标值之后开始（用于断点续传）
+            **kwargs: 其他查询参数，如filter；不能与 orderBy 同时使用
+
+        Yields:
+            每页的记录列表
+        """
+        base_filter = kwargs.pop('filter', None)
+        if isinstance(base_filter, str):
+            base_filter = json.loads(base_filter)
+        kwargs.pop('orderBy', None)
+        order_by = json.dumps([{"fieldId": cursor_field, "order": "asc"}])
+
+        last_seen = start_after
+        fetched = 0
+        while True:
+            take = page_size if limit is None else min(page_size, limit - fetched)
+            if take <= 0:
+                return
+
+            filter_set = []
+            if base_filter:
+                filter_set.append(base_filter)
+            if last_seen is not None:
+                filter_set.append({"fieldId": cursor_field, "operator": "isGreater", "value": last_seen})
+
+            params = dict(kwargs)
+            if filter_set:
+                params['filter'] = json.dumps({"conjunction": "and", "filterSet": filter_set})
+            params['orderBy'] = order_by
+            if params.get('projection') and cursor_field not in params['projection']:
+                # 游标字段必须返回，才能确定下一页的起点
+                params['projection'] = list(params['projection']) + [cursor_field]
+
+            records = self.get_records(table_id, skip=0, take=take, **params).get('records', [])
+            if records:
+                yield records
+            if len(records) < take:
+                return
+
+            fetched += len(records)
+            last_seen = records[-1].get('fields', {}).get(cursor_field)
+            if last_seen is None:
+                raise Exception(f"记录中缺少游标字段 '{cursor_field}'，无法继续游标分页")
+
+    def scan_record_pages(self, table_id: str, fields: Optional[List[Dict[str, Any]]] = None,
+                          page_size: int = 100, limit: Optional[int] = None, prefetch: int = 1,
+                          **kwargs):
+        """
+        按页扫描表格记录，自动选择分页方式
+
+        表格有 autoNumber 字段、没有自定义排序且不需要并行预取时使用游标分页，
+        否则回退到 skip/take 分页。
+
+        Args:
+            table_id: 表格ID
+            fields: 表格字段列表（不提供时自动获取）
+            page_size: 每页记录数
+            limit: 最多返回的记录数
+            prefetch: 并行预取页数（仅 skip/take 分页支持）
+            **kwargs: 其他查询参数，如filter, orderBy等
+
+        Yields:
+            每页的记录列表
+        """
+        cursor_field = None
+        if prefetch <= 1 and 'orderBy' not in kwargs:
+            if fields is None:
+                fields = self.get_table_fields(table_id)
+            cursor_field = self.find_cursor_field(fields)
+
+        if cursor_field:
+            logger.info(f"使用游标分页: {cursor_field}")
+            return self.iter_records_by_cursor(table_id, cursor_field, page_size=page_size,
+                                               limit=limit, **kwargs)
+        return self.iter_record_pages(table_id, page_size=page_size, limit=limit,
+                                      prefetch=prefetch, **kwargs)
+
     def update_record(self, table_id: str, record_id: str, 
                      fields_data: Dict[str, Any], use_field_ids: bool = False) -> Dict[str, Any]:
         """
@@ -325,7 +705,10 @@ class TeableClient:
             }
             batch_data.append(record_data)
         
-        return self._request("PATCH", endpoint, data={"records": batch_data})
+        data = {"records": batch_data}
+        if use_field_ids:
+            data["fieldKeyType"] = "id"
+        return self._request("PATCH", endpoint, data=data)
 
     def delete_record(self, table_id: str, record_id: str) -> bool:
         """
@@ -347,6 +730,21 @@ class TeableClient:
             logger.error(f"删除记录失败: {e}")
             return False
 
+    def batch_delete_records(self, table_id: str, record_ids: List[str]) -> Dict[str, Any]:
+        """
+        批量删除记录（一次请求删除多条记录）
+        
+        Args:
+            table_id: 表格ID
+            record_ids: 记录ID列表
+            
+        Returns:
+            API 响应数据；请求失败时抛出异常（整批未删除）
+        """
+        logger.info(f"批量删除表格 {table_id} 的 {len(record_ids)} 条记录")
+        endpoint = f"/table/{table_id}/record"
+        return self._request("DELETE", endpoint, params={"recordIds[]": list(record_ids)})
+
     def create_view(self, table_id: str, view_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         创建视图
@@ -415,6 +813,9 @@ class TeableClient:
         except Exception as e:
             logger.error(f"删除表格失败: {e}")
             return False
+        finally:
+            self._invalidate_schema(table_id)
+            self._invalidate_schema()
     
     def get_tables(self) -> List[Dict[str, Any]]:
         """
@@ -425,7 +826,7 @@ class TeableClient:
         """
         logger.info("获取表格列表")
         endpoint = f"/base/{self.base_id}/table"
-        return self._request("GET", endpoint)
+        return self._cached_get("tables", endpoint)
 
     def get_record(self, table_id: str, record_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -446,6 +847,7 @@ class TeableClient:
             logger.error(f"获取记录失败: {e}")
             return None
 
+    @_changes_schema
     def delete_field(self, table_id: str, field_id: str) -> bool:
         """
         删除字段
@@ -467,6 +869,7 @@ class TeableClient:
             logger.error(f"❌ 字段删除失败: {field_id}, 错误: {e}")
             return False
 
+    @_changes_schema
     def batch_add_fields(self, table_id: str, field_configs: List[Dict], window_id: Optional[str] = None) -> Dict:
         """
         批量添加字段
@@ -492,7 +895,7 @@ class TeableClient:
         logger.info(f"批量添加字段到表 {table_id}，字段数量: {len(field_configs)}")
         
         try:
-            response = requests.post(
+            response = self.http_session.post(
                 url=f"{self.base_url}{url}",
                 headers=headers,
                 json=data,
@@ -516,6 +919,7 @@ class TeableClient:
             logger.error(f"JSON 解析错误: {e}")
             raise
 
+    @_changes_schema
     def convert_field_to_formula(self, table_id: str, field_id: str, expression: str, 
                                 time_zone: str = "Asia/Shanghai", formatting: Optional[Dict] = None,
                                 window_id: Optional[str] = None) -> Dict:
@@ -567,7 +971,7 @@ class TeableClient:
             
             # 尝试使用PATCH方法（类似update_record）
             # 如果PUT不行，可以尝试PATCH
-            response = requests.put(
+            response = self.http_session.put(
                 url=url,
                 headers=headers,
                 json=data,
@@ -577,7 +981,7 @@ class TeableClient:
             # 如果PUT返回404，尝试PATCH
             if response.status_code == 404:
                 logger.info("PUT方法返回404，尝试使用PATCH方法")
-                response = requests.patch(
+                response = self.http_session.patch(
                     url=url,
                     headers=headers,
                     json=data,
@@ -601,6 +1005,7 @@ class TeableClient:
             logger.error(f"JSON 解析错误: {e}")
             raise
 
+    @_changes_schema
     def update_field_formatting(self, table_id: str, field_id: str, formatting: Dict[str, Any],
                                window_id: Optional[str] = None) -> Dict:
         """
@@ -615,6 +1020,8 @@ class TeableClient:
         Returns:
             更新结果
         """
+        # 读取当前配置前也清除，保证基于最新的字段结构修改
+        self._invalidate_schema(table_id)
         # 先获取字段的当前配置
         fields = self.get_table_fields(table_id)
         current_field = None
@@ -646,6 +1053,7 @@ class TeableClient:
             window_id=window_id
         )
 
+    @_changes_schema
     def update_number_field_precision(self, table_id: str, field_id: str, precision: int,
                                      window_id: Optional[str] = None) -> Dict:
         """
@@ -660,6 +1068,8 @@ class TeableClient:
         Returns:
             更新结果
         """
+        # 读取当前配置前也清除，保证基于最新的字段结构修改
+        self._invalidate_schema(table_id)
         # 先获取字段的当前配置
         fields = self.get_table_fields(table_id)
         current_field = None
@@ -709,7 +1119,7 @@ class TeableClient:
             logger.debug(f"更新字段精度请求数据: {json.dumps(data, ensure_ascii=False, indent=2)}")
             
             # 使用PUT方法调用convert API
-            response = requests.put(
+            response = self.http_session.put(
                 url=url,
                 headers=headers,
                 json=data,
@@ -733,6 +1143,7 @@ class TeableClient:
             logger.error(f"JSON 解析错误: {e}")
             raise
 
+    @_changes_schema
     def update_field_properties(self, table_id: str, field_id: str, 
                                 unique: Optional[bool] = None,
                                 not_null: Optional[bool] = None) -> Dict:
@@ -763,7 +1174,7 @@ class TeableClient:
         
         try:
             url = f"{self.base_url}/api{endpoint}"
-            response = requests.patch(
+            response = self.http_session.patch(
                 url=url,
                 headers=self.headers,
                 json=update_data,
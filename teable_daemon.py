@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻进程（t daemon）和瘦客户端
+
+脚本中循环调用 t 时，每次调用都要重新导入 click/rich/requests 等模块、读取配置并创建客户端。
+常驻进程预先完成这些初始化，在 Unix socket 上等待请求；t 启动时先尝试连接常驻进程，
+把命令行参数、工作目录、环境变量和标准输入/输出/错误的文件描述符一起转交给它，
+由常驻进程 fork 出的子进程直接读写调用方的终端或管道，执行完成后返回退出码。
+常驻进程不存在时在当前进程中正常执行。
+
+本模块的瘦客户端部分只使用标准库中加载很快的模块，保证转发路径的启动开销足够小。
+"""
+
+import os
+import sys
+import json
+import array
+import socket
+
+# 常驻进程的 socket 和 pid 文件（与 Config.config_dir 相同的目录）
+CONFIG_DIR = os.path.join(os.path.expanduser('~'), '.teable')
+SOCKET_PATH = os.path.join(CONFIG_DIR, 'daemon.sock')
+PID_FILE = os.path.join(CONFIG_DIR, 'daemon.pid')
+# 空闲多久（秒）后常驻进程自动退出
+DEFAULT_IDLE_TIMEOUT = 3600
+# 禁用转发的环境变量（调试或常驻进程内部使用）
+NO_DAEMON_ENV = 'TEABLE_NO_DAEMON'
+# 转交给常驻进程的环境变量（子进程以这些变量替换常驻进程自己的环境）
+FORWARDED_ENV_PREFIXES = ('TEABLE_', 'LANG', 'LC_', 'TERM', 'COLUMNS', 'LINES', 'NO_COLOR', 'TZ', 'PATH', 'HOME',
+                          # 代理和证书设置（requests 从环境变量读取，代理变量也有小写写法）
+                          'HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'NO_PROXY',
+                          'http_proxy', 'https_proxy', 'all_proxy', 'no_proxy',
+                          'REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE', 'SSL_CERT_FILE', 'SSL_CERT_DIR')
+# 请求头最大长度
+MAX_HEADER_SIZE = 1024 * 1024
+# 接收请求头的时限（秒）：主循环逐个接收请求，连接后不发送请求的客户端不能阻塞其他调用
+REQUEST_TIMEOUT = 2.0
+
+
+def main():
+    """t 命令入口：常驻进程在运行时转发命令，否则在当前进程中执行"""
+    argv = sys.argv[1:]
+    if argv[:1] != ['daemon'] and not os.environ.get(NO_DAEMON_ENV):
+        exit_code = forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from cli import main as cli_main
+    return cli_main()
+
+
+def forward(argv: list):
+    """把命令转发给常驻进程执行，返回退出码；常驻进程不可用时返回None"""
+    if not os.path.exists(SOCKET_PATH):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        # socket 文件残留但常驻进程已退出
+        sock.close()
+        return None
+
+    header = json.dumps({
+        'op': 'run',
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'env': {key: value for key, value in os.environ.items() if key.startswith(FORWARDED_ENV_PREFIXES)},
+    }).encode('utf-8') + b'\n'
+
+    with sock:
+        try:
+            fds = array.array('i', [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()])
+            sock.sendmsg([header], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+            reader = sock.makefile('rb')
+            started = _read_message(reader)
+        except (OSError, ValueError):
+            return None
+        if started is None or 'pid' not in started:
+            return None
+
+        # 命令已由常驻进程执行，此后不能再回退到本地执行
+        while True:
+            try:
+                result = _read_message(reader)
+                break
+            except KeyboardInterrupt:
+                # Ctrl+C 只发给前台进程（瘦客户端），转发给执行命令的子进程
+                _interrupt(started['pid'])
+            except OSError:
+                result = None
+                break
+    return result.get('exit', 1) if result else 1
+
+
+def _read_message(reader):
+    line = reader.readline(MAX_HEADER_SIZE)
+    return json.loads(line.decode('utf-8')) if line else None
+
+
+def _interrupt(pid: int):
+    import signal
+    try:
+        os.kill(pid, signal.SIGINT)
+    except OSError:
+        pass
+
+
+def daemon_command(args: list) -> int:
+    """t daemon [start|stop|status|run]"""
+    action = args[0] if args else 'status'
+    if action == 'start':
+        return start_daemon()
+    if action == 'stop':
+        return stop_daemon()
+    if action == 'status':
+        return daemon_status()
+    if action == 'run':
+        # 前台运行（调试或交给 systemd 等进程管理器）
+        return serve()
+    print(f"错误: 未知的daemon子命令 '{action}'")
+    print("使用: t daemon [start|stop|status|run]")
+    return 1
+
+
+def _read_pid():
+    try:
+        with open(PID_FILE, 'r') as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+
+def daemon_status() -> int:
+    pid = _read_pid()
+    if pid and os.path.exists(SOCKET_PATH):
+        print(f"常驻进程运行中 (pid {pid})")
+        print(f"Socket: {SOCKET_PATH}")
+        return 0
+    print("常驻进程未运行，使用 't daemon start' 启动")
+    return 1
+
+
+def start_daemon() -> int:
+    """在后台启动常驻进程"""
+    if _read_pid():
+        print(f"常驻进程已在运行 (pid {_read_pid()})")
+        return 0
+
+    import subprocess
+    import time
+    env = dict(os.environ, **{NO_DAEMON_ENV: '1'})
+    with open(os.devnull, 'r+b') as devnull:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), 'daemon', 'run'],
+                         stdin=devnull, stdout=devnull, stderr=devnull,
+                         cwd='/', env=env, start_new_session=True, close_fds=True)
+
+    # 等待 socket 就绪
+    for _ in range(100):
+        if os.path.exists(SOCKET_PATH) and _read_pid():
+            print(f"✅ 常驻进程已启动 (pid {_read_pid()})")
+            return 0
+        time.sleep(0.05)
+    print("错误: 常驻进程启动失败，可使用 't daemon run' 在前台运行查看错误信息")
+    return 1
+
+
+def stop_daemon() -> int:
+    """停止常驻进程"""
+    import signal
+    pid = _read_pid()
+    if not pid:
+        print("常驻进程未运行")
+        _cleanup()
+        return 0
+    os.kill(pid, signal.SIGTERM)
+    print(f"✅ 常驻进程已停止 (pid {pid})")
+    return 0
+
+
+def _cleanup():
+    for path in (SOCKET_PATH, PID_FILE):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> int:
+    """常驻进程主循环：预先导入命令模块，每个请求 fork 一个子进程执行"""
+    import signal
+    import logging
+
+    # 预先完成耗时的导入，fork 出的子进程直接继承（命令模块和表格渲染库平时按需导入）
+    import cli  # noqa: F401
+    import commands  # noqa: F401
+    for name in commands.__all__:
+        getattr(commands, name)
+    import teable_api_client  # noqa: F401
+    import rich.console  # noqa: F401
+    import rich.table  # noqa: F401
+    import tabulate  # noqa: F401
+    from config import Config
+
+    config = Config()
+    config.ensure_config_dir()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    idle_timeout = config.get('daemon_idle_timeout', idle_timeout)
+    logger = logging.getLogger(__name__)
+
+    if _read_pid() and _read_pid() != os.getpid():
+        print(f"错误: 常驻进程已在运行 (pid {_read_pid()})")
+        return 1
+    _cleanup()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(SOCKET_PATH)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(idle_timeout or None)
+    with open(PID_FILE, 'w') as f:
+        f.write(str(os.getpid()))
+
+    def shutdown(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    # 子进程退出后由内核回收，不产生僵尸进程
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    logger.info(f"常驻进程已启动: {SOCKET_PATH}")
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                logger.info("空闲超时，常驻进程退出")
+                return 0
+            except InterruptedError:
+                continue
+            try:
+                _handle_connection(server, conn)
+            except socket.timeout:
+                logger.warning(f"客户端在 {REQUEST_TIMEOUT} 秒内没有发送完整的请求，关闭连接")
+            except Exception as e:
+                logger.error(f"处理请求失败: {e}", exc_info=True)
+            finally:
+                conn.close()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        server.close()
+        if _read_pid() == os.getpid():
+            _cleanup()
+
+
+def _handle_connection(server: socket.socket, conn: socket.socket):
+    """接收请求头和调用方的标准输入/输出/错误，fork 子进程执行命令
+
+    请求头必须在 REQUEST_TIMEOUT 内接收完整，否则抛出 socket.timeout。
+    """
+    import time
+
+    deadline = time.monotonic() + REQUEST_TIMEOUT
+    conn.settimeout(REQUEST_TIMEOUT)
+    fds = array.array('i')
+    data, ancdata, _, _ = conn.recvmsg(MAX_HEADER_SIZE, socket.CMSG_SPACE(3 * fds.itemsize))
+    for level, kind, payload in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(payload[:len(payload) - (len(payload) % fds.itemsize)])
+    try:
+        while not data.endswith(b'\n'):
+            # 按总时限计算剩余时间，逐字节慢慢发送的客户端同样会超时
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout()
+            conn.settimeout(remaining)
+            chunk = conn.recv(MAX_HEADER_SIZE)
+            if not chunk:
+                return
+            data += chunk
+        request = json.loads(data.decode('utf-8'))
+        if request.get('op') != 'run' or len(fds) != 3:
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            # 命令执行时间不限，恢复阻塞模式
+            conn.settimeout(None)
+            exit_code = 1
+            try:
+                exit_code = _run_in_child(conn, request, list(fds))
+            finally:
+                os._exit(exit_code)
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def _run_in_child(conn: socket.socket, request: dict, fds: list) -> int:
+    """在子进程中以调用方的终端/管道、工作目录和环境变量执行命令"""
+    import io
+    import signal
+
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request.get('cwd') or '/')
+    os.environ.clear()
+    os.environ.update(request.get('env') or {})
+    os.environ.pop(NO_DAEMON_ENV, None)
+
+    sys.stdin = io.TextIOWrapper(io.FileIO(0, 'r', closefd=False), encoding='utf-8')
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), encoding='utf-8',
+                                  line_buffering=os.isatty(1))
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, 'w', closefd=False), encoding='utf-8', line_buffering=True)
+
+    conn.sendall(json.dumps({'pid': os.getpid()}).encode('utf-8') + b'\n')
+
+    import click
+    from cli import main as cli_main
+    try:
+        result = cli_main.main(args=request.get('argv') or [], prog_name='t', standalone_mode=False)
+        exit_code = result if isinstance(result, int) else 0
+    except click.exceptions.Abort:
+        exit_code = 1
+    except click.ClickException as e:
+        e.show()
+        exit_code = e.exit_code
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+        exit_code = 130
+    except BrokenPipeError:
+        exit_code = 0
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+
+    try:
+        conn.sendall(json.dumps({'exit': exit_code}).encode('utf-8') + b'\n')
+    except OSError:
+        pass
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
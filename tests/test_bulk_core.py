@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量操作核心组件（bulk_core）单元测试
+
+覆盖批次大小控制器的调整规则、read_batches 按时限刷新和用户中断的处理，
+不需要连接 Teable 服务。
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.bulk_core import BatchSizer, read_batches
+
+
+def http_error(status_code):
+    """带响应状态码的 HTTPError"""
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f"HTTP {status_code}", response=response)
+
+
+def test_fixed_sizer_keeps_size():
+    """固定模式下成功请求不改变批次大小，413 仍然减半"""
+    sizer = BatchSizer(size=100)
+    sizer.record_success(100, 0.01)
+    sizer.record_success(100, 60)
+    assert sizer.size == 100
+    sizer.record_failure(http_error(413))
+    assert sizer.size == 50
+    sizer.record_failure(http_error(500))
+    assert sizer.size == 50
+
+
+def test_adaptive_sizer_grows_and_shrinks():
+    """自适应模式：快速的满批次翻倍，慢批次和超时减半，不越过上下限"""
+    sizer = BatchSizer(size=50, adaptive=True, max_size=150, latency_target=2.0)
+    sizer.record_success(50, 0.1)
+    assert sizer.size == 100
+    # 未满的批次不能说明更大的批次也足够快
+    sizer.record_success(10, 0.1)
+    assert sizer.size == 100
+    sizer.record_success(100, 0.1)
+    assert sizer.size == 150
+    sizer.record_success(150, 3.0)
+    assert sizer.size == 75
+    sizer.record_failure(requests.exceptions.Timeout())
+    assert sizer.size == 37
+
+    small = BatchSizer(size=1, adaptive=True)
+    small.record_failure(http_error(413))
+    assert small.size == 1
+
+
+def test_sizer_clamps_initial_size():
+    """初始批次大小限制在上下限之间"""
+    assert BatchSizer(size=5000).size == 1000
+    assert BatchSizer(size=0).size == 1
+
+
+def test_read_batches_by_size():
+    """记录按当前批次大小切分，最后一个批次可以不满"""
+    batches = list(read_batches(range(7), BatchSizer(size=3), flush_interval=10))
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_read_batches_skips_none():
+    """None 记录（无法解析的行）被忽略"""
+    batches = list(read_batches([1, None, 2], BatchSizer(size=10), flush_interval=10))
+    assert batches == [[1, 2]]
+
+
+def test_read_batches_flush_interval():
+    """上游暂停时，未满的批次在刷新时限到达后立即产出"""
+    resume = threading.Event()
+
+    def slow_records():
+        yield 1
+        yield 2
+        resume.wait(5)
+        yield 3
+
+    batches = read_batches(slow_records(), BatchSizer(size=100), flush_interval=0.1)
+    start = time.monotonic()
+    assert next(batches) == [1, 2]
+    assert time.monotonic() - start < 2
+    resume.set()
+    assert list(batches) == [[3]]
+
+
+def test_read_batches_reraises_reader_error():
+    """读取记录时的异常在主线程重新抛出"""
+    def broken_records():
+        yield 1
+        raise ValueError("坏数据")
+
+    try:
+        list(read_batches(broken_records(), BatchSizer(size=10), flush_interval=10))
+    except ValueError as e:
+        assert str(e) == "坏数据"
+    else:
+        raise AssertionError("没有抛出读取异常")
+
+
+def test_read_batches_interrupt():
+    """用户中断时先产出已收集的记录，再向调用方抛出 KeyboardInterrupt"""
+    blocked = threading.Event()
+
+    def interrupted_records():
+        yield 1
+        yield 2
+        # 模拟上游停止输出时用户按下 Ctrl+C
+        time.sleep(0.1)
+        os.kill(os.getpid(), signal.SIGINT)
+        blocked.wait(5)
+
+    batches = read_batches(interrupted_records(), BatchSizer(size=100), flush_interval=10)
+    received = []
+    try:
+        for batch in batches:
+            received.append(batch)
+    except KeyboardInterrupt:
+        pass
+    else:
+        raise AssertionError("中断没有传递给调用方")
+    finally:
+        blocked.set()
+    assert received == [[1, 2]]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制（concurrency_limiter）单元测试
+
+覆盖 AIMD 上限的加性增长、过载和延迟变慢时减半、同一轮失败只减半一次、名额等待，
+以及异步版本，不需要连接 Teable 服务。
+"""
+
+import os
+import sys
+import asyncio
+import threading
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import concurrency_limiter
+from concurrency_limiter import AIMDLimiter, AsyncAIMDLimiter
+
+
+def make_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+def release_ok(limiter, count, latency=0.01, kind='GET'):
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(False, latency, kind)
+
+
+def test_additive_increase():
+    """正常请求约每轮 limit 个请求上限 +1，不超过 max_limit"""
+    limiter = AIMDLimiter(max_limit=6, initial_limit=4)
+    # 每个请求 +1/limit，limit 从 4 增长到 5 需要 5 个请求
+    release_ok(limiter, 4)
+    assert limiter.limit == 4
+    release_ok(limiter, 1)
+    assert limiter.limit == 5
+    release_ok(limiter, 100)
+    assert limiter.limit == 6
+
+
+def test_overload_halves_once_per_round():
+    """过载时上限减半；同一轮内的多个失败只减半一次"""
+    limiter = AIMDLimiter(max_limit=32, initial_limit=16)
+    limiter.acquire()
+    limiter.release(True, 1.0)
+    assert limiter.limit == 8
+    limiter.acquire()
+    limiter.release(True, 1.0)
+    assert limiter.limit == 8
+
+
+def test_decrease_respects_min_limit():
+    """上限不低于 min_limit"""
+    limiter = AIMDLimiter(max_limit=8, initial_limit=2, min_limit=2)
+    limiter._last_decrease = -1000
+    limiter.acquire()
+    limiter.release(True, 0.0)
+    assert limiter.limit == 2
+
+
+def test_slow_latency_decreases_per_kind():
+    """延迟超过同类请求平均延迟的倍数时减半；不同类别的请求分别统计"""
+    limiter = AIMDLimiter(max_limit=32, initial_limit=16, latency_tolerance=3.0)
+    release_ok(limiter, 5, latency=0.5, kind='GET')
+    limit = limiter.limit
+    # 批量写入本身较慢，不因为比查询慢而降速
+    release_ok(limiter, 1, latency=1.2, kind='POST')
+    assert limiter.limit >= limit
+    limit = limiter.limit
+    release_ok(limiter, 1, latency=5.0, kind='GET')
+    assert limiter.limit == limit // 2
+
+
+def test_latency_floor():
+    """基线很小时，低于 LATENCY_FLOOR 的延迟不视为变慢"""
+    limiter = AIMDLimiter(max_limit=32, initial_limit=16)
+    release_ok(limiter, 3, latency=0.001)
+    limit = limiter.limit
+    release_ok(limiter, 1, latency=concurrency_limiter.LATENCY_FLOOR / 2)
+    assert limiter.limit >= limit
+
+
+def test_acquire_blocks_at_limit():
+    """名额用完时 acquire 阻塞，释放后继续"""
+    limiter = AIMDLimiter(max_limit=2, initial_limit=2)
+    limiter.acquire()
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def waiter():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=waiter, daemon=True)
+    thread.start()
+    assert not acquired.wait(0.1)
+    limiter.release(False, 0.01)
+    assert acquired.wait(2)
+    assert limiter.in_flight == 2
+    thread.join(2)
+
+
+def test_call_classifies_responses():
+    """call 按响应状态码判断过载，请求异常也视为过载并释放名额"""
+    limiter = AIMDLimiter(max_limit=32, initial_limit=16)
+    assert limiter.call(lambda: make_response(200), kind='GET').status_code == 200
+    assert limiter.limit == 16 and limiter.in_flight == 0
+
+    limiter.call(lambda: make_response(429), kind='GET')
+    assert limiter.limit == 8
+
+    def broken():
+        raise requests.exceptions.ConnectionError()
+
+    limiter._last_decrease = -1000
+    try:
+        limiter.call(broken)
+    except requests.exceptions.ConnectionError:
+        pass
+    else:
+        raise AssertionError("请求异常应该抛出")
+    assert limiter.limit == 4 and limiter.in_flight == 0
+
+
+def test_async_limiter():
+    """异步版本限制同时在途的协程数，完成后释放全部名额"""
+    limiter = AsyncAIMDLimiter(max_limit=2, initial_limit=2)
+    state = {'running': 0, 'peak': 0}
+
+    async def send():
+        state['running'] += 1
+        state['peak'] = max(state['peak'], state['running'])
+        await asyncio.sleep(0.01)
+        state['running'] -= 1
+        return make_response(200)
+
+    async def main():
+        await asyncio.gather(*(limiter.call(send, kind='GET') for _ in range(8)))
+
+    asyncio.run(main())
+    assert state['peak'] <= 2
+    assert limiter.in_flight == 0
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据迁移（migrate_data）断点单元测试
+
+覆盖并发迁移时前面的批次失败、后面的批次已经写入的情况：断点记录已写入的批次，
+--resume 继续时不重复插入。使用内存中的源表和目标表代替 Teable 服务。
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.migrate import migrate_data
+
+FIELDS = [{'name': '名称', 'type': 'singleLineText'}, {'name': '编号', 'type': 'autoNumber'}]
+
+
+class FakeClient:
+    """源表按编号游标分页；向目标表插入包含 fail_on 编号的批次时失败"""
+
+    def __init__(self, count, fail_on=None):
+        self.source = [{'id': f'rec{number}', 'fields': {'名称': f'产品{number}', '编号': number}}
+                       for number in range(1, count + 1)]
+        self.target = []
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def get_tables(self):
+        return [{'id': 'tblSource', 'name': '源表'}, {'id': 'tblTarget', 'name': '目标表'}]
+
+    def get_table_fields(self, table_id):
+        return FIELDS if table_id == 'tblSource' else FIELDS[:1]
+
+    @staticmethod
+    def find_cursor_field(fields):
+        return next((f['name'] for f in fields if f['type'] == 'autoNumber'), None)
+
+    def iter_records_by_cursor(self, table_id, cursor_field, page_size=100, start_after=None, **kwargs):
+        records = [record for record in self.source
+                   if start_after is None or record['fields'][cursor_field] > start_after]
+        for start in range(0, len(records), page_size):
+            yield records[start:start + page_size]
+
+    def insert_records(self, table_id, records):
+        names = [record['fields']['名称'] for record in records]
+        if self.fail_on and f'产品{self.fail_on}' in names:
+            # 失败的批次比后面的批次晚完成，后面的批次已经写入
+            time.sleep(0.2)
+            raise RuntimeError("写入失败")
+        with self.lock:
+            self.target.extend(names)
+        return {'records': records}
+
+
+def run_migrate(client, directory, *options):
+    session = SimpleNamespace(config=SimpleNamespace(config_dir=Path(directory)))
+    return migrate_data(client, session, ['源表', '目标表', '--batch-size', '10', *options])
+
+
+def test_resume_after_failure_with_in_flight_batches():
+    """第一个批次失败时在途的后续批次已经写入；--resume 只补写失败的批次，没有重复记录"""
+    with tempfile.TemporaryDirectory() as directory:
+        client = FakeClient(60, fail_on=1)
+        assert run_migrate(client, directory, '--concurrency', '4') == 1
+        written = list(client.target)
+        assert written and '产品1' not in written
+
+        client.fail_on = None
+        assert run_migrate(client, directory, '--concurrency', '4', '--resume') == 0
+        assert sorted(client.target) == sorted(f'产品{number}' for number in range(1, 61))
+
+
+def test_resume_after_failure_sequential():
+    """顺序迁移时失败之前的批次按断点位置跳过"""
+    with tempfile.TemporaryDirectory() as directory:
+        client = FakeClient(30, fail_on=15)
+        assert run_migrate(client, directory) == 1
+        assert client.target == [f'产品{number}' for number in range(1, 11)]
+
+        client.fail_on = None
+        assert run_migrate(client, directory, '--resume') == 0
+        assert client.target == [f'产品{number}' for number in range(1, 31)]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+管道格式（pipe_core）单元测试
+
+覆盖 PipeReader 对 text、ndjson、两者混合以及 msgpack（已安装时）的解析，按块读取时跨块的行，
+PipeWriter 的 text/ndjson 输出和写出-读回的往返，不需要连接 Teable 服务。
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands import pipe_core
+from commands.pipe_core import PipeReader, PipeWriter, pipe_value_text
+
+FIELDS = [{'name': '名称', 'type': 'singleLineText'}, {'name': '数量', 'type': 'number'},
+          {'name': '客户', 'type': 'link'}]
+RECORD = {'id': 'rec1', 'fields': {'名称': '苹果', '数量': 3, '客户': {'id': 'recC', 'title': '张三'}}}
+
+
+def binary_stream(data: bytes):
+    """带二进制层的输入流（与标准输入相同）"""
+    return io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+
+
+def read_all(stream):
+    reader = PipeReader(stream)
+    return list(reader), reader
+
+
+def capture_stdout(write):
+    """执行 write()，返回期间写到标准输出的字节"""
+    buffer = io.BytesIO()
+    stdout = sys.stdout
+    sys.stdout = io.TextIOWrapper(buffer, encoding='utf-8')
+    try:
+        write()
+    finally:
+        sys.stdout.flush()
+        # 分离包装层，避免它被回收时关闭 buffer
+        sys.stdout.detach()
+        sys.stdout = stdout
+    return buffer.getvalue()
+
+
+def test_read_text():
+    """文本格式：rec 开头的行解析为记录，提示信息和注释行忽略"""
+    data = "✅ 查询完成\nrec1 名称=苹果 数量=3\n# 注释\n\nrec2\n".encode('utf-8')
+    records, reader = read_all(binary_stream(data))
+    assert records == [{'id': 'rec1', 'fields': {'名称': '苹果', '数量': '3'}},
+                       {'id': 'rec2', 'fields': {}}]
+    assert reader.format == 'text'
+
+
+def test_read_ndjson():
+    """ndjson：读取表结构头，字段值保持原始类型，不合法的行忽略"""
+    data = ('{"schema":{"version":1,"table":"产品表","fields":[]}}\n'
+            '{"id":"rec1","fields":{"数量":3,"完成":true,"标签":["a","b"]}}\n'
+            '{"id":"bad"}\n{不是JSON\n').encode('utf-8')
+    records, reader = read_all(binary_stream(data))
+    assert records == [{'id': 'rec1', 'fields': {'数量': 3, '完成': True, '标签': ['a', 'b']}}]
+    assert reader.format == 'ndjson'
+    assert reader.schema['table'] == '产品表'
+
+
+def test_read_mixed():
+    """文本和 ndjson 混合时逐行识别"""
+    data = 'rec1 名称=苹果\n{"id":"rec2","fields":{"名称":"香蕉"}}\nrec3 名称=梨\n'.encode('utf-8')
+    records, _ = read_all(binary_stream(data))
+    assert [record['id'] for record in records] == ['rec1', 'rec2', 'rec3']
+    assert records[1]['fields'] == {'名称': '香蕉'}
+
+
+def test_read_across_chunks():
+    """按块读取时，跨越块边界的行（包括多字节字符）完整解析；最后一行可以没有换行"""
+    lines = [f'{{"id":"rec{index}","fields":{{"名称":"产品{index}"}}}}' for index in range(50)]
+    data = '\n'.join(lines).encode('utf-8')
+    original = pipe_core.PIPE_READ_BUFFER
+    pipe_core.PIPE_READ_BUFFER = 7
+    try:
+        records, _ = read_all(binary_stream(data))
+    finally:
+        pipe_core.PIPE_READ_BUFFER = original
+    assert [record['fields']['名称'] for record in records] == [f'产品{index}' for index in range(50)]
+
+
+def test_read_text_stream_without_buffer():
+    """没有二进制层的流（t exec 的行内管道）按行解析"""
+    records, _ = read_all(io.StringIO('rec1 名称=苹果\n{"id":"rec2","fields":{}}\n'))
+    assert [record['id'] for record in records] == ['rec1', 'rec2']
+
+
+def test_read_msgpack():
+    """msgpack 流（已安装 msgpack 时）"""
+    msgpack = pipe_core._load_msgpack()
+    if msgpack is None:
+        return
+    data = b''.join(msgpack.packb(obj) for obj in [{'schema': {'version': 1, 'table': '产品表', 'fields': []}},
+                                                   RECORD, [1, 2]])
+    records, reader = read_all(binary_stream(data))
+    assert records == [RECORD]
+    assert reader.format == 'msgpack'
+
+
+def test_write_text():
+    """text 格式逐行输出 recXXX 字段=值，selected_fields 只输出指定字段"""
+    def write():
+        writer = PipeWriter('text', '产品表', FIELDS)
+        writer.write(RECORD, ['名称', '数量'])
+        writer.write({'id': 'rec2', 'fields': {}})
+        writer.flush()
+    assert capture_stdout(write).decode('utf-8') == 'rec1 名称=苹果 数量=3\nrec2\n'
+
+
+def test_write_ndjson_round_trip():
+    """ndjson 先写表结构头，字段值保持原始类型，读回后与原记录相同"""
+    def write():
+        writer = PipeWriter('ndjson', '产品表', lambda: FIELDS)
+        writer.write(RECORD)
+        writer.write({'id': 'rec2', 'fields': {'数量': 1.5}})
+        writer.flush()
+    output = capture_stdout(write)
+    assert output.count(b'\n') == 3
+    records, reader = read_all(binary_stream(output))
+    assert records == [RECORD, {'id': 'rec2', 'fields': {'数量': 1.5}}]
+    assert reader.schema == {'version': 1, 'table': '产品表',
+                             'fields': [{'name': f['name'], 'type': f['type']} for f in FIELDS]}
+
+
+def test_pipe_value_text():
+    """结构化值转换为单个文本值"""
+    assert pipe_value_text(None) == ''
+    assert pipe_value_text({'id': 'recC', 'title': '张三'}) == '张三'
+    assert pipe_value_text([{'title': 'a'}, 'b', 3]) == 'a,b,3'
+    assert pipe_value_text(True) == 'True'
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地副本（replica_core）单元测试
+
+覆盖 TableReplica.query 把 where/order/limit 翻译为 SQL 的结果（数值、布尔、日期、like 转义、
+默认排序）、增量写入的水位线和删除比对，使用临时目录中的 SQLite 副本，不需要连接 Teable 服务。
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.replica_core import TableReplica, ReplicaError
+
+FIELDS = [
+    {'name': '名称', 'type': 'singleLineText'},
+    {'name': '数量', 'type': 'number'},
+    {'name': '完成', 'type': 'checkbox'},
+    {'name': '日期', 'type': 'date'},
+    {'name': '标签', 'type': 'multipleSelect'},
+    {'name': '编号', 'type': 'autoNumber'},
+    {'name': '修改时间', 'type': 'lastModifiedTime'},
+]
+RECORDS = [
+    {'id': 'rec3', 'fields': {'名称': '苹果', '数量': 10, '完成': True, '日期': '2024-01-02T08:00:00.000Z',
+                              '标签': ['a', 'b'], '编号': 3, '修改时间': '2024-03-01T00:00:00.000Z'}},
+    {'id': 'rec1', 'fields': {'名称': '香蕉', '数量': 9, '日期': '2024-01-02T23:00:00.000Z',
+                              '编号': 1, '修改时间': '2024-02-01T00:00:00.000Z'}},
+    {'id': 'rec2', 'fields': {'名称': '100%_纯', '数量': 100, '完成': True, '日期': '2024-01-03T00:00:00.000Z',
+                              '编号': 2, '修改时间': '2024-01-01T00:00:00.000Z'}},
+]
+
+
+def condition(field, operator, value, condition_type='constant'):
+    return {'field': field, 'operator': operator, 'value': value, 'type': condition_type}
+
+
+def make_replica(directory):
+    replica = TableReplica(os.path.join(directory, 'tblTest.db'))
+    replica.rebuild('tblTest', '测试表', FIELDS, [RECORDS[:2], RECORDS[2:]],
+                    modified_field='修改时间', cursor_field='编号')
+    return replica
+
+
+def query_ids(replica, *conditions, **kwargs):
+    records, total = replica.query(list(conditions), **kwargs)
+    return [record['id'] for record in records], total
+
+
+def test_query_numeric_and_boolean():
+    """数值字段按数值比较（不是文本比较），复选框按 0/1 比较，未勾选的复选框等于 false"""
+    with tempfile.TemporaryDirectory() as directory:
+        replica = make_replica(directory)
+        assert query_ids(replica, condition('数量', '>', '9')) == (['rec2', 'rec3'], 2)
+        assert query_ids(replica, condition('数量', '<=', '10')) == (['rec1', 'rec3'], 2)
+        assert query_ids(replica, condition('完成', '=', 'true')) == (['rec2', 'rec3'], 2)
+        # 未勾选的复选框在记录中不出现
+        assert query_ids(replica, condition('完成', '=', 'false')) == (['rec1'], 1)
+        replica.close()
+
+
+def test_query_like_and_date():
+    """like 中的 % 和 _ 按字面匹配；只有日期部分的等值条件匹配当天"""
+    with tempfile.TemporaryDirectory() as directory:
+        replica = make_replica(directory)
+        assert query_ids(replica, condition('名称', 'like', '%_')) == (['rec2'], 1)
+        assert query_ids(replica, condition('名称', 'like', '果')) == (['rec3'], 1)
+        assert query_ids(replica, condition('日期', '=', '2024-01-02')) == (['rec1', 'rec3'], 2)
+        assert query_ids(replica, condition('标签', 'like', 'b')) == (['rec3'], 1)
+        replica.close()
+
+
+def test_query_order_and_limit():
+    """默认按自动编号排序；limit 只限制返回的记录，总数为全部符合条件的记录数"""
+    with tempfile.TemporaryDirectory() as directory:
+        replica = make_replica(directory)
+        assert query_ids(replica) == (['rec1', 'rec2', 'rec3'], 3)
+        assert query_ids(replica, order_by='数量', order_direction='desc') == (['rec2', 'rec3', 'rec1'], 3)
+        assert query_ids(replica, order_by='名称', limit=1)[1] == 3
+        assert len(query_ids(replica, limit=2)[0]) == 2
+        replica.close()
+
+
+def test_query_errors():
+    """不存在的字段、@字段名条件和不存在的排序字段报错"""
+    with tempfile.TemporaryDirectory() as directory:
+        replica = make_replica(directory)
+        for conditions, kwargs in [([condition('价格', '=', '1')], {}),
+                                   ([condition('名称', '=', '数量', 'field_mapping')], {}),
+                                   ([], {'order_by': '价格'})]:
+            try:
+                replica.query(conditions, **kwargs)
+            except ReplicaError:
+                pass
+            else:
+                raise AssertionError(f"应该报错: {conditions} {kwargs}")
+        replica.close()
+
+
+def test_upsert_and_delete_missing():
+    """增量写入按记录ID覆盖并推进水位线；比对服务器记录ID删除已删除的记录"""
+    with tempfile.TemporaryDirectory() as directory:
+        replica = make_replica(directory)
+        assert replica.meta['watermark'] == '2024-03-01T00:00:00.000Z'
+        assert replica.meta['max_cursor'] == 3
+        replica.upsert([{'id': 'rec1', 'fields': {'名称': '香蕉', '数量': 50, '编号': 1,
+                                                   '修改时间': '2024-04-01T00:00:00.000Z'}},
+                        {'id': 'rec4', 'fields': {'名称': '梨', '编号': 4}}],
+                       modified_field='修改时间', cursor_field='编号')
+        assert replica.meta['watermark'] == '2024-04-01T00:00:00.000Z'
+        assert replica.meta['max_cursor'] == 4
+        assert query_ids(replica, condition('数量', '=', '50')) == (['rec1'], 1)
+        assert replica.delete_missing({'rec1', 'rec4'}) == 2
+        assert query_ids(replica) == (['rec1', 'rec4'], 2)
+        replica.close()
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
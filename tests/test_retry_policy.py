@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求重试策略（retry_policy）单元测试
+
+覆盖重试判断、Retry-After、熔断器的打开/半开/关闭（包括试探请求得到 429 或抛出
+非请求异常的情况），不需要连接 Teable 服务。
+"""
+
+import os
+import sys
+import asyncio
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+def scripted(*results):
+    """按顺序返回响应或抛出异常的发送函数，记录调用次数"""
+    results = list(results)
+
+    def send():
+        send.calls += 1
+        result = results.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    send.calls = 0
+    return send
+
+
+def open_breaker(reset_timeout=0.0):
+    """已经熔断、reset_timeout 后进入半开状态的熔断器"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    assert breaker.is_open
+    return breaker
+
+
+def test_retry_reason():
+    """幂等请求重试 5xx 和连接错误；非幂等请求只重试 429 和建立连接失败"""
+    policy = RetryPolicy()
+    assert policy.retry_reason('GET', None, make_response(503)) == '503'
+    assert policy.retry_reason('GET', None, make_response(404)) is None
+    assert policy.retry_reason('POST', None, make_response(500)) is None
+    assert policy.retry_reason('POST', None, make_response(429)) == '429'
+    assert policy.retry_reason('POST', True, make_response(502)) == '502'
+    assert policy.retry_reason('GET', None, error=requests.exceptions.ReadTimeout()) == '超时'
+    assert policy.retry_reason('POST', None, error=requests.exceptions.ReadTimeout()) is None
+    assert policy.retry_reason('POST', None, error=requests.exceptions.ConnectTimeout()) == '连接失败'
+
+
+def test_retry_after():
+    """Retry-After 优先于指数退避，超过上限时放弃"""
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('abc') is None
+    assert parse_retry_after(None) is None
+    policy = RetryPolicy(backoff_base=1, backoff_max=4)
+    assert policy.delay(0, make_response(429, {'Retry-After': '2'})) == 2.0
+    assert policy.delay(0, make_response(429, {'Retry-After': '3600'})) is None
+    assert all(0 <= policy.delay(5) <= 4 for _ in range(20))
+
+
+def test_call_retries_until_success():
+    """可重试的错误按次数重试，成功后返回响应并记录统计"""
+    policy = RetryPolicy(max_retries=3, backoff_base=0)
+    send = scripted(make_response(503), make_response(429), make_response(200))
+    assert policy.call('GET', send).status_code == 200
+    assert send.calls == 3
+    assert policy.stats.retries == 2
+    assert '503: 1' in policy.stats.summary()
+
+
+def test_call_gives_up():
+    """重试次数用完后返回最后一次响应；不可重试的异常直接抛出"""
+    policy = RetryPolicy(max_retries=1, backoff_base=0)
+    send = scripted(make_response(500), make_response(500))
+    assert policy.call('GET', send).status_code == 500
+    assert send.calls == 2
+    assert policy.stats.gave_up == 1
+
+    send = scripted(requests.exceptions.ReadTimeout())
+    try:
+        policy.call('POST', send)
+    except requests.exceptions.ReadTimeout:
+        pass
+    else:
+        raise AssertionError("非幂等请求超时不应重试")
+    assert send.calls == 1
+
+
+def test_breaker_opens_after_threshold():
+    """连续失败达到阈值后熔断，429 不计入失败"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    policy = RetryPolicy(max_retries=0, breaker=breaker)
+    policy.call('GET', scripted(make_response(429)))
+    policy.call('GET', scripted(make_response(500)))
+    assert not breaker.is_open
+    policy.call('GET', scripted(make_response(500)))
+    assert breaker.is_open
+    try:
+        policy.call('GET', scripted(make_response(200)))
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("熔断时应直接拒绝请求")
+    assert policy.stats.rejected == 1
+
+
+def test_half_open_probe():
+    """半开状态只放行一个试探请求；试探成功关闭熔断器，失败重新打开"""
+    breaker = open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open and breaker.allow()
+
+    breaker = open_breaker()
+    policy = RetryPolicy(max_retries=0, breaker=breaker)
+    policy.call('GET', scripted(make_response(503)))
+    assert breaker.is_open
+
+
+def test_probe_429_closes_breaker():
+    """试探请求得到 429 时服务器已能响应，熔断器关闭而不是一直停在半开状态"""
+    breaker = open_breaker()
+    policy = RetryPolicy(max_retries=0, breaker=breaker)
+    assert policy.call('GET', scripted(make_response(429))).status_code == 429
+    assert not breaker.is_open
+    assert policy.call('GET', scripted(make_response(200))).status_code == 200
+
+
+def test_probe_unexpected_error_releases_probe():
+    """试探请求抛出非请求异常时结束试探，之后仍然允许新的试探请求"""
+    breaker = open_breaker()
+    policy = RetryPolicy(max_retries=0, breaker=breaker)
+    try:
+        policy.call('GET', scripted(ValueError("响应解析失败")))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("非请求异常应直接抛出")
+    assert breaker.allow()
+
+
+def test_acall_probe():
+    """异步版本同样重试，并在试探请求异常后结束试探"""
+    policy = RetryPolicy(max_retries=2, backoff_base=0)
+    send = scripted(make_response(502), make_response(200))
+
+    async def async_send():
+        return send()
+
+    assert asyncio.run(policy.acall('GET', async_send)).status_code == 200
+    assert send.calls == 2
+
+    breaker = open_breaker()
+    policy = RetryPolicy(max_retries=0, breaker=breaker)
+
+    async def broken_send():
+        raise KeyError('records')
+
+    try:
+        asyncio.run(policy.acall('GET', broken_send, errors=(requests.exceptions.RequestException,)))
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("非请求异常应直接抛出")
+    assert breaker.allow()
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
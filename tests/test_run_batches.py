@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发批次处理（bulk_core.run_batches）单元测试
+
+覆盖顺序处理、并发时按完成顺序/按输入顺序产出、在途批次数上限（背压）和异常传递，
+不需要连接 Teable 服务。
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.bulk_core import run_batches
+
+# 批次编号 -> 处理耗时（秒），前面的批次更慢，完成顺序与输入顺序相反
+DELAYS = {0: 0.3, 1: 0.2, 2: 0.1, 3: 0.0}
+
+
+def delayed_process(batch):
+    time.sleep(DELAYS[batch[0]])
+    return batch[0] * 10
+
+
+def test_sequential():
+    """concurrency=1 时在当前线程中逐个处理，按输入顺序产出"""
+    threads = set()
+
+    def process(batch):
+        threads.add(threading.get_ident())
+        return sum(batch)
+
+    results = list(run_batches([[1, 2], [3], [4, 5]], process))
+    assert results == [([1, 2], 3), ([3], 3), ([4, 5], 9)]
+    assert threads == {threading.get_ident()}
+
+
+def test_unordered_yields_in_completion_order():
+    """并发且不要求顺序时，先完成的批次先产出"""
+    results = list(run_batches([[index] for index in range(4)], delayed_process, concurrency=4))
+    assert sorted(results) == [([0], 0), ([1], 10), ([2], 20), ([3], 30)]
+    assert [batch[0] for batch, _ in results] == [3, 2, 1, 0]
+
+
+def test_ordered_yields_in_input_order():
+    """ordered=True 时即使后面的批次先完成，也按输入顺序产出"""
+    results = list(run_batches([[index] for index in range(4)], delayed_process, concurrency=4, ordered=True))
+    assert results == [([0], 0), ([1], 10), ([2], 20), ([3], 30)]
+
+
+def test_in_flight_limit():
+    """同时在途的批次数不超过 concurrency，上游批次按需读取"""
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0, 'read': 0}
+
+    def batches():
+        for index in range(12):
+            state['read'] += 1
+            yield [index]
+
+    def process(batch):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        return batch[0]
+
+    consumed = 0
+    for _ in run_batches(batches(), process, concurrency=3, ordered=True):
+        consumed += 1
+        # 已读取的批次 = 已产出的批次 + 在途批次（不超过 concurrency）
+        assert state['read'] - consumed <= 3
+    assert consumed == 12
+    assert state['peak'] <= 3
+
+
+def test_error_propagates():
+    """批次处理的异常在产出该批次结果时抛出"""
+    def process(batch):
+        if batch[0] == 2:
+            raise ValueError("批次失败")
+        return batch[0]
+
+    received = []
+    try:
+        for batch, result in run_batches([[index] for index in range(4)], process, concurrency=2, ordered=True):
+            received.append(result)
+    except ValueError as e:
+        assert str(e) == "批次失败"
+    else:
+        raise AssertionError("没有抛出批次处理的异常")
+    assert received == [0, 1]
+
+
+def test_interrupt_yields_in_flight_results():
+    """上游抛出 KeyboardInterrupt 时，先产出在途批次的结果再抛出"""
+    def batches():
+        yield [0]
+        yield [1]
+        raise KeyboardInterrupt
+
+    received = []
+    try:
+        for batch, result in run_batches(batches(), delayed_process, concurrency=4, ordered=True):
+            received.append(result)
+    except KeyboardInterrupt:
+        pass
+    else:
+        raise AssertionError("中断没有传递给调用方")
+    assert received == [0, 10]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 CLI 启动耗时
+
+启动耗时主要来自顶层导入，因此用导入的模块作为稳定的硬性检查：
+- import cli 和 t version 不导入 requests/rich/tabulate/httpx 等只有访问服务器或渲染表格时
+  才需要的模块，也不导入 commands 下的命令模块
+- 输出导入并执行 t version 的耗时（不含 Python 解释器自身启动）；耗时受机器负载影响，默认
+  超过 STARTUP_BUDGET_MS 时只提示，设置环境变量 TEABLE_ENFORCE_STARTUP_BUDGET=1 时判定失败
+不需要连接 Teable 服务，使用临时 HOME 目录运行。
+"""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+# t version 的导入和执行耗时预算（毫秒），默认只用于提示
+STARTUP_BUDGET_MS = 80
+# 取多次运行中最快的一次，排除机器负载造成的抖动
+RUNS = 5
+# 启动时不应导入的模块（以及它们的子模块）
+HEAVY_MODULES = ['requests', 'rich', 'tabulate', 'httpx', 'teable_api_client', 'async_teable_client',
+                 'commands']
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子进程中计时：从导入入口模块开始，到命令执行结束
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+sys.argv = ['t', 'version']
+import teable_daemon
+try:
+    teable_daemon.main()
+except SystemExit:
+    pass
+elapsed = (time.perf_counter() - start) * 1000
+sys.stderr.write(json.dumps({'elapsed_ms': elapsed, 'modules': sorted(sys.modules)}) + '\\n')
+"""
+
+# 只导入 cli 模块，不执行命令
+IMPORT_PROBE = """
+import sys, json
+import cli
+sys.stderr.write(json.dumps({'modules': sorted(sys.modules)}) + '\\n')
+"""
+
+
+def run_probe(probe):
+    """在子进程中执行探测脚本，返回 (报告, 标准输出)"""
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, TEABLE_NO_DAEMON='1')
+        result = subprocess.run([sys.executable, '-c', probe], cwd=PROJECT_DIR, env=env,
+                                capture_output=True, text=True)
+    assert result.returncode == 0, f"执行失败: {result.stderr}"
+    return json.loads(result.stderr.strip().splitlines()[-1]), result.stdout
+
+
+def heavy_modules(modules):
+    """modules 中属于 HEAVY_MODULES 的模块"""
+    return sorted(name for name in modules
+                  if any(name == heavy or name.startswith(heavy + '.') for heavy in HEAVY_MODULES))
+
+
+def measure_startup():
+    """运行一次 t version，返回 (耗时毫秒, 已导入的模块, 标准输出)"""
+    report, stdout = run_probe(PROBE)
+    return report['elapsed_ms'], set(report['modules']), stdout
+
+
+def test_import_cli_is_light():
+    """import cli 不导入重量级模块和命令模块"""
+    report, _ = run_probe(IMPORT_PROBE)
+    loaded = heavy_modules(report['modules'])
+    assert not loaded, f"import cli 不应导入: {', '.join(loaded)}"
+    print("✅ import cli 没有导入重量级模块和命令模块")
+
+
+def test_startup_time():
+    """测试 t version 的启动耗时和导入的模块"""
+    print("=== 测试 CLI 启动耗时 ===")
+
+    runs = [measure_startup() for _ in range(RUNS)]
+    elapsed_ms, modules, stdout = min(runs, key=lambda run: run[0])
+    print(f"输出: {stdout.strip()}")
+    print(f"耗时: {elapsed_ms:.1f} ms（{RUNS} 次中最快，预算 {STARTUP_BUDGET_MS} ms）")
+
+    assert 'teable-cli version' in stdout, "t version 输出不正确"
+
+    loaded = heavy_modules(modules)
+    assert not loaded, f"t version 不应导入: {', '.join(loaded)}"
+
+    if elapsed_ms >= STARTUP_BUDGET_MS:
+        message = f"启动耗时 {elapsed_ms:.1f} ms，超过预算 {STARTUP_BUDGET_MS} ms（检查是否新增了顶层导入）"
+        assert os.environ.get('TEABLE_ENFORCE_STARTUP_BUDGET') != '1', message
+        print(f"⚠️  {message}")
+    print("✅ t version 没有导入重量级模块")
+
+
+if __name__ == "__main__":
+    try:
+        test_import_cli_is_light()
+        test_startup_time()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
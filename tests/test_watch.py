@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变更订阅（watch.ChangeFeed）单元测试
+
+覆盖修改过的记录、从未修改过的新记录（最后修改时间为空）、新建后又修改的记录只输出一次、
+首次补发后的起始位置，使用内存中的表格代替 Teable 服务。
+"""
+
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.watch import ChangeFeed
+
+
+class FakeClient:
+    """按 orderBy 和 filter（is/isNotEmpty）查询内存记录的客户端"""
+
+    def __init__(self):
+        self.records = []
+        self.next_number = 1
+
+    def insert(self, name, status='待处理'):
+        record = {'id': f'rec{self.next_number}',
+                  'fields': {'名称': name, '状态': status, '编号': self.next_number}}
+        self.next_number += 1
+        self.records.append(record)
+        return record
+
+    def modify(self, record, when, **fields):
+        record['fields'].update(fields)
+        record['fields']['修改时间'] = when
+
+    def _matches(self, record, filter_set):
+        for item in filter_set:
+            value = record['fields'].get(item['fieldId'])
+            if item['operator'] == 'isNotEmpty' and value in (None, ''):
+                return False
+            if item['operator'] == 'is' and value != item['value']:
+                return False
+        return True
+
+    def get_records(self, table_id, skip=0, take=100, orderBy=None, filter=None):
+        records = [record for record in self.records
+                   if self._matches(record, json.loads(filter)['filterSet'] if filter else [])]
+        if orderBy:
+            order = json.loads(orderBy)[0]
+            records.sort(key=lambda record: record['fields'].get(order['fieldId']) or '',
+                         reverse=order['order'] == 'desc')
+        return {'records': records[skip:skip + take]}
+
+    def scan_record_pages(self, table_id, fields=None, page_size=100, filter=None):
+        yield self.get_records(table_id, take=len(self.records), filter=filter)['records']
+
+
+def make_feed(client, **kwargs):
+    return ChangeFeed(client, 'tblTest', '修改时间', cursor_field='编号', **kwargs)
+
+
+def ids(records):
+    return [record['id'] for record in records]
+
+
+def test_poll_returns_inserted_record():
+    """从未修改过的新记录（修改时间为空）按插入游标输出"""
+    client = FakeClient()
+    client.insert('苹果')
+    feed = make_feed(client)
+    feed.start_from_latest()
+    assert feed.poll() == []
+
+    record = client.insert('香蕉')
+    assert ids(feed.poll()) == [record['id']]
+    assert feed.poll() == []
+
+
+def test_poll_returns_modified_records():
+    """修改过的记录按修改时间升序输出，同一时刻修改的多条记录都不遗漏"""
+    client = FakeClient()
+    first, second, third = client.insert('a'), client.insert('b'), client.insert('c')
+    feed = make_feed(client)
+    feed.start_from_latest()
+
+    client.modify(second, '2024-01-02T00:00:00.000Z')
+    client.modify(first, '2024-01-01T00:00:00.000Z')
+    assert ids(feed.poll()) == [first['id'], second['id']]
+
+    client.modify(third, '2024-01-02T00:00:00.000Z')
+    assert ids(feed.poll()) == [third['id']]
+    assert feed.poll() == []
+
+
+def test_inserted_and_modified_emitted_once():
+    """新建后又修改的记录两个查询都会返回，只输出一次"""
+    client = FakeClient()
+    feed = make_feed(client)
+    feed.start_from_latest()
+    record = client.insert('苹果')
+    client.modify(record, '2024-01-01T00:00:00.000Z')
+    assert ids(feed.poll()) == [record['id']]
+    assert feed.poll() == []
+
+
+def test_filter_applies_to_inserts():
+    """订阅条件同样作用于新记录"""
+    client = FakeClient()
+    feed = make_feed(client, filter_set=[{'fieldId': '状态', 'operator': 'is', 'value': '待处理'}])
+    feed.start_from_latest()
+    client.insert('a', status='已完成')
+    record = client.insert('b')
+    assert ids(feed.poll()) == [record['id']]
+
+
+def test_catch_up_starts_after_existing_records():
+    """首次补发输出现有记录；最新记录从未修改过时仍然有起始位置，之后只输出新的变化"""
+    client = FakeClient()
+    edited = client.insert('a')
+    client.modify(edited, '2024-01-01T00:00:00.000Z')
+    client.insert('b')
+    feed = make_feed(client)
+    assert sorted(ids(sum(feed.catch_up([]), []))) == ['rec1', 'rec2']
+    assert feed.watermark == '2024-01-01T00:00:00.000Z' and feed.cursor == 2
+    assert feed.poll() == []
+
+    record = client.insert('c')
+    assert ids(feed.poll()) == [record['id']]
+    state = feed.state()
+    resumed = make_feed(client, watermark=state['watermark'], seen=state['seen'])
+    resumed.cursor, resumed.cursor_seen = state['cursor'], set(state['cursor_seen'])
+    assert resumed.poll() == []
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
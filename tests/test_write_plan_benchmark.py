@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+写入计划（TableCodec）微基准测试
+
+比较管道 insert/update 把管道记录转换为写入数据的开销（每 100000 条记录）：
+- 逐条解释：每批重建字段信息映射，每条记录遍历字段映射、检查可编辑性、按类型字符串分派转换、
+  输出 INFO 日志（TableCodec 之前 _process_insert_batch 的做法）
+- 写入计划：命令开始时编译一次 TableCodec，每条记录只按计划取值和转换
+两种方式的转换结果必须完全相同；耗时只输出不断言（受机器负载影响）。
+不需要连接 Teable 服务，关联字段使用预先填好的解析结果。
+"""
+
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.codec_core import TableCodec
+from commands.table_common import convert_field_value, is_field_editable
+
+# 基准记录数
+RECORD_COUNT = 100000
+# 每批记录数（逐条解释方式每批重建字段信息映射）
+BATCH_SIZE = 200
+# 取多次运行中最快的一次
+RUNS = 3
+
+FIELDS = [
+    {'id': 'fldName', 'name': '名称', 'type': 'singleLineText'},
+    {'id': 'fldQty', 'name': '数量', 'type': 'number'},
+    {'id': 'fldPrice', 'name': '单价', 'type': 'currency'},
+    {'id': 'fldDone', 'name': '完成', 'type': 'checkbox'},
+    {'id': 'fldTags', 'name': '标签', 'type': 'multipleSelect'},
+    {'id': 'fldNote', 'name': '备注', 'type': 'longText'},
+    {'id': 'fldState', 'name': '状态', 'type': 'singleSelect'},
+    {'id': 'fldTotal', 'name': '总价', 'type': 'formula'},
+    {'id': 'fldCustomer', 'name': '客户', 'type': 'link'},
+]
+LINK_FIELDS = {'客户': {'foreign_table_id': 'tblCustomer', 'relationship': 'manyOne'}}
+MAPPINGS = {
+    '名称': {'type': 'field_mapping', 'source_field': '名称'},
+    '数量': {'type': 'field_mapping', 'source_field': '数量'},
+    '单价': {'type': 'field_mapping', 'source_field': '单价'},
+    '完成': {'type': 'field_mapping', 'source_field': '完成'},
+    '标签': {'type': 'field_mapping', 'source_field': '标签'},
+    '备注': {'type': 'field_mapping', 'source_field': '备注'},
+    '状态': {'type': 'constant', 'value': '已导入'},
+    '总价': {'type': 'field_mapping', 'source_field': '总价'},
+    '客户': {'type': 'field_mapping', 'source_field': '客户名称'},
+}
+
+logger = logging.getLogger('benchmark')
+
+
+class PrefilledLinkResolver:
+    """预先填好解析结果的关联值解析器（代替访问服务器的 LinkResolver）"""
+
+    def __init__(self, resolved):
+        self.resolved = resolved
+
+    def prefetch_for_mappings(self, records, mappings):
+        pass
+
+    def resolve(self, field_name, field_value):
+        return self.resolved.get(field_value)
+
+
+def make_records(count):
+    return [{'id': f'rec{index:014d}', 'fields': {
+        '名称': f'产品{index}', '数量': str(index % 100), '单价': '12.5', '完成': 'true' if index % 2 else 'false',
+        '标签': 'a,b', '备注': {'id': 'usr1', 'title': '张三'}, '总价': 100, '客户名称': f'客户{index % 10}',
+    }} for index in range(count)]
+
+
+def legacy_encode_batch(batch_records, field_mappings, fields, link_fields, link_resolver):
+    """逐条解释的转换（TableCodec 之前的做法）"""
+    field_info_map = {}
+    for field in fields:
+        field_info_map[field.get('name', '')] = field
+
+    payloads = []
+    for pipe_record in batch_records:
+        record_data = {}
+        record_id = pipe_record.get('id', '')
+        pipe_fields = pipe_record.get('fields', {})
+        logger.info(f"处理管道记录: record_id='{record_id}', pipe_fields={list(pipe_fields.keys())}")
+        for target_field, mapping_info in field_mappings.items():
+            target_field_info = field_info_map.get(target_field)
+            if not target_field_info:
+                continue
+            if target_field in ['id', 'createdTime', 'updatedTime', 'createdBy', 'updatedBy']:
+                continue
+            if not is_field_editable(target_field_info):
+                continue
+            field_type = target_field_info.get('type', 'singleLineText')
+            if mapping_info['type'] == 'field_mapping':
+                source_field = mapping_info['source_field']
+                logger.info(f"处理字段映射: 目标字段='{target_field}', 源字段='{source_field}', record_id='{record_id}'")
+                if source_field in pipe_fields:
+                    field_value = pipe_fields[source_field]
+                else:
+                    continue
+            else:
+                field_value = mapping_info['value']
+            if target_field in link_fields:
+                linked_record_id = link_resolver.resolve(target_field, field_value)
+                if linked_record_id:
+                    record_data[target_field] = {'id': linked_record_id}
+                continue
+            record_data[target_field] = convert_field_value(field_type, field_value)
+        payloads.append(record_data)
+    return payloads
+
+
+def codec_encode_batch(codec, batch_records, link_resolver):
+    """按写入计划转换（_process_insert_batch/_process_update_batch_direct 的做法）"""
+    codec.prefetch(batch_records, link_resolver)
+    encode = codec.encode
+    return [encode(record, link_resolver) for record in batch_records]
+
+
+def measure(transform, records):
+    """按批次转换全部记录，返回(最快一次的耗时秒数, 转换结果)"""
+    best, payloads = None, None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        payloads = []
+        for index in range(0, len(records), BATCH_SIZE):
+            payloads.extend(transform(records[index:index + BATCH_SIZE]))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, payloads
+
+
+def test_write_plan_benchmark():
+    """测试写入计划的转换开销和结果"""
+    print(f"=== 写入计划微基准（{RECORD_COUNT} 条记录，每批 {BATCH_SIZE} 条）===")
+    # 与正常运行相同：INFO 日志不输出，但逐条解释方式仍要构造日志消息
+    logging.getLogger().setLevel(logging.WARNING)
+
+    records = make_records(RECORD_COUNT)
+    link_resolver = PrefilledLinkResolver({f'客户{index}': f'recCustomer{index:08d}' for index in range(10)})
+
+    legacy_seconds, legacy_payloads = measure(
+        lambda batch: legacy_encode_batch(batch, MAPPINGS, FIELDS, LINK_FIELDS, link_resolver), records)
+
+    compile_start = time.perf_counter()
+    codec = TableCodec(FIELDS, LINK_FIELDS, MAPPINGS)
+    compile_ms = (time.perf_counter() - compile_start) * 1000
+    codec_seconds, codec_payloads = measure(lambda batch: codec_encode_batch(codec, batch, link_resolver), records)
+
+    print(f"逐条解释: {legacy_seconds * 1000:.0f} ms / {RECORD_COUNT} 条")
+    print(f"写入计划: {codec_seconds * 1000:.0f} ms / {RECORD_COUNT} 条（编译 {compile_ms:.2f} ms）")
+    print(f"加速比: {legacy_seconds / codec_seconds:.1f}x")
+
+    assert codec.target_fields == ['名称', '数量', '单价', '完成', '标签', '备注', '状态', '客户'], \
+        f"写入计划的目标字段不正确: {codec.target_fields}"
+    assert codec_payloads == legacy_payloads, "写入计划的转换结果与逐条解释不一致"
+    assert codec_payloads[1]['客户'] == {'id': 'recCustomer00000001'}
+    assert codec_payloads[1]['完成'] is True and codec_payloads[1]['标签'] == ['a', 'b']
+    print("✅ 转换结果一致")
+
+
+if __name__ == "__main__":
+    try:
+        test_write_plan_benchmark()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)